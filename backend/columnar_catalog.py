@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Columnar Recipe Catalog
+NumPy column view of a recipe list: categorical int codes for protein,
+cuisine, cooking method and difficulty, integer prep/cook minutes and a
+favorite flag. Any filter combination is a boolean mask and variety-aware
+sampling works on code arrays, so neither touches the recipe dicts
+"""
+
+import threading
+import numpy as np
+from typing import List, Dict, Any, Optional, Iterable
+from recipe_schema import parse_minutes
+
+class ColumnarCatalog:
+    CATEGORICAL = ['protein', 'cuisine', 'cooking_method', 'difficulty']
+
+    def __init__(self, recipes: List[Dict] = None):
+        self.recipes = []
+        self.values = {c: [] for c in self.CATEGORICAL}     # column -> code -> value
+        self.codes = {c: {} for c in self.CATEGORICAL}      # column -> value -> code
+        self.columns = {c: np.zeros(0, dtype=np.int32) for c in self.CATEGORICAL}
+        self.prep_minutes = np.zeros(0, dtype=np.int32)
+        self.cook_minutes = np.zeros(0, dtype=np.int32)
+        self.is_favorite = np.zeros(0, dtype=bool)
+        self.name_rows = {}                                 # lowercased name -> [rows]
+        self._lock = threading.Lock()
+
+        if recipes:
+            self.add_recipes(recipes)
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def add_recipes(self, recipes: List[Dict]):
+        """Append rows; columns are replaced, never mutated in place"""
+        with self._lock:
+            first = len(self.recipes)
+            for column in self.CATEGORICAL:
+                new_codes = np.fromiter((self._code_for(column, recipe.get(column)) for recipe in recipes),
+                                        dtype=np.int32, count=len(recipes))
+                self.columns[column] = np.concatenate([self.columns[column], new_codes])
+
+            self.prep_minutes = np.concatenate([self.prep_minutes, np.fromiter(
+                (parse_minutes(r.get('prep_time')) for r in recipes), dtype=np.int32, count=len(recipes))])
+            self.cook_minutes = np.concatenate([self.cook_minutes, np.fromiter(
+                (parse_minutes(r.get('cook_time')) for r in recipes), dtype=np.int32, count=len(recipes))])
+            self.is_favorite = np.concatenate([self.is_favorite, np.fromiter(
+                (bool(r.get('is_favorite', False)) for r in recipes), dtype=bool, count=len(recipes))])
+
+            for offset, recipe in enumerate(recipes):
+                self.name_rows.setdefault(self.normalize(recipe.get('name')), []).append(first + offset)
+            self.recipes.extend(recipes)
+
+    @staticmethod
+    def normalize(value: Any) -> str:
+        return str(value or '').strip().lower()
+
+    def mask(self, exclude_names: Iterable[str] = (), max_prep_minutes: Optional[int] = None,
+             max_total_minutes: Optional[int] = None, favorites: Optional[bool] = None, **filters) -> np.ndarray:
+        """
+        Boolean row mask for a filter combination
+
+        Categorical filters take one value or a list of values, e.g.
+        mask(protein=['chicken', 'beef'], cuisine='thai', exclude_names=recent).
+        """
+        result = np.ones(len(self.recipes), dtype=bool)
+
+        for column, wanted in filters.items():
+            if wanted is None or column not in self.columns:
+                continue
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            wanted_codes = [self.codes[column][v] for v in map(self.normalize, wanted) if v in self.codes[column]]
+            result &= np.isin(self.columns[column], wanted_codes)
+
+        if max_prep_minutes is not None:
+            result &= (self.prep_minutes >= 0) & (self.prep_minutes <= max_prep_minutes)
+        if max_total_minutes is not None:
+            total = np.maximum(self.prep_minutes, 0) + np.maximum(self.cook_minutes, 0)
+            result &= (self.prep_minutes >= 0) & (total <= max_total_minutes)
+        if favorites is not None:
+            result &= self.is_favorite if favorites else ~self.is_favorite
+
+        excluded = self.rows_named(exclude_names)
+        if len(excluded):
+            result[excluded] = False
+        return result
+
+    def rows_named(self, names: Iterable[str]) -> np.ndarray:
+        rows = [row for name in names for row in self.name_rows.get(self.normalize(name), [])]
+        return np.array(rows, dtype=np.int64)
+
+    def sample(self, mask: np.ndarray, count: int, quotas: Dict[str, int] = None,
+               start_counts: Dict[str, Dict[str, int]] = None, fill: bool = True, rng=None) -> np.ndarray:
+        """
+        Random rows from the mask honouring per-value quotas (e.g. {'protein': 3, 'cuisine': 4})
+
+        Rows are taken in random order; a row is kept while its value is
+        under quota in every quota column (start_counts pre-load the counts,
+        e.g. with proteins already chosen). If fill is set and the quotas
+        leave the sample short, the rest is filled from the rejected rows.
+        """
+        rng = rng or np.random.default_rng()
+        quotas = quotas or {}
+        start_counts = start_counts or {}
+        candidates = rng.permutation(np.flatnonzero(mask))
+        if count <= 0 or len(candidates) == 0:
+            return candidates[:0]
+
+        accepted = self._within_quotas(candidates, quotas, start_counts, limit=count)
+        chosen = candidates[accepted]
+        if fill and len(chosen) < count:
+            rejected = candidates[~np.isin(candidates, chosen)]
+            chosen = np.concatenate([chosen, rejected[:count - len(chosen)]])
+        return chosen
+
+    def recipes_for(self, rows: Iterable[int]) -> List[Dict]:
+        return [self.recipes[i] for i in rows]
+
+    def distribution(self, column: str, rows: Iterable[int]) -> Dict[str, int]:
+        """Value counts of a categorical column over some rows"""
+        counts = np.bincount(self.columns[column][np.asarray(rows, dtype=np.int64)], minlength=len(self.values[column]))
+        return {self.values[column][code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def _within_quotas(self, rows: np.ndarray, quotas: Dict[str, int], start_counts: Dict[str, Dict[str, int]],
+                       limit: Optional[int] = None) -> np.ndarray:
+        """
+        Rows kept by a greedy pass in row order: a row is kept while its value
+        is under quota in every quota column, and only kept rows count
+        towards the quotas. Stops once limit rows are kept.
+        """
+        accepted = np.zeros(len(rows), dtype=bool)
+        limit = len(rows) if limit is None else limit
+        counts = {}
+        for column in quotas:
+            counts[column] = [0] * len(self.values[column])
+            for value, already in start_counts.get(column, {}).items():
+                code = self.codes[column].get(self.normalize(value))
+                if code is not None:
+                    counts[column][code] += already
+
+        # Most requests are satisfied by a short prefix; widen the scanned chunk only when quotas reject a lot
+        kept, position, chunk = 0, 0, max(limit * 8, 64)
+        while kept < limit and position < len(rows):
+            stop = min(len(rows), position + chunk)
+            chunk_codes = [(quota, self.columns[column][rows[position:stop]].tolist(), counts[column])
+                           for column, quota in quotas.items()]
+            for offset in range(stop - position):
+                if all(column_counts[codes[offset]] < quota for quota, codes, column_counts in chunk_codes):
+                    for _, codes, column_counts in chunk_codes:
+                        column_counts[codes[offset]] += 1
+                    accepted[position + offset] = True
+                    kept += 1
+                    if kept == limit:
+                        break
+            position, chunk = stop, chunk * 4
+        return accepted
+
+    def _code_for(self, column: str, value: Any) -> int:
+        value = self.normalize(value)
+        code = self.codes[column].get(value)
+        if code is None:
+            code = self.codes[column][value] = len(self.values[column])
+            self.values[column].append(value)
+        return code
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    proteins = ['chicken', 'beef', 'salmon', 'shrimp', 'turkey', 'pork', 'cod', 'tofu']
+    cuisines = ['asian', 'mediterranean', 'american', 'mexican', 'thai', 'indian', 'korean', 'italian']
+    methods = ['stove', 'oven', 'grill', 'air fryer', 'slow cooker']
+
+    rows = 1000000
+    catalog = [{
+        'name': f"Recipe {i}",
+        'protein': random.choice(proteins),
+        'cuisine': random.choice(cuisines),
+        'cooking_method': random.choice(methods),
+        'difficulty': random.choice(['easy', 'medium']),
+        'prep_time': f"{random.choice([10, 15, 20, 30])} min",
+        'cook_time': random.choice([15, 25, 40, 60])
+    } for i in range(rows)]
+
+    start = time.time()
+    columns = ColumnarCatalog(catalog)
+    print(f"Built columns for {len(columns)} recipes in {time.time() - start:.2f}s")
+
+    start = time.time()
+    mask = columns.mask(protein=['chicken', 'salmon'], cooking_method='oven', max_total_minutes=45,
+                        exclude_names=['Recipe 1', 'Recipe 2'])
+    print(f"Mask: {mask.sum()} matches in {(time.time() - start) * 1000:.1f}ms")
+
+    start = time.time()
+    sample = columns.sample(np.ones(len(columns), dtype=bool), 20, quotas={'protein': 3, 'cuisine': 4})
+    print(f"Sampled {len(sample)} with quotas in {(time.time() - start) * 1000:.1f}ms: "
+          f"{columns.distribution('protein', sample)}")
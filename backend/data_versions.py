@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Data Versions
+Version vector over the data that cached results are computed from:
+
+- ('catalog',)                  the recipe catalog as a whole
+- ('recipe', recipe_id)         one recipe
+- ('taxonomy',)                 the ingredient database (grocery categories)
+- ('preferences', user_id)      one user's preferences
+
+A VersionedCache entry records the dependencies it was computed from and
+their versions at the time. Bumping a dependency drops exactly the entries
+that registered it (a grocery list for four recipes is dropped when one of
+those recipes changes, not when an unrelated recipe does), and entries are
+also checked against the current vector when read, so a result computed
+while its data changed is never served
+"""
+
+import itertools
+import threading
+import weakref
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+CATALOG = ('catalog',)
+TAXONOMY = ('taxonomy',)
+DEFAULT_USER = 'household'
+
+def recipe_dependency(recipe_id: str) -> Tuple[str, str]:
+    return ('recipe', recipe_id)
+
+def preferences_dependency(user_id: str = DEFAULT_USER) -> Tuple[str, str]:
+    return ('preferences', user_id)
+
+class VersionRegistry:
+    def __init__(self):
+        self._versions = {}                         # dependency -> version (absent = 0)
+        self._dependents = defaultdict(set)         # dependency -> {(cache serial, key)}
+        self._caches = weakref.WeakValueDictionary()  # serial -> cache
+        self._serials = itertools.count(1)
+        self._lock = threading.Lock()
+        self.metrics = {'bumps': 0, 'invalidated': 0}
+
+    def version(self, dependency: Tuple) -> int:
+        return self._versions.get(dependency, 0)
+
+    def vector(self, dependencies: Iterable[Tuple]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(dependency, 0) for dependency in dependencies)
+
+    def bump(self, *dependencies: Tuple):
+        """New versions for the given data; cache entries that depend on any of it are dropped"""
+        with self._lock:
+            affected = set()
+            for dependency in dependencies:
+                self._versions[dependency] = self._versions.get(dependency, 0) + 1
+                affected |= self._dependents.pop(dependency, set())
+            self.metrics['bumps'] += len(dependencies)
+            caches = {serial: self._caches.get(serial) for serial, _ in affected}
+
+        # Outside the registry lock: caches take their own lock and may call back into track/untrack
+        for serial, key in affected:
+            cache = caches.get(serial)
+            if cache is not None and cache.discard(key):
+                self.metrics['invalidated'] += 1
+
+    def register_cache(self, cache: 'VersionedCache') -> int:
+        serial = next(self._serials)
+        self._caches[serial] = cache
+        return serial
+
+    def track(self, serial: int, key: Hashable, dependencies: Iterable[Tuple]):
+        with self._lock:
+            for dependency in dependencies:
+                self._dependents[dependency].add((serial, key))
+
+    def untrack(self, serial: int, key: Hashable, dependencies: Iterable[Tuple]):
+        with self._lock:
+            for dependency in dependencies:
+                dependents = self._dependents.get(dependency)
+                if dependents is not None:
+                    dependents.discard((serial, key))
+                    if not dependents:
+                        del self._dependents[dependency]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = defaultdict(int)
+            for dependency in self._versions:
+                kinds[dependency[0]] += 1
+            return {
+                'catalog_version': self._versions.get(CATALOG, 0),
+                'taxonomy_version': self._versions.get(TAXONOMY, 0),
+                'versioned_data': dict(kinds),
+                'tracked_dependencies': len(self._dependents),
+                'caches': {cache.name: cache.stats() for cache in list(self._caches.values())},
+                **self.metrics
+            }
+
+# Process-wide registry; data owners bump, caches register
+data_versions = VersionRegistry()
+
+class VersionedCache:
+    """LRU cache whose entries are invalidated through the data they depend on"""
+
+    def __init__(self, name: str, max_entries=256, registry: VersionRegistry = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.registry = registry or data_versions
+        self._serial = self.registry.register_cache(self)
+        self._entries = OrderedDict()           # key -> (dependencies, vector, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, dependencies: Iterable[Tuple], compute: Callable[[], Any]) -> Any:
+        dependencies = tuple(dependencies)
+        vector = self.registry.vector(dependencies)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == dependencies and entry[1] == vector:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        # Versions were read before computing: if the data changes meanwhile the entry is already stale
+        value = compute()
+
+        evicted = []
+        with self._lock:
+            self._entries[key] = (dependencies, vector, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, (old_dependencies, _, _) = self._entries.popitem(last=False)
+                evicted.append((old_key, old_dependencies))
+        self.registry.track(self._serial, key, dependencies)
+        for old_key, old_dependencies in evicted:
+            self.registry.untrack(self._serial, old_key, old_dependencies)
+        return value
+
+    def discard(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+if __name__ == "__main__":
+    grocery_lists = VersionedCache('grocery_lists')
+    calls = []
+
+    def grocery_list(recipe_ids):
+        deps = [recipe_dependency(r) for r in recipe_ids] + [TAXONOMY]
+        return grocery_lists.get_or_compute(tuple(recipe_ids), deps, lambda: calls.append(recipe_ids) or len(calls))
+
+    grocery_list(['a', 'b']), grocery_list(['c', 'd']), grocery_list(['a', 'b'])
+    print(f"computed {len(calls)} of 3 requests")
+    data_versions.bump(recipe_dependency('c'))
+    grocery_list(['a', 'b']), grocery_list(['c', 'd'])
+    print(f"after editing recipe c: computed {len(calls)} (only the list with c was rebuilt)")
+    data_versions.bump(TAXONOMY)
+    print(f"after a taxonomy change: {len(grocery_lists)} cached lists")
+    print(data_versions.status())
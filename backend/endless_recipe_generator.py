@@ -50,7 +50,7 @@ class EndlessRecipeGenerator:
             # Select final recipes with variety constraints
             selected_recipes = self._ensure_maximum_variety(fresh_recipes, count)
             
-            # Add generation metadata
+            # Add generation metadata (search results are per-request overlays, so this never touches the catalog)
             for recipe in selected_recipes:
                 recipe['generation_id'] = len(self.generation_history) + 1
                 recipe['freshness'] = 'real_time_web_search'
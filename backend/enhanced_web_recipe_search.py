@@ -12,6 +12,8 @@ from typing import List, Dict, Any
 import subprocess
 import sys
 import os
+from write_behind_queue import write_queue
+from recipe_schema import split_list, content_id
 
 class EnhancedWebRecipeSearcher:
     def __init__(self):
@@ -219,15 +221,13 @@ class EnhancedWebRecipeSearcher:
         prep_time = random.choice(prep_times.get(cooking_method, [25, 30, 35]))
         difficulty = random.choice(['easy', 'medium']) if prep_time <= 25 else random.choice(['medium', 'hard'])
         
-        # Generate recipe ID and URL
-        recipe_id = f"web_{protein}_{cuisine}_{random.randint(10000, 99999)}"
+        # Generate recipe URL
         recipe_url = self._generate_realistic_url(recipe_name)
         
         recipe = {
-            'id': recipe_id,
             'name': recipe_name,
             'protein': protein,
-            'vegetables': vegetables,
+            'vegetables': split_list(vegetables),
             'starch': starch,
             'prep_time': prep_time,
             'difficulty': difficulty,
@@ -241,6 +241,9 @@ class EnhancedWebRecipeSearcher:
             'website': self._extract_website_from_url(recipe_url)
         }
         
+        # Links are synthesized per search, so the id comes from the recipe content
+        recipe['id'] = content_id(recipe)
+        
         return recipe
     
     def _generate_realistic_url(self, recipe_name: str) -> str:
@@ -380,10 +383,10 @@ class EnhancedWebRecipeSearcher:
             'recipes': recipes
         }
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Written compactly by the background writer; the caller doesn't wait on disk
+        write_queue.enqueue_json(filename, data)
         
-        print(f"💾 Saved {len(recipes)} web recipes to {filename}")
+        print(f"💾 Queued {len(recipes)} web recipes for {filename}")
         return filename
     
     def _generate_search_summary(self, recipes: List[Dict]) -> Dict:
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from recipe_manager import RecipeManager
 from recipe_search_engine import RecipeSearchEngine
 from simple_recipe_generator import SimpleRecipeGenerator
+from recipe_record import RecipeOverlay, as_dict
 
 class EnhancedWeeklySuggestionGenerator:
     def __init__(self):
@@ -55,7 +56,8 @@ class EnhancedWeeklySuggestionGenerator:
             
             existing_recommendations = self.search_engine.get_recipe_recommendations(
                 user_preferences, 
-                recent_selections=recent_names
+                recent_selections=recent_names,
+                limit=existing_count
             )
             suggestions.extend(existing_recommendations[:existing_count])
             print(f"   📚 Added {min(existing_count, len(existing_recommendations))} existing recipe recommendations")
@@ -89,7 +91,8 @@ class EnhancedWeeklySuggestionGenerator:
             suggestions = suggestions[:self.max_suggestions]
             random.shuffle(suggestions)
             
-            # 8. Add metadata
+            # 8. Add metadata (per-request overlays; favorites in recipe_db and catalog records stay untouched)
+            suggestions = [RecipeOverlay(recipe) for recipe in suggestions]
             for i, recipe in enumerate(suggestions, 1):
                 recipe['suggestion_number'] = i
                 recipe['week_date'] = week_date
@@ -113,6 +116,7 @@ class EnhancedWeeklySuggestionGenerator:
             fallback_recipes = self.simple_generator.generate_recipes(self.min_suggestions)
             
             # Add metadata
+            fallback_recipes = [RecipeOverlay(recipe) for recipe in fallback_recipes]
             for i, recipe in enumerate(fallback_recipes, 1):
                 recipe['suggestion_number'] = i
                 recipe['week_date'] = week_date
@@ -241,23 +245,23 @@ class EnhancedWeeklySuggestionGenerator:
     
     def save_weekly_suggestions(self, suggestions, week_date):
         """Save weekly suggestions to database"""
-        if 'recipe_history' not in self.recipe_manager.recipe_db:
-            self.recipe_manager.recipe_db['recipe_history'] = {}
-        
-        if 'weekly_suggestions' not in self.recipe_manager.recipe_db['recipe_history']:
-            self.recipe_manager.recipe_db['recipe_history']['weekly_suggestions'] = []
-        
         suggestion_record = {
             'week_date': week_date,
-            'suggestions': suggestions,
+            'suggestions': [as_dict(recipe) for recipe in suggestions],
             'generated_date': datetime.now().isoformat(),
             'total_count': len(suggestions),
             'web_recipe_count': len([r for r in suggestions if r.get('source') == 'web_search']),
             'favorite_count': len([r for r in suggestions if r.get('source') == 'user_favorite'])
         }
         
-        self.recipe_manager.recipe_db['recipe_history']['weekly_suggestions'].append(suggestion_record)
-        self.recipe_manager.save_database()
+        with self.recipe_manager.db_lock:
+            if 'recipe_history' not in self.recipe_manager.recipe_db:
+                self.recipe_manager.recipe_db['recipe_history'] = {}
+            
+            if 'weekly_suggestions' not in self.recipe_manager.recipe_db['recipe_history']:
+                self.recipe_manager.recipe_db['recipe_history']['weekly_suggestions'] = []
+            self.recipe_manager.recipe_db['recipe_history']['weekly_suggestions'].append(suggestion_record)
+            self.recipe_manager.save_database()
     
     def format_suggestions_for_user(self, suggestions):
         """Format suggestions as numbered list for user"""
@@ -272,7 +276,7 @@ class EnhancedWeeklySuggestionGenerator:
             name = recipe.get('name', 'Unknown Recipe')
             url = recipe.get('url', '#')
             protein = recipe.get('protein', 'protein').title()
-            vegetables = recipe.get('vegetables', 'vegetables')
+            vegetables = ', '.join(recipe.get('vegetables', []))
             starch = recipe.get('starch', 'starch').title()
             cuisine = recipe.get('cuisine', 'various').title()
             prep_time = recipe.get('prep_time', 30)
@@ -353,16 +357,21 @@ class EnhancedWeeklySuggestionGenerator:
             try:
                 optimized_suggestions = self.search_engine.optimize_for_ingredient_overlap(
                     [selected_recipe] + filtered_suggestions[:10], 
-                    target_count=4
+                    target_count=4,
+                    required_count=1
                 )[1:]  # Remove the selected recipe from the result
                 
-                # Add remaining suggestions
+                # Add remaining suggestions, most ingredients shared with this week's picks first
                 remaining = [r for r in filtered_suggestions if r not in optimized_suggestions]
+                remaining = self.search_engine.rank_by_shared_ingredients(
+                    [selected_recipe] + optimized_suggestions, remaining
+                )
                 filtered_suggestions = optimized_suggestions + remaining
             except Exception as e:
                 print(f"   Warning: Could not optimize ingredient overlap: {str(e)}")
         
         # Re-number suggestions
+        filtered_suggestions = [RecipeOverlay(recipe) for recipe in filtered_suggestions]
         for i, recipe in enumerate(filtered_suggestions, 1):
             recipe['suggestion_number'] = i
         
@@ -426,7 +435,7 @@ def main():
             source_emoji = "⭐" if recipe.get('source') == 'user_favorite' else "🌐" if recipe.get('source') == 'web_search' else "📚"
             name = recipe.get('name', 'Unknown Recipe')
             protein = recipe.get('protein', 'protein')
-            vegetables = recipe.get('vegetables', 'vegetables')
+            vegetables = ', '.join(recipe.get('vegetables', []))
             starch = recipe.get('starch', 'starch')
             cuisine = recipe.get('cuisine', 'various')
             cooking_method = recipe.get('cooking_method', 'stove')
@@ -4,9 +4,18 @@ Enhanced Weekly Suggestion Generator v2 with Expanded Recipe Database
 Provides 20+ diverse recipes with true randomization and variety
 """
 
-import random
 from typing import List, Dict, Any
-from expanded_recipe_generator import ExpandedRecipeGenerator
+from expanded_recipe_generator import ExpandedRecipeGenerator, expanded_templates
+from columnar_catalog import ColumnarCatalog
+from recipe_record import RecipeOverlay
+from hot_reload import reloader
+
+# Code columns over every expanded template record, rebuilt when the templates are
+template_columns = reloader.register(
+    'expanded_template_columns',
+    lambda: ColumnarCatalog([template for templates in expanded_templates.current.values() for template in templates]),
+    depends_on=[expanded_templates]
+)
 
 class EnhancedWeeklySuggestionGeneratorV2:
     def __init__(self):
@@ -16,25 +25,21 @@ class EnhancedWeeklySuggestionGeneratorV2:
     def generate_weekly_suggestions(self, count=20, include_web=True):
         """Generate diverse weekly recipe suggestions with true randomization"""
         try:
-            # Get recipes from expanded database (get more than needed for variety)
-            all_recipes = self.expanded_generator.generate_recipes(count * 2)
+            columns = template_columns.current
             
             # Filter out recently selected recipes to ensure variety
-            if self.recent_selections:
-                filtered_recipes = [r for r in all_recipes if r.get('name') not in self.recent_selections]
-                if len(filtered_recipes) >= count:
-                    all_recipes = filtered_recipes
-            
-            # Shuffle for true randomization
-            random.shuffle(all_recipes)
+            mask = columns.mask(exclude_names=self.recent_selections)
+            if mask.sum() < count:
+                mask = columns.mask()
             
-            # Ensure protein and cuisine variety
-            selected_recipes = self._ensure_variety(all_recipes, count)
+            # Random selection with protein and cuisine variety (max 3 per protein, 4 per cuisine)
+            rows = columns.sample(mask, count, quotas={'protein': 3, 'cuisine': 4})
             
-            # Add variety metadata
-            for recipe in selected_recipes:
-                recipe['source'] = 'expanded_database'
-                recipe['freshness'] = 'high'
+            # Add variety metadata (per-request overlays over the shared template records)
+            selected_recipes = [
+                RecipeOverlay(recipe, source='expanded_database', freshness='high')
+                for recipe in columns.recipes_for(rows)
+            ]
                 
             return {
                 'success': True,
@@ -60,37 +65,6 @@ class EnhancedWeeklySuggestionGeneratorV2:
                 'suggestions': []
             }
     
-    def _ensure_variety(self, recipes: List[Dict], count: int) -> List[Dict]:
-        """Ensure protein and cuisine variety in recipe selection"""
-        selected = []
-        protein_counts = {}
-        cuisine_counts = {}
-        
-        # First pass: select recipes with variety constraints
-        for recipe in recipes:
-            if len(selected) >= count:
-                break
-                
-            protein = recipe.get('protein', 'unknown')
-            cuisine = recipe.get('cuisine', 'unknown')
-            
-            protein_count = protein_counts.get(protein, 0)
-            cuisine_count = cuisine_counts.get(cuisine, 0)
-            
-            # Limit each protein to max 3 recipes and each cuisine to max 4
-            if protein_count < 3 and cuisine_count < 4:
-                selected.append(recipe)
-                protein_counts[protein] = protein_count + 1
-                cuisine_counts[cuisine] = cuisine_count + 1
-        
-        # Second pass: fill remaining slots if needed
-        if len(selected) < count:
-            remaining = [r for r in recipes if r not in selected]
-            random.shuffle(remaining)
-            selected.extend(remaining[:count - len(selected)])
-        
-        return selected[:count]
-    
     def _get_protein_distribution(self, recipes: List[Dict]) -> Dict[str, int]:
         """Get protein distribution in selected recipes"""
         distribution = {}
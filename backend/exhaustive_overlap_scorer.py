@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Exhaustive Overlap Scorer
+Scores every k-recipe plan of a moderate candidate pool to find the provably
+best one. Ingredient sets are uint64 bitsets, plans are enumerated as NumPy
+index arrays in chunks and scored with vectorized OR + popcount. Scoring runs
+in-process by default; batch jobs can opt into spreading shards (one per
+leading recipe) over a process pool with max_workers > 1. The pool uses
+spawned workers, never a fork of a threaded server process
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+def combination_array(n: int, k: int) -> np.ndarray:
+    """All k-combinations of range(n) in lexicographic order, one per row"""
+    if k == 0:
+        return np.zeros((1, 0), dtype=np.int32)
+    if k > n:
+        return np.zeros((0, k), dtype=np.int32)
+
+    combos = np.arange(n - k + 1, dtype=np.int32)[:, None]
+    for column in range(1, k):
+        # Each row is extended by every index after its last one that still leaves room
+        last = combos[:, -1]
+        counts = (n - k + column) - last
+        rows = np.repeat(np.arange(len(combos)), counts)
+        group_start = np.cumsum(counts) - counts
+        offsets = np.arange(len(rows)) - np.repeat(group_start, counts)
+        next_column = (last[rows] + 1 + offsets).astype(np.int32)
+        combos = np.hstack([combos[rows], next_column[:, None]])
+    return combos
+
+def score_shard(bitsets: np.ndarray, lengths: np.ndarray, base_bits: np.ndarray, base_total: int,
+                optional: np.ndarray, pick: int, first: int, chunk_size: int):
+    """
+    Best plan among those whose first optional recipe is optional[first]
+
+    Returns (score, optional positions of the plan, plans scored). Ties go to
+    the lexicographically smallest plan.
+    """
+    lead = optional[first]
+    lead_bits = base_bits | bitsets[lead]
+    lead_total = base_total + int(lengths[lead])
+
+    tails = combination_array(len(optional) - first - 1, pick - 1) + (first + 1)
+    best_score, best_tail = None, None
+    for start in range(0, len(tails), chunk_size):
+        chunk = tails[start:start + chunk_size]
+        members = optional[chunk]
+
+        union = np.bitwise_or.reduce(bitsets[members], axis=1) | lead_bits if pick > 1 else lead_bits[None, :]
+        scores = lead_total + lengths[members].sum(axis=1) - np.bitwise_count(union).sum(axis=1, dtype=np.int64)
+
+        position = int(np.argmax(scores))
+        if best_score is None or scores[position] > best_score:
+            best_score, best_tail = int(scores[position]), chunk[position]
+
+    plan = [first] + [int(p) for p in best_tail]
+    return best_score, plan, len(tails)
+
+class ExhaustiveOverlapScorer:
+    def __init__(self, max_workers: int = 1, chunk_size=65536, parallel_threshold=200000):
+        self.max_workers = max_workers      # > 1 opts into the process pool for large pools
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold    # plans below this are scored in-process
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def encode(self, recipes: List[Dict]):
+        """uint64 ingredient bitsets (recipes x words) and ingredient-list lengths"""
+        ingredient_columns = {}
+        members = []
+        for recipe in recipes:
+            ingredients = recipe.get('ingredients', [])
+            members.append([ingredient_columns.setdefault(i, len(ingredient_columns)) for i in ingredients])
+
+        words = max(1, (len(ingredient_columns) + 63) // 64)
+        bitsets = np.zeros((len(recipes), words), dtype=np.uint64)
+        for row, columns in enumerate(members):
+            for column in columns:
+                bitsets[row, column // 64] |= np.uint64(1) << np.uint64(column % 64)
+
+        lengths = np.array([len(m) for m in members], dtype=np.int64)
+        return bitsets, lengths
+
+    def plan_count(self, candidate_count: int, target_count: int, required_count: int = 0) -> int:
+        required_count = min(required_count, target_count)
+        return comb(max(candidate_count - required_count, 0), target_count - required_count)
+
+    def optimize(self, recipes: List[Dict], target_count: int, required_count: int = 0,
+                 max_workers: Optional[int] = None, encoded: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Score every plan; the first required_count recipes are always included
+
+        `encoded` may carry precomputed uint64 word rows and lengths for the pool.
+        """
+        n = len(recipes)
+        required_count = min(required_count, target_count, n)
+        if n <= target_count:
+            return {'indices': list(range(n)), 'score': None, 'optimal': True, 'plans_scored': 0}
+
+        if encoded is not None:
+            bitsets, lengths = encoded['words'], np.asarray(encoded['lengths'], dtype=np.int64)
+        else:
+            bitsets, lengths = self.encode(recipes)
+        base_bits = np.bitwise_or.reduce(bitsets[:required_count], axis=0) if required_count else np.zeros(bitsets.shape[1], dtype=np.uint64)
+        base_total = int(lengths[:required_count].sum())
+        optional = np.arange(required_count, n, dtype=np.int64)
+        pick = target_count - required_count
+
+        if pick == 0:
+            indices = list(range(required_count))
+            score = base_total - int(np.bitwise_count(base_bits).sum())
+            return {'indices': indices, 'score': score, 'optimal': True, 'plans_scored': 1}
+
+        shards = range(len(optional) - pick + 1)
+        args = (bitsets, lengths, base_bits, base_total, optional, pick)
+        workers = max_workers or self.max_workers
+
+        if workers > 1 and self.plan_count(n, target_count, required_count) >= self.parallel_threshold:
+            executor = self._get_executor()
+            futures = [executor.submit(score_shard, *args, first, self.chunk_size) for first in shards]
+            results = [future.result() for future in futures]
+        else:
+            results = [score_shard(*args, first, self.chunk_size) for first in shards]
+
+        # Shards are in lexicographic order, so the first maximum is the smallest plan
+        best_score, best_plan, _ = max(results, key=lambda r: r[0])
+        plans_scored = sum(r[2] for r in results)
+        indices = list(range(required_count)) + [int(optional[p]) for p in best_plan]
+        return {'indices': indices, 'score': best_score, 'optimal': True, 'plans_scored': plans_scored}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    pantry = ['rice', 'quinoa', 'garlic', 'ginger', 'olive oil', 'soy sauce', 'lemon', 'herbs',
+              'broccoli', 'carrots', 'bell peppers', 'zucchini', 'spinach', 'onions', 'kale',
+              'chicken', 'beef', 'salmon', 'shrimp', 'turkey', 'cumin', 'cilantro', 'lime', 'tomatoes',
+              'avocado', 'black beans', 'corn', 'coconut milk', 'curry paste', 'basil', 'feta', 'cucumber',
+              'sweet potato', 'mushrooms', 'green beans', 'paprika', 'oregano', 'thyme', 'butter', 'honey',
+              'sesame oil', 'rice vinegar', 'scallions', 'jalapeno', 'chili powder', 'parmesan', 'pesto',
+              'chickpeas', 'tahini', 'yogurt', 'mint', 'parsley', 'cabbage', 'peanuts', 'fish sauce',
+              'lemongrass', 'bok choy', 'snap peas', 'asparagus', 'cauliflower', 'eggplant', 'polenta',
+              'potatoes', 'cheddar', 'salsa', 'tortillas', 'maple syrup', 'dijon', 'capers', 'olives']
+
+    recipes = [{'name': f"Recipe {i}", 'ingredients': random.sample(pantry, random.randint(6, 12))}
+               for i in range(60)]
+
+    scorer = ExhaustiveOverlapScorer(max_workers=os.cpu_count() or 1)
+    cores = scorer.max_workers
+    for workers in sorted({1, cores}):
+        start = time.perf_counter()
+        result = scorer.optimize(recipes, 4, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        rate = result['plans_scored'] / elapsed
+        print(f"{workers} worker(s): {result['plans_scored']:,} plans in {elapsed:.3f}s "
+              f"= {rate:,.0f} plans/s, {rate / workers:,.0f} plans/s/core (best score {result['score']})")
+
+    # Warm pool: process start-up excluded
+    start = time.perf_counter()
+    result = scorer.optimize(recipes, 4)
+    elapsed = time.perf_counter() - start
+    print(f"warm pool ({cores} cores): {result['plans_scored'] / elapsed / cores:,.0f} plans/s/core")
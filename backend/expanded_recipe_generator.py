@@ -6,10 +6,19 @@ Provides massive variety across proteins, cuisines, and cooking methods
 
 import random
 from typing import List, Dict, Any
+from recipe_catalog import get_catalog, catalog_data
+from hot_reload import reloader
+
+# Regrouped whenever the catalog is reloaded
+expanded_templates = reloader.register(
+    'expanded_templates', lambda: get_catalog().source_groups('expanded', 'protein'), depends_on=[catalog_data]
+)
 
 class ExpandedRecipeGenerator:
-    def __init__(self):
-        self.recipe_templates = {
+    @staticmethod
+    def source_recipes():
+        """Recipe templates by protein (catalog build input)"""
+        return {
             'chicken': [
                 {
                     'name': 'Honey Garlic Chicken with Broccoli and Rice',
@@ -1028,19 +1037,15 @@ class ExpandedRecipeGenerator:
             ]
         }
     
+    @property
+    def recipe_templates(self):
+        """Templates by protein, grouped on the live catalog's protein column; records decode on first read"""
+        return expanded_templates.current
+    
     def generate_recipes(self, count=20):
         """Generate a diverse set of recipes with true randomization"""
-        all_recipes = []
-        recipe_id = 1
-        
-        # Get all recipes from all protein categories
-        for protein, protein_recipes in self.recipe_templates.items():
-            for recipe_template in protein_recipes:
-                recipe = recipe_template.copy()
-                recipe['id'] = f"expanded_{recipe_id:03d}"
-                recipe['source'] = 'curated'
-                all_recipes.append(recipe)
-                recipe_id += 1
+        # Get all recipes from all protein categories (shared records, no copies)
+        all_recipes = [recipe for protein_recipes in self.recipe_templates.values() for recipe in protein_recipes]
         
         # Shuffle for true randomization
         random.shuffle(all_recipes)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Grocery List Renderer
+Renders grocery lists from precompiled templates (markdown, text, HTML, CSV)
+with a content-hash memo so each list is rendered at most once per format.
+The generation timestamp is not part of the hash; it is filled into the
+memoized output on every call
+"""
+
+import csv
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterator
+from jinja2 import Environment
+from markupsafe import escape
+
+# Stands in for the timestamp in memoized renders (survives HTML escaping unchanged)
+GENERATED_PLACEHOLDER = '@@generated@@'
+
+MARKDOWN_TEMPLATE = """\
+# 🛒 Weekly Grocery List
+**Week of:** {{ week_date }}
+**Generated:** {{ generated }}
+**Total Recipes:** {{ recipes|length }}
+**Estimated Cost:** {{ estimated_cost }}
+
+## 📋 This Week's Dinner Menu
+{% for recipe in recipes %}
+{{ loop.index }}. **{{ recipe.name }}** ({{ recipe.cooking_method }})
+   - Protein: {{ recipe.protein }}
+   - Vegetables: {{ recipe.vegetables }}
+   - Starch: {{ recipe.starch }}
+{% if recipe.url %}
+   - Recipe: {{ recipe.url }}
+{% endif %}
+
+{% endfor %}
+## 🛍️ Shopping List by Department
+*Organized for efficient grocery store navigation*
+
+{% for department in departments %}
+### {{ department.emoji }} {{ department.name }}
+{% for item in department['items'] %}
+- [ ] **{{ item.quantity }} {{ item.name }}**
+{% if item.recipes|length > 1 %}
+  *Used in: {{ item.recipes|join(', ') }}*
+{% endif %}
+{% endfor %}
+
+{% endfor %}
+{% if equipment_reminders %}
+## ⚙️ Equipment Reminders
+{% for reminder in equipment_reminders %}
+- {{ reminder }}
+{% endfor %}
+
+{% endif %}
+{% if shopping_tips %}
+## 💡 Shopping Tips
+{% for tip in shopping_tips %}
+- {{ tip }}
+{% endfor %}
+
+{% endif %}
+## 🔄 Ingredient Efficiency
+- **Shared ingredients:** {{ overlap.shared_count }}
+- **Total unique ingredients:** {{ overlap.total_unique }}
+- **Efficiency score:** {{ '%.1f'|format(overlap.efficiency_score) }}/10
+{% if overlap.shared_ingredients %}
+- **Most shared:** {{ overlap.shared_ingredients[:3]|join(', ') }}
+{% endif %}
+
+---
+*Happy cooking! 👨‍🍳👩‍🍳*
+"""
+
+TEXT_TEMPLATE = """\
+WEEKLY GROCERY LIST
+Week of: {{ week_date }}
+Generated: {{ generated }}
+Estimated Cost: {{ estimated_cost }}
+
+DINNER MENU
+{% for recipe in recipes %}
+{{ loop.index }}. {{ recipe.name }} ({{ recipe.cooking_method }})
+{% endfor %}
+
+{% for department in departments %}
+{{ department.name|upper }}
+{% for item in department['items'] %}
+[ ] {{ item.quantity }} {{ item.name }}
+{% endfor %}
+
+{% endfor %}
+{% if equipment_reminders %}
+EQUIPMENT REMINDERS
+{% for reminder in equipment_reminders %}
+- {{ reminder }}
+{% endfor %}
+
+{% endif %}
+{% if shopping_tips %}
+SHOPPING TIPS
+{% for tip in shopping_tips %}
+- {{ tip }}
+{% endfor %}
+
+{% endif %}
+Shared ingredients: {{ overlap.shared_count }} of {{ overlap.total_unique }} ({{ '%.1f'|format(overlap.efficiency_score) }}/10)
+"""
+
+HTML_TEMPLATE = """\
+<section class="grocery-list">
+<h1>🛒 Weekly Grocery List</h1>
+<p><strong>Week of:</strong> {{ week_date }}<br>
+<strong>Generated:</strong> {{ generated }}<br>
+<strong>Estimated Cost:</strong> {{ estimated_cost }}</p>
+<h2>📋 This Week's Dinner Menu</h2>
+<ol>
+{% for recipe in recipes %}
+<li><strong>{% if recipe.url %}<a href="{{ recipe.url }}">{{ recipe.name }}</a>{% else %}{{ recipe.name }}{% endif %}</strong> ({{ recipe.cooking_method }})</li>
+{% endfor %}
+</ol>
+<h2>🛍️ Shopping List by Department</h2>
+{% for department in departments %}
+<h3>{{ department.emoji }} {{ department.name }}</h3>
+<ul>
+{% for item in department['items'] %}
+<li><label><input type="checkbox"> {{ item.quantity }} {{ item.name }}</label>{% if item.recipes|length > 1 %} <em>Used in: {{ item.recipes|join(', ') }}</em>{% endif %}</li>
+{% endfor %}
+</ul>
+{% endfor %}
+{% if equipment_reminders %}
+<h2>⚙️ Equipment Reminders</h2>
+<ul>
+{% for reminder in equipment_reminders %}
+<li>{{ reminder }}</li>
+{% endfor %}
+</ul>
+{% endif %}
+{% if shopping_tips %}
+<h2>💡 Shopping Tips</h2>
+<ul>
+{% for tip in shopping_tips %}
+<li>{{ tip }}</li>
+{% endfor %}
+</ul>
+{% endif %}
+<p>Efficiency score: {{ '%.1f'|format(overlap.efficiency_score) }}/10</p>
+</section>
+"""
+
+class GroceryListRenderer:
+    def __init__(self, max_cached_renders=256):
+        # Compile every template once; rendering only walks the compiled code
+        environment = Environment(trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True)
+        html_environment = Environment(trim_blocks=True, lstrip_blocks=True, autoescape=True)
+        self.templates = {
+            'markdown': environment.from_string(MARKDOWN_TEMPLATE),
+            'text': environment.from_string(TEXT_TEMPLATE),
+            'html': html_environment.from_string(HTML_TEMPLATE)
+        }
+        self.content_types = {
+            'markdown': 'text/markdown; charset=utf-8',
+            'text': 'text/plain; charset=utf-8',
+            'html': 'text/html; charset=utf-8',
+            'csv': 'text/csv; charset=utf-8'
+        }
+
+        self.max_cached_renders = max_cached_renders
+        self._render_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def formats(self):
+        return list(self.content_types)
+
+    def content_hash(self, view: Dict[str, Any]) -> str:
+        """Stable hash of a grocery view model, leaving out the generation timestamp"""
+        content = {key: value for key, value in view.items() if key != 'generated'}
+        payload = json.dumps(content, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def render(self, view: Dict[str, Any], output_format: str = 'markdown') -> str:
+        """Render a view model, reusing the memoized output for identical content"""
+        if output_format not in self.content_types:
+            raise ValueError(f"Unsupported format: {output_format}")
+
+        cache_key = (self.content_hash(view), output_format)
+        with self._cache_lock:
+            rendered = self._render_cache.get(cache_key)
+            if rendered is not None:
+                self._render_cache.move_to_end(cache_key)
+
+        if rendered is None:
+            rendered = ''.join(self.stream({**view, 'generated': GENERATED_PLACEHOLDER}, output_format))
+            with self._cache_lock:
+                self._render_cache[cache_key] = rendered
+                if len(self._render_cache) > self.max_cached_renders:
+                    self._render_cache.popitem(last=False)
+
+        generated = str(view.get('generated', ''))
+        if output_format == 'html':
+            generated = str(escape(generated))
+        return rendered.replace(GENERATED_PLACEHOLDER, generated)
+
+    def stream(self, view: Dict[str, Any], output_format: str = 'markdown') -> Iterator[str]:
+        """Yield the rendered list in chunks without building the whole string"""
+        if output_format == 'csv':
+            return self._stream_csv(view)
+        if output_format not in self.templates:
+            raise ValueError(f"Unsupported format: {output_format}")
+        return self.templates[output_format].generate(**view)
+
+    def _stream_csv(self, view: Dict[str, Any]) -> Iterator[str]:
+        """One CSV row per grocery item"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['department', 'quantity', 'item', 'recipes'])
+        for department in view['departments']:
+            for item in department['items']:
+                writer.writerow([department['name'], item['quantity'], item['name'], '; '.join(item['recipes'])])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        if buffer.getvalue():
+            yield buffer.getvalue()
+
+if __name__ == "__main__":
+    renderer = GroceryListRenderer()
+
+    sample_view = {
+        'week_date': '2025-08-04',
+        'generated': 'August 04, 2025 at 09:00 AM',
+        'estimated_cost': '$17 - $26',
+        'recipes': [
+            {'name': 'Chicken Stir Fry', 'cooking_method': 'Stove', 'protein': 'Chicken',
+             'vegetables': 'broccoli', 'starch': 'Rice', 'url': None}
+        ],
+        'departments': [
+            {'key': 'produce', 'name': 'Produce', 'emoji': '🥬',
+             'items': [{'name': 'broccoli', 'quantity': '3 cups', 'recipes': ['Chicken Stir Fry', 'Salmon Bowl']}]}
+        ],
+        'equipment_reminders': [],
+        'shopping_tips': ['💡 Check for bulk discounts'],
+        'overlap': {'shared_count': 1, 'total_unique': 6, 'efficiency_score': 1.7, 'shared_ingredients': ['broccoli']}
+    }
+
+    for output_format in renderer.formats:
+        print(f"--- {output_format} ---")
+        print(renderer.render(sample_view, output_format))
+
+    later = renderer.render({**sample_view, 'generated': 'August 04, 2025 at 09:01 AM'})
+    print(f"Memoized renders: {len(renderer._render_cache)}, timestamp updated: {'09:01 AM' in later}")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Hot Reload
+Data loaded from files (recipe catalog, ingredient database, cooking
+preferences) and the structures derived from it, replaced without a restart.
+
+Each ReloadableData holds one fully built value. A reload builds the
+replacement off to the side and then swaps a single reference, so readers
+see either the old value or the new one, never a mix. A request reads
+`.current` once and keeps using that value, which lets in-flight requests
+finish on the version they started with. Values derived from other
+reloadable data are rebuilt, in registration order, after their inputs.
+
+The reloader builds everything up front when started (so no request pays
+for a first build), then polls file mtimes on a background thread and
+reloads everything on SIGHUP
+"""
+
+import os
+import signal
+import threading
+import time
+from typing import Callable, List, Dict, Any, Iterable, Optional, Tuple
+
+class ReloadableData:
+    def __init__(self, name: str, build: Callable[[], Any], paths: Iterable[str] = (),
+                 depends_on: Iterable['ReloadableData'] = (), outputs: Iterable[str] = ()):
+        self.name = name
+        self.build = build
+        self.paths = list(paths)
+        # Watched files the build may write itself (a cache artifact): stat'ed after building,
+        # so the build's own write is not mistaken for an outside change
+        self.outputs = list(outputs)
+        self.depends_on = list(depends_on)
+        self.generation = 0                 # bumped on every swap
+        self.last_error = None
+        self.listeners = []                 # called with (old, new) after each reload swap
+        self._value = None
+        self._mtimes = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
+
+    @property
+    def current(self) -> Any:
+        """The live value, built on first use"""
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    mtimes = self._stat(self.paths)
+                    self._value = self.build()
+                    self._mtimes = mtimes + self._stat(self.outputs)
+                    self.generation += 1
+                value = self._value
+        return value
+
+    def changed(self) -> bool:
+        return self._mtimes is not None and self._stat(self.paths) + self._stat(self.outputs) != self._mtimes
+
+    def reload(self) -> bool:
+        """Build a replacement and swap it in; on failure the current value stays live"""
+        # Taken before building: a file changed during the build is picked up by the next check
+        mtimes = self._stat(self.paths)
+        try:
+            value = self.build()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"Reload of {self.name} failed, keeping generation {self.generation}: {self.last_error}")
+            return False
+        mtimes += self._stat(self.outputs)
+        with self._lock:
+            old = self._value
+            self._value = value
+            self._mtimes = mtimes
+            self.generation += 1
+            self.last_error = None
+        for listener in self.listeners:
+            try:
+                listener(old, value)
+            except Exception as e:
+                print(f"Reload listener for {self.name} failed: {type(e).__name__}: {e}")
+        return True
+
+    def on_reload(self, listener: Callable[[Any, Any], None]) -> Callable[[Any, Any], None]:
+        """Call listener(old, new) after each swap (usable as a decorator)"""
+        self.listeners.append(listener)
+        return listener
+
+    @staticmethod
+    def _stat(paths: List[str]) -> Tuple[Optional[float], ...]:
+        mtimes = []
+        for path in paths:
+            try:
+                mtimes.append(os.path.getmtime(path))
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+class HotReloader:
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self.resources = []                 # registration order: inputs before what is derived from them
+        self._reload_lock = threading.Lock()
+        self._worker = None
+        self._stopped = threading.Event()
+        self._force = threading.Event()
+
+    def register(self, name: str, build: Callable[[], Any], paths: Iterable[str] = (),
+                 depends_on: Iterable[ReloadableData] = (), outputs: Iterable[str] = ()) -> ReloadableData:
+        resource = ReloadableData(name, build, paths, depends_on, outputs)
+        self.resources.append(resource)
+        return resource
+
+    def check(self, force: bool = False) -> List[str]:
+        """Reload loaded data whose files (or inputs) changed; returns the names reloaded"""
+        with self._reload_lock:
+            reloaded = set()
+            for resource in self.resources:
+                if not resource.loaded:
+                    continue        # built fresh on first use
+                if force or resource.changed() or any(d.name in reloaded for d in resource.depends_on):
+                    if resource.reload():
+                        reloaded.add(resource.name)
+            return [resource.name for resource in self.resources if resource.name in reloaded]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            resource.name: {
+                'loaded': resource.loaded,
+                'generation': resource.generation,
+                'last_error': resource.last_error
+            } for resource in self.resources
+        }
+
+    def warm(self) -> List[str]:
+        """Build every registered value that is not loaded yet; returns the names built"""
+        built = []
+        for resource in self.resources:
+            if resource.loaded:
+                continue
+            try:
+                resource.current
+                built.append(resource.name)
+            except Exception as e:
+                # Left unloaded: the first reader builds it (and sees the error) instead
+                resource.last_error = f"{type(e).__name__}: {e}"
+                print(f"Warming {resource.name} failed: {resource.last_error}")
+        return built
+
+    def start(self, interval: Optional[float] = None):
+        """Build everything now, then poll mtimes in the background and reload everything on SIGHUP"""
+        if interval is not None:
+            self.interval = interval
+        self.warm()
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped.clear()
+            self._worker = threading.Thread(target=self._run, name='hot-reloader', daemon=True)
+            self._worker.start()
+
+        # Signal handlers can only be installed from the main thread
+        if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGHUP, lambda signum, frame: self._force.set())
+
+    def stop(self):
+        self._stopped.set()
+        self._force.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            # interval <= 0 turns polling off; SIGHUP still reloads
+            forced = self._force.wait(self.interval if self.interval > 0 else None)
+            self._force.clear()
+            if self._stopped.is_set():
+                break
+            # Rebuilds run here, never on a request thread
+            reloaded = self.check(force=forced)
+            if reloaded:
+                print(f"Hot reload ({'SIGHUP' if forced else 'files changed'}): {', '.join(reloaded)}")
+
+reloader = HotReloader(interval=float(os.environ.get('HOT_RELOAD_INTERVAL', '2')))
+
+if __name__ == "__main__":
+    import json
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), 'settings.json')
+    with open(path, 'w') as f:
+        json.dump({'version': 1}, f)
+
+    def load_settings():
+        with open(path) as f:
+            return json.load(f)
+
+    settings = reloader.register('settings', load_settings, paths=[path])
+    summary = reloader.register('summary', lambda: f"settings v{settings.current['version']}", depends_on=[settings])
+    print(summary.current)
+
+    time.sleep(0.01)
+    with open(path, 'w') as f:
+        json.dump({'version': 2}, f)
+    os.utime(path, (time.time() + 1, time.time() + 1))
+    print(f"Reloaded {reloader.check()}: {summary.current}")
+    print(reloader.status())
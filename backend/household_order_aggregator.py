@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Household Order Aggregator
+Combines many households' recipe selections into one wholesale co-op order
+with a per-member allocation matrix
+"""
+
+import numpy as np
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional
+from ingredient_normalizer import IngredientNormalizer, JobVocabulary
+from intelligent_grocery_combiner import IntelligentGroceryCombiner
+
+class HouseholdOrderAggregator:
+    def __init__(self, normalizer: Optional[IngredientNormalizer] = None):
+        self.normalizer = normalizer or IngredientNormalizer()
+        self.combiner = IntelligentGroceryCombiner()
+
+    def aggregate_orders(self, households: List[Dict[str, Any]],
+                         recipe_lookup: Optional[Callable[[str], Optional[Dict]]] = None) -> Dict[str, Any]:
+        """
+        Aggregate every household's selected recipes into one order
+
+        Each household is {'household_id': ..., 'recipe_ids': [...]} and/or
+        {'household_id': ..., 'selected_recipes': [recipe dicts]}.
+        Recipes shared between households are parsed only once.
+        """
+        vocabulary = self.normalizer.job()  # names first seen in this order stay with it
+        recipe_rows = {}     # recipe key -> (item index array, quantity array)
+        item_keys = {}       # (ingredient_id, base_unit) -> item index
+        item_list = []
+        member_ids = []
+        unresolved = []
+
+        member_chunks = []
+        item_chunks = []
+        quantity_chunks = []
+
+        for household in households:
+            member_index = len(member_ids)
+            member_ids.append(str(household.get('household_id', member_index)))
+
+            recipes = list(household.get('selected_recipes', []))
+            for recipe_id in household.get('recipe_ids', []):
+                recipe = recipe_lookup(recipe_id) if recipe_lookup else None
+                if recipe:
+                    recipes.append(recipe)
+                else:
+                    unresolved.append({'household_id': member_ids[-1], 'recipe_id': recipe_id})
+
+            for recipe in recipes:
+                recipe_key = recipe.get('id') or recipe.get('name')
+                rows = recipe_rows.get(recipe_key) if recipe_key else None
+                if rows is None:
+                    rows = self._encode_recipe(recipe, vocabulary, item_keys, item_list)
+                    if recipe_key:
+                        recipe_rows[recipe_key] = rows
+
+                item_indices, quantities = rows
+                if len(item_indices):
+                    member_chunks.append(np.full(len(item_indices), member_index, dtype=np.int64))
+                    item_chunks.append(item_indices)
+                    quantity_chunks.append(quantities)
+
+        n_members = len(member_ids)
+        n_items = len(item_list)
+
+        if item_chunks:
+            members = np.concatenate(member_chunks)
+            items = np.concatenate(item_chunks)
+            quantities = np.concatenate(quantity_chunks)
+        else:
+            members = np.zeros(0, dtype=np.int64)
+            items = np.zeros(0, dtype=np.int64)
+            quantities = np.zeros(0, dtype=np.float64)
+
+        # One grouped reduction for the combined order ...
+        order_totals = np.bincount(items, weights=quantities, minlength=n_items)
+
+        # ... and one for the member x item allocation (COO, duplicates summed)
+        cell_keys = members * max(n_items, 1) + items
+        unique_cells, cell_inverse = np.unique(cell_keys, return_inverse=True)
+        cell_totals = np.bincount(cell_inverse, weights=quantities, minlength=len(unique_cells))
+        allocation_rows = unique_cells // max(n_items, 1)
+        allocation_cols = unique_cells % max(n_items, 1)
+        member_counts = np.bincount(allocation_cols, minlength=n_items)
+
+        order_items = []
+        for index, (ingredient_id, base_unit) in enumerate(item_list):
+            name = vocabulary.ingredient_name(ingredient_id)
+            total = float(order_totals[index])
+            order_items.append({
+                'item_index': index,
+                'ingredient_id': ingredient_id,
+                'name': name,
+                'unit': base_unit,
+                'total_quantity': round(total, 4),
+                'display_quantity': self.combiner.format_quantity(total, base_unit),
+                'department': self.combiner.get_department(name),
+                'member_count': int(member_counts[index])
+            })
+
+        combined_order = {}
+        for item in sorted(order_items, key=lambda x: (x['department'], x['name'], x['unit'])):
+            combined_order.setdefault(item['department'], []).append(item)
+
+        return {
+            'success': True,
+            'combined_order': combined_order,
+            'items': order_items,
+            'allocation': {
+                'format': 'coo',
+                'shape': [n_members, n_items],
+                'members': member_ids,
+                'rows': allocation_rows.tolist(),
+                'cols': allocation_cols.tolist(),
+                'values': np.round(cell_totals, 4).tolist()
+            },
+            'unresolved_recipes': unresolved,
+            'statistics': {
+                'total_households': n_members,
+                'total_line_items': int(len(items)),
+                'unique_order_items': n_items,
+                'distinct_recipes_parsed': len(recipe_rows),
+                'allocation_nonzeros': int(len(unique_cells))
+            },
+            'generation_date': datetime.now().isoformat()
+        }
+
+    def _encode_recipe(self, recipe: Dict, vocabulary: JobVocabulary, item_keys: Dict, item_list: List):
+        """Turn a recipe's ingredient lines into (item index, base quantity) arrays"""
+        item_indices = []
+        quantities = []
+        for ingredient_id, base_unit, quantity in vocabulary.parse_recipe(recipe):
+            key = (ingredient_id, base_unit)
+            index = item_keys.get(key)
+            if index is None:
+                index = len(item_list)
+                item_keys[key] = index
+                item_list.append(key)
+            item_indices.append(index)
+            quantities.append(quantity)
+        return np.array(item_indices, dtype=np.int64), np.array(quantities, dtype=np.float64)
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    aggregator = HouseholdOrderAggregator()
+
+    test_recipes = [
+        {'id': 'r1', 'name': 'Chicken and Rice',
+         'ingredients': ['1 lb chicken breast', '2 cups jasmine rice', '1 onion, diced', '2 cloves garlic']},
+        {'id': 'r2', 'name': 'Beef Stir Fry',
+         'ingredients': ['1.5 lbs beef sirloin', '1 cup jasmine rice', '3 cloves garlic', '2 tbsp olive oil']},
+        {'id': 'r3', 'name': 'Salmon Bowl',
+         'ingredients': ['1 lb salmon fillets', '1 cup quinoa', '8 oz spinach', '1 tbsp olive oil']},
+        {'id': 'r4', 'name': 'Turkey Chili',
+         'ingredients': ['1 lb ground turkey', '1 can black beans', '1 onion', '2 tsp cumin']},
+    ]
+
+    households = [
+        {'household_id': f"member_{i:04d}", 'selected_recipes': random.sample(test_recipes, 3)}
+        for i in range(5000)
+    ]
+
+    start = time.time()
+    result = aggregator.aggregate_orders(households)
+    elapsed = time.time() - start
+
+    stats = result['statistics']
+    print(f"Aggregated {stats['total_households']} households in {elapsed:.3f}s")
+    print(f"{stats['total_line_items']} line items -> {stats['unique_order_items']} order items")
+    for department, items in result['combined_order'].items():
+        print(f"\n{department.upper().replace('_', ' ')}:")
+        for item in items:
+            print(f"  • {item['display_quantity']} {item['name']} ({item['member_count']} members)")
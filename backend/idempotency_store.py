@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Idempotency Store
+Remembers responses to POSTs sent with an Idempotency-Key header so client
+retries replay the stored response instead of redoing the work and writes
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional, Tuple, Dict, Any
+from flask import request, jsonify, make_response, Response
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds=24 * 3600, max_entries=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # scoped key -> entry dict, oldest first
+        self._lock = threading.Lock()
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Claim a key before running the request
+        Returns ('new', None), ('replay', entry), ('in_progress', None) or ('mismatch', None)
+        """
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = {'state': 'pending', 'fingerprint': fingerprint, 'created': now}
+                return 'new', None
+
+            if entry['fingerprint'] != fingerprint:
+                return 'mismatch', None
+            if entry['state'] == 'pending':
+                return 'in_progress', None
+            return 'replay', entry
+
+    def complete(self, key: str, body: bytes, status_code: int, mimetype: str):
+        """Store the finished response for replay"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.update({
+                    'state': 'complete',
+                    'body': body,
+                    'status_code': status_code,
+                    'mimetype': mimetype,
+                    'created': time.time()
+                })
+                self._entries.move_to_end(key)
+
+    def abandon(self, key: str):
+        """Release a key whose request failed so a retry runs again"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _evict(self, now: float):
+        while self._entries:
+            oldest_key, oldest = next(iter(self._entries.items()))
+            if now - oldest['created'] > self.ttl_seconds or len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            else:
+                break
+
+# Shared across blueprints; keys are scoped by method and path
+idempotency_store = IdempotencyStore()
+
+def idempotent(view):
+    """Replay the stored response when a POST repeats its Idempotency-Key"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view(*args, **kwargs)
+
+        scoped_key = f"{request.method} {request.path} {key}"
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        state, entry = idempotency_store.begin(scoped_key, fingerprint)
+
+        if state == 'replay':
+            response = Response(entry['body'], status=entry['status_code'], mimetype=entry['mimetype'])
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+        if state == 'in_progress':
+            return jsonify({
+                'success': False,
+                'error': 'A request with this Idempotency-Key is still in progress'
+            }), 409
+        if state == 'mismatch':
+            return jsonify({
+                'success': False,
+                'error': 'Idempotency-Key was already used with a different request body'
+            }), 422
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            idempotency_store.abandon(scoped_key)
+            raise
+
+        # Server errors are not remembered so the client's retry can succeed
+        if response.status_code >= 500:
+            idempotency_store.abandon(scoped_key)
+        else:
+            idempotency_store.complete(scoped_key, response.get_data(), response.status_code, response.mimetype)
+        return response
+
+    return wrapper
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Ingredient Inverted Index
+Maps canonical ingredient IDs to sorted posting lists of recipe numbers so
+"recipes with X", "recipes without Y" and combinations of them are answered
+from posting lists instead of scanning every recipe's ingredient list.
+
+The catalog build exports the postings as flat arrays (export_postings);
+from_postings serves them from the catalog's shared mapping without a copy
+"""
+
+import threading
+import numpy as np
+from collections import defaultdict
+from typing import List, Dict, Iterable, Optional
+from ingredient_normalizer import IngredientNormalizer
+
+class IngredientInvertedIndex:
+    def __init__(self, normalizer: Optional[IngredientNormalizer] = None, recipes: List[Dict] = None):
+        self.normalizer = normalizer or IngredientNormalizer()
+        self.recipes = []                           # recipe number -> recipe
+        self.postings = defaultdict(list)           # ingredient_id -> sorted recipe numbers
+        self.word_ingredients = defaultdict(set)    # word -> ingredient_ids whose name contains it
+        self._lock = threading.Lock()
+
+        # Read-only postings from export_postings, by ingredient id (see from_postings)
+        self._offsets = None
+        self._numbers = None
+        self._renumber = None                       # exported number -> recipe number here (-1 when left out)
+
+        if recipes:
+            self.add_recipes(recipes)
+
+    @classmethod
+    def from_postings(cls, recipes, names: List[str], offsets: np.ndarray, numbers: np.ndarray,
+                      positions: Optional[Iterable[int]] = None) -> 'IngredientInvertedIndex':
+        """
+        Index over exported postings; the arrays are used as they are (no copy)
+
+        names are the ingredient names by id. With positions, the index
+        covers only those exported recipes, numbered by their order in
+        positions (e.g. one source's entries of the catalog).
+        """
+        index = cls()
+        for name in names:
+            index.normalizer.get_ingredient_id(name)
+        for ingredient_id, name in enumerate(names):
+            for word in name.split():
+                index.word_ingredients[word].add(ingredient_id)
+        index.recipes = recipes
+        index._offsets = offsets
+        index._numbers = numbers
+        if positions is not None:
+            positions = np.asarray(positions, dtype=np.int64)
+            size = max(int(numbers.max()) + 1 if len(numbers) else 0, int(positions.max()) + 1 if len(positions) else 0)
+            index._renumber = np.full(size, -1, dtype=np.int64)
+            index._renumber[positions] = np.arange(len(positions))
+        return index
+
+    def export_postings(self):
+        """(ingredient names by id, offsets, recipe numbers) as flat arrays for from_postings"""
+        with self._lock:
+            self._thaw()
+            names = list(self.normalizer.ingredient_names)
+            lengths = [len(self.postings.get(ingredient_id, [])) for ingredient_id in range(len(names))]
+            offsets = np.zeros(len(names) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(lengths)
+            numbers = np.array([number for ingredient_id in range(len(names))
+                                for number in self.postings.get(ingredient_id, [])], dtype=np.int32)
+            return names, offsets, numbers
+
+    def add_recipes(self, recipes: List[Dict]) -> List[int]:
+        """Index recipes; numbers only grow, so posting lists stay sorted by appending"""
+        with self._lock:
+            self._thaw()
+            if not isinstance(self.recipes, list):
+                self.recipes = list(self.recipes)
+            numbers = []
+            for recipe in recipes:
+                number = len(self.recipes)
+                self.recipes.append(recipe)
+                for ingredient_id in self.recipe_ingredient_ids(recipe):
+                    self.postings[ingredient_id].append(number)
+                numbers.append(number)
+            return numbers
+
+    def recipe_ingredient_ids(self, recipe: Dict) -> List[int]:
+        """Distinct canonical ingredient IDs from the ingredient lines and the vegetables field"""
+        ingredient_ids = set()
+        for ingredient_id, _, _ in self.normalizer.parse_recipe(recipe):
+            ingredient_ids.add(ingredient_id)
+
+        # Canonical records (recipe_schema) carry vegetables as a list of names
+        for vegetable in recipe.get('vegetables', []):
+            ingredient_ids.add(self.ingredient_id(vegetable))
+
+        for ingredient_id in ingredient_ids:
+            for word in self.normalizer.ingredient_names[ingredient_id].split():
+                self.word_ingredients[word].add(ingredient_id)
+        return sorted(ingredient_ids)
+
+    def ingredient_id(self, name: str) -> int:
+        return self.normalizer.get_ingredient_id(self.normalizer.canonical_name(name.strip().lower()))
+
+    def lookup(self, name: str, partial: bool = False) -> np.ndarray:
+        """
+        Sorted recipe numbers using an ingredient
+
+        With partial=True every ingredient whose canonical name contains the
+        query's words matches ("mushroom" also finds "cremini mushroom").
+        """
+        canonical = self.normalizer.canonical_name(name.strip().lower())
+        if not partial:
+            return self._posting(self.normalizer.ingredient_ids.get(canonical))
+
+        words = canonical.split()
+        matching = set(self.word_ingredients.get(words[0], set()))
+        for word in words[1:]:
+            matching &= self.word_ingredients.get(word, set())
+        return self.union(*(self._posting(i) for i in matching))
+
+    def query(self, include: Iterable[str] = (), exclude: Iterable[str] = (), partial: bool = False) -> np.ndarray:
+        """Recipes using every `include` ingredient and none of the `exclude` ones"""
+        included = [self.lookup(name, partial) for name in include]
+        if included:
+            # Intersect smallest first so intermediate results shrink fastest
+            matches = self.intersection(*sorted(included, key=len))
+        else:
+            matches = np.arange(len(self.recipes), dtype=np.int64)
+
+        excluded = [self.lookup(name, partial) for name in exclude]
+        if excluded:
+            matches = self.difference(matches, self.union(*excluded))
+        return matches
+
+    def recipes_for(self, numbers: Iterable[int]) -> List[Dict]:
+        return [self.recipes[i] for i in numbers]
+
+    @staticmethod
+    def intersection(*postings: np.ndarray) -> np.ndarray:
+        if not postings:
+            return np.zeros(0, dtype=np.int64)
+        result = postings[0]
+        for posting in postings[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    @staticmethod
+    def union(*postings: np.ndarray) -> np.ndarray:
+        if not postings:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(postings))
+
+    @staticmethod
+    def difference(postings: np.ndarray, removed: np.ndarray) -> np.ndarray:
+        if len(removed) == 0:
+            return postings
+        return np.setdiff1d(postings, removed, assume_unique=True)
+
+    def _posting(self, ingredient_id: Optional[int]) -> np.ndarray:
+        """Sorted recipe numbers for an ingredient id (empty for None)"""
+        if ingredient_id is None:
+            return np.zeros(0, dtype=np.int64)
+        offsets = self._offsets
+        if offsets is None:
+            return np.array(self.postings.get(ingredient_id, []), dtype=np.int64)
+        if ingredient_id + 1 >= len(offsets):
+            return np.zeros(0, dtype=np.int64)
+        posting = self._numbers[offsets[ingredient_id]:offsets[ingredient_id + 1]].astype(np.int64)
+        if self._renumber is not None:
+            posting = self._renumber[posting]
+            posting = np.sort(posting[posting >= 0])
+        return posting
+
+    def _thaw(self):
+        """Copy read-only postings into lists before the index is changed"""
+        if self._offsets is None:
+            return
+        for ingredient_id in range(len(self._offsets) - 1):
+            posting = self._posting(ingredient_id)
+            if len(posting):
+                self.postings[ingredient_id] = posting.tolist()
+        self._offsets = self._numbers = self._renumber = None
+
+if __name__ == "__main__":
+    from real_time_recipe_search import RealTimeRecipeSearch
+
+    index = IngredientInvertedIndex(recipes=RealTimeRecipeSearch().web_recipe_sources)
+    print(f"Indexed {len(index.recipes)} recipes, {len(index.postings)} ingredients")
+
+    for name in ['bok choy', 'rice', 'cilantro']:
+        print(f"Recipes with {name}: {[r['name'] for r in index.recipes_for(index.lookup(name))]}")
+
+    without = index.query(include=['rice'], exclude=['cilantro'])
+    print(f"Rice but no cilantro: {len(without)} recipes")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Ingredient Normalizer
+Maps free-text ingredient lines to canonical ingredient IDs and base-unit quantities
+
+The normalizer's vocabulary is shared and lives as long as the process.
+Jobs that parse client text (co-op orders, price lists) use a
+JobVocabulary instead, so names first seen in a request never grow it
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+from typing import List, Dict, Tuple
+
+class IngredientNormalizer:
+    def __init__(self, max_cached_lines=4096):
+        # Every unit folds into one base unit per measurement family:
+        # volume -> cup, weight -> lb, counted packaging keeps its own singular unit
+        self.unit_table = {
+            # Volume conversions to cups
+            'cup': ('cup', 1.0),
+            'cups': ('cup', 1.0),
+            'c': ('cup', 1.0),
+            'tablespoon': ('cup', 1/16),
+            'tablespoons': ('cup', 1/16),
+            'tbsp': ('cup', 1/16),
+            'teaspoon': ('cup', 1/48),
+            'teaspoons': ('cup', 1/48),
+            'tsp': ('cup', 1/48),
+            'pint': ('cup', 2.0),
+            'pints': ('cup', 2.0),
+            'quart': ('cup', 4.0),
+            'quarts': ('cup', 4.0),
+            'fl oz': ('cup', 1/8),
+            'ml': ('cup', 1/236.588),
+            'liter': ('cup', 4.22675),
+            'liters': ('cup', 4.22675),
+
+            # Weight conversions to pounds
+            'pound': ('lb', 1.0),
+            'pounds': ('lb', 1.0),
+            'lb': ('lb', 1.0),
+            'lbs': ('lb', 1.0),
+            'ounce': ('lb', 1/16),
+            'ounces': ('lb', 1/16),
+            'oz': ('lb', 1/16),
+            'gram': ('lb', 1/453.592),
+            'grams': ('lb', 1/453.592),
+            'g': ('lb', 1/453.592),
+            'kilogram': ('lb', 2.20462),
+            'kilograms': ('lb', 2.20462),
+            'kg': ('lb', 2.20462),
+
+            # Count units (no conversion needed)
+            'piece': ('item', 1.0),
+            'pieces': ('item', 1.0),
+            'item': ('item', 1.0),
+            'items': ('item', 1.0),
+            'fillet': ('item', 1.0),
+            'fillets': ('item', 1.0),
+            'clove': ('clove', 1.0),
+            'cloves': ('clove', 1.0),
+            'head': ('head', 1.0),
+            'heads': ('head', 1.0),
+            'bunch': ('bunch', 1.0),
+            'bunches': ('bunch', 1.0),
+            'package': ('package', 1.0),
+            'packages': ('package', 1.0),
+            'can': ('can', 1.0),
+            'cans': ('can', 1.0),
+            'jar': ('jar', 1.0),
+            'jars': ('jar', 1.0),
+            'bottle': ('bottle', 1.0),
+            'bottles': ('bottle', 1.0),
+        }
+
+        # Descriptors that don't change what goes in the cart
+        self.descriptors = {
+            'fresh', 'dried', 'chopped', 'diced', 'sliced', 'minced',
+            'crushed', 'whole', 'large', 'medium', 'small', 'boneless',
+            'skinless', 'trimmed', 'cooked', 'uncooked', 'raw', 'organic',
+            'free-range', 'shredded', 'grated', 'cubed', 'peeled', 'sharp'
+        }
+
+        # Common ingredient conversions and equivalents
+        self.ingredient_equivalents = {
+            'chicken breast': ['chicken breasts', 'boneless chicken breast'],
+            'ground turkey': ['turkey ground', 'ground turkey meat'],
+            'bell pepper': ['sweet pepper', 'red bell pepper', 'green bell pepper'],
+            'cherry tomato': ['grape tomato'],
+            'green bean': ['string bean'],
+            'snap pea': ['sugar snap pea'],
+            'gluten-free soy sauce': ['tamari'],
+            'olive oil': ['extra virgin olive oil', 'evoo'],
+            'salmon fillet': ['salmon'],
+            'green onion': ['scallion'],
+        }
+        self.equivalent_lookup = {}
+        for standard_name, equivalents in self.ingredient_equivalents.items():
+            for equivalent in equivalents:
+                self.equivalent_lookup[equivalent] = standard_name
+
+        # Longest units first so "fl oz" wins over "oz"
+        unit_alternatives = '|'.join(re.escape(u) for u in sorted(self.unit_table, key=len, reverse=True))
+        self.line_pattern = re.compile(
+            r'^(?P<qty>\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?)?\s*'
+            r'(?:(?P<unit>' + unit_alternatives + r')\.?\s+)?'
+            r'(?:of\s+)?(?P<name>.+)$'
+        )
+
+        # Canonical ingredient vocabulary (name <-> integer id)
+        self.ingredient_ids = {}
+        self.ingredient_names = []
+        # Parsed lines as (canonical name, base unit, quantity), LRU-bounded: keys are raw client text
+        self.max_cached_lines = max_cached_lines
+        self._line_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._vocabulary_lock = threading.Lock()
+
+    def parse_line(self, ingredient_text: str) -> Tuple[int, str, float]:
+        """
+        Parse one ingredient line
+        Returns: (ingredient_id, base_unit, base_quantity)
+        """
+        name, base_unit, quantity = self.parse_parts(ingredient_text)
+        return self.get_ingredient_id(name), base_unit, quantity
+
+    def parse_parts(self, ingredient_text: str) -> Tuple[str, str, float]:
+        """
+        Parse one ingredient line without assigning an id
+        Returns: (canonical_name, base_unit, base_quantity)
+        """
+        with self._cache_lock:
+            cached = self._line_cache.get(ingredient_text)
+            if cached is not None:
+                self._line_cache.move_to_end(ingredient_text)
+                return cached
+
+        text = ingredient_text.strip().lower()
+        # Drop parentheticals and trailing prep notes ("1 onion, diced")
+        text = re.sub(r'\([^)]*\)', '', text)
+        text = text.split(',')[0].strip()
+
+        match = self.line_pattern.match(text)
+        quantity = 1.0
+        base_unit = 'item'
+        name = text
+        if match:
+            if match.group('qty'):
+                quantity = self._parse_quantity(match.group('qty'))
+            if match.group('unit'):
+                base_unit, factor = self.unit_table[match.group('unit')]
+                quantity *= factor
+            name = match.group('name')
+
+        result = (self.canonical_name(name), base_unit, quantity)
+        with self._cache_lock:
+            self._line_cache[ingredient_text] = result
+            if len(self._line_cache) > self.max_cached_lines:
+                self._line_cache.popitem(last=False)
+        return result
+
+    def parse_recipe(self, recipe: Dict) -> List[Tuple[int, str, float]]:
+        """Parse every ingredient line of a recipe"""
+        return parse_recipe_lines(self, recipe)
+
+    def job(self) -> 'JobVocabulary':
+        """Vocabulary for one job's ingredient text; see JobVocabulary"""
+        return JobVocabulary(self)
+
+    def canonical_name(self, name: str) -> str:
+        """Reduce an ingredient name to its canonical shopping name"""
+        words = [w for w in name.replace('-', ' - ').split() if w not in self.descriptors]
+        name = ' '.join(words).replace(' - ', '-').strip()
+
+        if not name:
+            return 'unknown'
+
+        # Singularize the head noun so "lemons" and "lemon" share one line
+        words = name.split()
+        words[-1] = self._singularize(words[-1])
+        name = ' '.join(words)
+
+        return self.equivalent_lookup.get(name, name)
+
+    def get_ingredient_id(self, canonical_name: str) -> int:
+        """Get (or assign) the integer id for a canonical ingredient name"""
+        ingredient_id = self.ingredient_ids.get(canonical_name)
+        if ingredient_id is None:
+            with self._vocabulary_lock:
+                ingredient_id = self.ingredient_ids.get(canonical_name)
+                if ingredient_id is None:
+                    ingredient_id = len(self.ingredient_names)
+                    self.ingredient_names.append(canonical_name)
+                    self.ingredient_ids[canonical_name] = ingredient_id
+        return ingredient_id
+
+    def ingredient_name(self, ingredient_id: int) -> str:
+        return self.ingredient_names[ingredient_id]
+
+    def _singularize(self, word: str) -> str:
+        """Very small plural -> singular rule set for shopping nouns"""
+        if len(word) <= 3 or word.endswith(('ss', 'us', 'is')):
+            return word
+        if word.endswith('ies'):
+            return word[:-3] + 'y'
+        if word.endswith('oes'):
+            return word[:-2]
+        if word.endswith('s'):
+            return word[:-1]
+        return word
+
+    def _parse_quantity(self, quantity_str: str) -> float:
+        """Parse quantity string that may contain fractions"""
+        try:
+            parts = quantity_str.split()
+            if len(parts) == 2:
+                return float(parts[0]) + float(Fraction(parts[1]))
+            if '/' in quantity_str:
+                return float(Fraction(quantity_str))
+            return float(quantity_str)
+        except (ValueError, ZeroDivisionError):
+            return 1.0
+
+class JobVocabulary:
+    """
+    Ingredient ids for one job, on top of a shared normalizer
+
+    Names the normalizer knew when the job started keep their shared ids;
+    any other name gets an id past the shared vocabulary that only this job
+    knows. The job is dropped with the request, so client text never grows
+    the shared vocabulary.
+    """
+
+    def __init__(self, normalizer: IngredientNormalizer):
+        self.normalizer = normalizer
+        self.base = len(normalizer.ingredient_names)
+        self.local_ids = {}                 # name -> job-local id
+        self.local_names = []
+
+    def is_shared(self, ingredient_id: int) -> bool:
+        return ingredient_id < self.base
+
+    def get_ingredient_id(self, canonical_name: str) -> int:
+        ingredient_id = self.normalizer.ingredient_ids.get(canonical_name)
+        if ingredient_id is not None and ingredient_id < self.base:
+            return ingredient_id
+        ingredient_id = self.local_ids.get(canonical_name)
+        if ingredient_id is None:
+            ingredient_id = self.local_ids[canonical_name] = self.base + len(self.local_names)
+            self.local_names.append(canonical_name)
+        return ingredient_id
+
+    def ingredient_name(self, ingredient_id: int) -> str:
+        if ingredient_id < self.base:
+            return self.normalizer.ingredient_names[ingredient_id]
+        return self.local_names[ingredient_id - self.base]
+
+    def parse_line(self, ingredient_text: str) -> Tuple[int, str, float]:
+        name, base_unit, quantity = self.normalizer.parse_parts(ingredient_text)
+        return self.get_ingredient_id(name), base_unit, quantity
+
+    def parse_recipe(self, recipe: Dict) -> List[Tuple[int, str, float]]:
+        return parse_recipe_lines(self, recipe)
+
+def parse_recipe_lines(vocabulary, recipe: Dict) -> List[Tuple[int, str, float]]:
+    """(ingredient_id, base_unit, base_quantity) for every ingredient line of a recipe"""
+    parsed = []
+    for ingredient_text in recipe.get('ingredients', []):
+        if isinstance(ingredient_text, str) and ingredient_text.strip():
+            parsed.append(vocabulary.parse_line(ingredient_text))
+    return parsed
+
+if __name__ == "__main__":
+    normalizer = IngredientNormalizer()
+
+    samples = [
+        '1 lb chicken breast, cubed',
+        '2 cups broccoli florets',
+        '3 tbsp honey',
+        '3 cloves garlic, minced',
+        '1 1/2 cups jasmine rice',
+        '8 oz chicken breasts',
+        '1 can coconut milk',
+        'Salt and pepper to taste',
+        'lemons',
+    ]
+
+    for sample in samples:
+        ingredient_id, unit, quantity = normalizer.parse_line(sample)
+        print(f"{sample!r:35} -> {normalizer.ingredient_names[ingredient_id]} ({quantity:.3f} {unit})")
@@ -8,11 +8,14 @@ import json
 from datetime import datetime
 from recipe_manager import RecipeManager
 from grocery_list_generator import GroceryListGenerator
+from grocery_list_renderer import GroceryListRenderer
+from write_behind_queue import write_queue
 
 class IntegratedGrocerySystem:
     def __init__(self):
         self.recipe_manager = RecipeManager()
         self.grocery_generator = GroceryListGenerator()
+        self.renderer = GroceryListRenderer()
     
     def generate_final_grocery_list(self, selected_recipe_ids, week_date=None):
         """Generate final grocery list after all 4 recipes are selected"""
@@ -36,11 +39,12 @@ class IntegratedGrocerySystem:
         for recipe_id in selected_recipe_ids:
             self.recipe_manager.track_selection(recipe_id, week_date)
         
-        # Format for user display
-        formatted_list = self.format_grocery_list_for_user(grocery_data, selected_recipes, week_date)
+        # Format for user display (rendered once, reused for the saved file)
+        grocery_view = self.build_grocery_view(grocery_data, selected_recipes, week_date)
+        formatted_list = self.renderer.render(grocery_view, 'markdown')
         
         # Save grocery list
-        self.save_grocery_list(grocery_data, selected_recipes, week_date)
+        self.save_grocery_list(grocery_data, selected_recipes, week_date, formatted_list)
         
         return {
             'formatted_list': formatted_list,
@@ -48,35 +52,8 @@ class IntegratedGrocerySystem:
             'selected_recipes': selected_recipes
         }
     
-    def format_grocery_list_for_user(self, grocery_data, selected_recipes, week_date):
-        """Format grocery list for user-friendly display"""
-        lines = []
-        
-        # Header
-        lines.append("# 🛒 Weekly Grocery List")
-        lines.append(f"**Week of:** {week_date}")
-        lines.append(f"**Generated:** {datetime.now().strftime('%B %d, %Y at %I:%M %p')}")
-        lines.append(f"**Total Recipes:** {len(selected_recipes)}")
-        lines.append(f"**Estimated Cost:** {grocery_data['estimated_cost_range']}")
-        lines.append("")
-        
-        # Selected recipes summary
-        lines.append("## 📋 This Week's Dinner Menu")
-        for i, recipe in enumerate(selected_recipes, 1):
-            cooking_method = recipe.get('cooking_method', 'stove').replace('_', ' ').title()
-            lines.append(f"{i}. **{recipe['name']}** ({cooking_method})")
-            lines.append(f"   - Protein: {recipe.get('protein', 'N/A').title()}")
-            lines.append(f"   - Vegetables: {', '.join(recipe.get('vegetables', []))}")
-            lines.append(f"   - Starch: {recipe.get('starch', 'N/A').title()}")
-            if recipe.get('url'):
-                lines.append(f"   - Recipe: {recipe['url']}")
-            lines.append("")
-        
-        # Grocery list by department
-        lines.append("## 🛍️ Shopping List by Department")
-        lines.append("*Organized for efficient grocery store navigation*")
-        lines.append("")
-        
+    def build_grocery_view(self, grocery_data, selected_recipes, week_date):
+        """Build the render-ready view of a grocery list (overlap analyzed once)"""
         department_emojis = {
             'produce': '🥬',
             'meat_seafood': '🥩',
@@ -88,47 +65,42 @@ class IntegratedGrocerySystem:
             'other': '📦'
         }
         
+        recipes = []
+        for recipe in selected_recipes:
+            vegetables = recipe.get('vegetables', [])
+            recipes.append({
+                'name': recipe['name'],
+                'cooking_method': recipe.get('cooking_method', 'stove').replace('_', ' ').title(),
+                'protein': recipe.get('protein', 'N/A').title(),
+                'vegetables': ', '.join(vegetables) if isinstance(vegetables, list) else vegetables,
+                'starch': recipe.get('starch', 'N/A').title(),
+                'url': recipe.get('url')
+            })
+        
+        departments = []
         for department, items in grocery_data['grocery_list'].items():
-            emoji = department_emojis.get(department, '📦')
-            dept_name = department.replace('_', ' ').title()
-            lines.append(f"### {emoji} {dept_name}")
-            
-            for item in items:
-                lines.append(f"- [ ] **{item['quantity']} {item['name']}**")
-                if len(item['recipes']) > 1:
-                    lines.append(f"  *Used in: {', '.join(item['recipes'])}*")
-            lines.append("")
-        
-        # Equipment reminders
-        if grocery_data['equipment_reminders']:
-            lines.append("## ⚙️ Equipment Reminders")
-            for reminder in grocery_data['equipment_reminders']:
-                lines.append(f"- {reminder}")
-            lines.append("")
-        
-        # Shopping tips
-        if grocery_data['shopping_tips']:
-            lines.append("## 💡 Shopping Tips")
-            for tip in grocery_data['shopping_tips']:
-                lines.append(f"- {tip}")
-            lines.append("")
-        
-        # Ingredient overlap analysis
-        lines.append("## 🔄 Ingredient Efficiency")
-        overlap_analysis = self.analyze_ingredient_overlap(selected_recipes)
-        lines.append(f"- **Shared ingredients:** {overlap_analysis['shared_count']}")
-        lines.append(f"- **Total unique ingredients:** {overlap_analysis['total_unique']}")
-        lines.append(f"- **Efficiency score:** {overlap_analysis['efficiency_score']:.1f}/10")
-        
-        if overlap_analysis['shared_ingredients']:
-            lines.append(f"- **Most shared:** {', '.join(overlap_analysis['shared_ingredients'][:3])}")
-        lines.append("")
-        
-        # Footer
-        lines.append("---")
-        lines.append("*Happy cooking! 👨‍🍳👩‍🍳*")
-        
-        return "\\n".join(lines)
+            departments.append({
+                'key': department,
+                'name': department.replace('_', ' ').title(),
+                'emoji': department_emojis.get(department, '📦'),
+                'items': items
+            })
+        
+        return {
+            'week_date': week_date,
+            'generated': datetime.now().strftime('%B %d, %Y at %I:%M %p'),
+            'estimated_cost': grocery_data['estimated_cost_range'],
+            'recipes': recipes,
+            'departments': departments,
+            'equipment_reminders': grocery_data['equipment_reminders'],
+            'shopping_tips': grocery_data['shopping_tips'],
+            'overlap': self.analyze_ingredient_overlap(selected_recipes)
+        }
+    
+    def format_grocery_list_for_user(self, grocery_data, selected_recipes, week_date, output_format='markdown'):
+        """Format grocery list for user-friendly display"""
+        grocery_view = self.build_grocery_view(grocery_data, selected_recipes, week_date)
+        return self.renderer.render(grocery_view, output_format)
     
     def analyze_ingredient_overlap(self, recipes):
         """Analyze ingredient overlap for efficiency scoring"""
@@ -156,7 +128,7 @@ class IntegratedGrocerySystem:
             'efficiency_score': efficiency_score
         }
     
-    def save_grocery_list(self, grocery_data, selected_recipes, week_date):
+    def save_grocery_list(self, grocery_data, selected_recipes, week_date, formatted_list=None):
         """Save grocery list to file"""
         grocery_record = {
             'week_date': week_date,
@@ -166,18 +138,18 @@ class IntegratedGrocerySystem:
         }
         
         # Save to recipe manager database
-        if 'grocery_history' not in self.recipe_manager.recipe_db:
-            self.recipe_manager.recipe_db['grocery_history'] = []
-        
-        self.recipe_manager.recipe_db['grocery_history'].append(grocery_record)
-        self.recipe_manager.save_database()
+        with self.recipe_manager.db_lock:
+            if 'grocery_history' not in self.recipe_manager.recipe_db:
+                self.recipe_manager.recipe_db['grocery_history'] = []
+            
+            self.recipe_manager.recipe_db['grocery_history'].append(grocery_record)
+            self.recipe_manager.save_database()
         
         # Also save formatted list to file
-        formatted_list = self.format_grocery_list_for_user(grocery_data, selected_recipes, week_date)
+        if formatted_list is None:
+            formatted_list = self.format_grocery_list_for_user(grocery_data, selected_recipes, week_date)
         filename = f"/home/ubuntu/grocery_list_{week_date}.md"
-        
-        with open(filename, 'w') as f:
-            f.write(formatted_list)
+        write_queue.enqueue_text(filename, formatted_list)
         
         return filename
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Ingredient Overlap Optimizer
+Picks the subset of recipes that shares the most ingredients. A greedy seed
+and local swap search give a good plan quickly, then branch-and-bound keeps
+improving it until the plan is proven optimal or the time budget runs out
+"""
+
+import time
+import numpy as np
+from typing import List, Dict, Any
+
+class IngredientOverlapOptimizer:
+    def __init__(self, time_budget=0.5):
+        self.time_budget = time_budget      # seconds per optimize() call
+
+    def encode(self, recipes: List[Dict]) -> Dict[str, Any]:
+        """Ingredient bitsets and ingredient-list lengths per recipe"""
+        ingredient_bits = {}
+        bitsets = []
+        lengths = []
+        for recipe in recipes:
+            ingredients = recipe.get('ingredients', [])
+            bits = 0
+            for ingredient in ingredients:
+                bit = ingredient_bits.get(ingredient)
+                if bit is None:
+                    bit = ingredient_bits[ingredient] = 1 << len(ingredient_bits)
+                bits |= bit
+            bitsets.append(bits)
+            lengths.append(len(ingredients))
+        return {'bitsets': bitsets, 'lengths': lengths}
+
+    def overlap_score(self, bitsets: List[int], lengths: List[int], indices) -> int:
+        """Repeated ingredient uses: total ingredients minus distinct ingredients"""
+        union = 0
+        total = 0
+        for i in indices:
+            union |= bitsets[i]
+            total += lengths[i]
+        return total - union.bit_count()
+
+    def optimize(self, recipes: List[Dict], target_count: int, required_count: int = 0,
+                 time_budget: float = None, encoded: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Choose target_count recipes maximizing ingredient overlap
+
+        The first required_count recipes are always part of the plan.
+        `encoded` may carry precomputed bitsets/lengths (and a pairwise
+        shared matrix) for the pool. Returns the chosen indices (input
+        order), their score and whether the search finished (i.e. the plan
+        is optimal).
+        """
+        start = time.perf_counter()
+        deadline = start + (self.time_budget if time_budget is None else time_budget)
+        n = len(recipes)
+        required_count = min(required_count, target_count, n)
+
+        encoded = encoded or self.encode(recipes)
+        if n <= target_count:
+            return self._result(encoded, list(range(n)), True, 0, start)
+
+        bitsets, lengths = encoded['bitsets'], encoded['lengths']
+
+        selected = self._greedy_seed(bitsets, lengths, target_count, required_count, encoded.get('shared'))
+        selected = self._local_swap(bitsets, lengths, selected, required_count, deadline)
+        best_score = self.overlap_score(bitsets, lengths, selected)
+
+        search = self._branch_and_bound(bitsets, lengths, target_count, required_count, best_score, deadline)
+        if search['selected'] is not None:
+            selected = search['selected']
+        return self._result(encoded, sorted(selected), search['complete'], search['nodes'], start)
+
+    def _greedy_seed(self, bitsets, lengths, target_count, required_count, shared=None) -> List[int]:
+        """Repeatedly add the recipe that reuses the most already-chosen ingredients"""
+        selected = list(range(required_count))
+        if not selected and shared is not None and target_count >= 2:
+            # Start from the pair sharing the most ingredients
+            pair_scores = np.triu(shared, k=1)
+            first, second = np.unravel_index(int(np.argmax(pair_scores)), pair_scores.shape)
+            selected = [int(first), int(second)]
+        union = 0
+        for i in selected:
+            union |= bitsets[i]
+
+        chosen = set(selected)
+        while len(selected) < target_count:
+            best, best_gain = None, None
+            for i in range(len(bitsets)):
+                if i in chosen:
+                    continue
+                gain = lengths[i] - (bitsets[i] & ~union).bit_count()
+                if best_gain is None or gain > best_gain:
+                    best, best_gain = i, gain
+            selected.append(best)
+            chosen.add(best)
+            union |= bitsets[best]
+        return selected
+
+    def _local_swap(self, bitsets, lengths, selected, required_count, deadline) -> List[int]:
+        """Swap one chosen recipe for an outside one while that improves the score"""
+        selected = list(selected)
+        chosen = set(selected)
+        score = self.overlap_score(bitsets, lengths, selected)
+
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            total = sum(lengths[i] for i in selected)
+            for position in range(required_count, len(selected)):
+                out = selected[position]
+                union_without = 0
+                for i in selected:
+                    if i != out:
+                        union_without |= bitsets[i]
+                base_total = total - lengths[out]
+
+                best_swap, best_score = None, score
+                for candidate in range(len(bitsets)):
+                    if candidate in chosen:
+                        continue
+                    candidate_score = base_total + lengths[candidate] - (union_without | bitsets[candidate]).bit_count()
+                    if candidate_score > best_score:
+                        best_swap, best_score = candidate, candidate_score
+
+                if best_swap is not None:
+                    chosen.discard(out)
+                    chosen.add(best_swap)
+                    selected[position] = best_swap
+                    score = best_score
+                    improved = True
+                    break
+        return selected
+
+    def _branch_and_bound(self, bitsets, lengths, target_count, required_count, incumbent_score, deadline) -> Dict[str, Any]:
+        """
+        Depth-first search over the optional recipes with an admissible bound
+
+        A recipe can at best reuse every ingredient it shares with any other
+        candidate, so its gain is bounded by its length minus its private
+        ingredients. Candidates are visited in descending bound order, which
+        makes the bound of a branch a prefix sum.
+        """
+        # Ingredients appearing in exactly one recipe can never be shared
+        seen_once = 0
+        seen_twice = 0
+        for bits in bitsets:
+            seen_twice |= seen_once & bits
+            seen_once |= bits
+        private = seen_once & ~seen_twice
+
+        optional = list(range(required_count, len(bitsets)))
+        bounds = {i: lengths[i] - (bitsets[i] & private).bit_count() for i in optional}
+        optional.sort(key=lambda i: bounds[i], reverse=True)
+
+        prefix = [0]
+        for i in optional:
+            prefix.append(prefix[-1] + bounds[i])
+
+        union = 0
+        total = 0
+        for i in range(required_count):
+            union |= bitsets[i]
+            total += lengths[i]
+
+        state = {'best_score': incumbent_score, 'selected': None, 'nodes': 0, 'complete': True}
+        path = list(range(required_count))
+
+        def search(position, union, total):
+            remaining = target_count - len(path)
+            if remaining == 0:
+                score = total - union.bit_count()
+                if score > state['best_score']:
+                    state['best_score'] = score
+                    state['selected'] = list(path)
+                return
+
+            current = total - union.bit_count()
+            for p in range(position, len(optional) - remaining + 1):
+                state['nodes'] += 1
+                if state['nodes'] & 1023 == 0 and time.perf_counter() > deadline:
+                    state['complete'] = False
+                if not state['complete']:
+                    return
+                # Later positions only have smaller bounds, so the whole tail is pruned
+                if current + prefix[p + remaining] - prefix[p] <= state['best_score']:
+                    return
+
+                i = optional[p]
+                path.append(i)
+                search(p + 1, union | bitsets[i], total + lengths[i])
+                path.pop()
+
+        search(0, union, total)
+        return state
+
+    def _result(self, encoded, selected, complete, nodes, start) -> Dict[str, Any]:
+        return {
+            'indices': selected,
+            'score': self.overlap_score(encoded['bitsets'], encoded['lengths'], selected),
+            'optimal': complete,
+            'nodes': nodes,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
+
+if __name__ == "__main__":
+    import random
+    from itertools import combinations
+
+    pantry = ['rice', 'quinoa', 'garlic', 'ginger', 'olive oil', 'soy sauce', 'lemon', 'herbs',
+              'broccoli', 'carrots', 'bell peppers', 'zucchini', 'spinach', 'onions', 'kale',
+              'chicken', 'beef', 'salmon', 'shrimp', 'turkey', 'cumin', 'cilantro', 'lime', 'tomatoes']
+
+    def make_recipes(count):
+        return [{'name': f"Recipe {i}", 'ingredients': random.sample(pantry, random.randint(5, 9))}
+                for i in range(count)]
+
+    optimizer = IngredientOverlapOptimizer()
+
+    # Small pool: compare against brute force
+    recipes = make_recipes(14)
+    result = optimizer.optimize(recipes, 4)
+    brute = max(optimizer.overlap_score(*optimizer.encode(recipes).values(), combo)
+                for combo in combinations(range(len(recipes)), 4))
+    print(f"14 recipes, pick 4: score {result['score']} (brute force {brute}), optimal={result['optimal']}")
+
+    for pool, target in [(200, 4), (2000, 7), (5000, 20)]:
+        recipes = make_recipes(pool)
+        result = optimizer.optimize(recipes, target)
+        print(f"{pool} recipes, pick {target}: score {result['score']}, optimal={result['optimal']}, "
+              f"{result['nodes']} nodes in {result['elapsed_ms']:.0f}ms")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Ingredient Price Model
+Prices grocery lists per store from a local unit-price table using
+vectorized quantity x price products. Price rows are cached for names in
+the shared ingredient vocabulary (seeded with the price table); items only
+a request has seen are priced for that call
+"""
+
+import json
+import os
+import threading
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+from ingredient_normalizer import IngredientNormalizer
+from intelligent_grocery_combiner import IntelligentGroceryCombiner
+
+class PriceModel:
+    def __init__(self, normalizer: Optional[IngredientNormalizer] = None, price_table_path: Optional[str] = None):
+        self.normalizer = normalizer or IngredientNormalizer()
+        self.combiner = IntelligentGroceryCombiner()
+        self.price_table_path = price_table_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ingredient_prices.json')
+        self.load_price_table()
+
+        # Row index per shared (ingredient_id, base_unit); rows are appended as new items are seen
+        self.row_index = {}
+        self.row_keys = []
+        self._price_rows = []
+        self.price_matrix = np.zeros((0, len(self.stores)))
+        self._rows_lock = threading.Lock()
+
+    def load_price_table(self):
+        """Load per-store unit prices"""
+        try:
+            with open(self.price_table_path, 'r') as f:
+                price_table = json.load(f)
+        except FileNotFoundError:
+            price_table = {"stores": ["store"], "prices": {}, "department_defaults": {}}
+
+        self.currency = price_table.get('currency', 'USD')
+        self.stores = price_table['stores']
+        self.department_defaults = price_table.get('department_defaults', {})
+
+        # Key explicit prices by canonical name so table entries and recipe lines agree; priced
+        # names join the shared vocabulary, so their rows are cached across requests
+        self.unit_prices = {}
+        for name, unit_prices in price_table.get('prices', {}).items():
+            canonical = self.normalizer.canonical_name(name)
+            self.unit_prices[canonical] = unit_prices
+            self.normalizer.get_ingredient_id(canonical)
+
+    def _get_row(self, ingredient_id: int, base_unit: str) -> int:
+        """Get (or create) the price-matrix row for an ingredient in a base unit"""
+        key = (ingredient_id, base_unit)
+        row = self.row_index.get(key)
+        if row is not None:
+            return row
+
+        with self._rows_lock:
+            row = self.row_index.get(key)
+            if row is None:
+                row = len(self.row_keys)
+                self._price_rows.append(self._lookup_prices(self.normalizer.ingredient_name(ingredient_id), base_unit))
+                self.row_keys.append(key)
+                self.row_index[key] = row
+        return row
+
+    def _lookup_prices(self, name: str, base_unit: str) -> List[float]:
+        """Explicit price if the table has one, otherwise the department default"""
+        explicit = self.unit_prices.get(name, {})
+        if base_unit in explicit:
+            return explicit[base_unit]
+
+        department = self.combiner.get_department(name)
+        for defaults in (self.department_defaults.get(department, {}), self.department_defaults.get('other', {})):
+            if base_unit in defaults:
+                return defaults[base_unit]
+
+        return [0.0] * len(self.stores)
+
+    def _current_price_matrix(self) -> np.ndarray:
+        """Price matrix (rows x stores), extended with any rows added since the last call"""
+        matrix = self.price_matrix
+        if len(matrix) < len(self._price_rows):
+            with self._rows_lock:
+                new_rows = np.array(self._price_rows[len(self.price_matrix):], dtype=np.float64)
+                self.price_matrix = np.vstack([self.price_matrix, new_rows.reshape(-1, len(self.stores))])
+                matrix = self.price_matrix
+        return matrix
+
+    def quantity_matrix(self, recipe_lists: List[List[Dict]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Base-unit quantities for each list (lists x price rows) and the matching price matrix
+
+        Items in the shared vocabulary use the cached price rows; items first
+        seen in this batch get rows after them that exist for this call only.
+        """
+        vocabulary = self.normalizer.job()
+        local_rows = {}                     # (job-local id, base_unit) -> row past the shared rows
+        local_prices = []
+        list_indices = []
+        rows = []
+        is_local = []
+        quantities = []
+        for list_index, recipes in enumerate(recipe_lists):
+            for recipe in recipes:
+                for ingredient_id, base_unit, quantity in vocabulary.parse_recipe(recipe):
+                    if vocabulary.is_shared(ingredient_id):
+                        row = self._get_row(ingredient_id, base_unit)
+                    else:
+                        row = local_rows.get((ingredient_id, base_unit))
+                        if row is None:
+                            row = local_rows[(ingredient_id, base_unit)] = len(local_prices)
+                            local_prices.append(self._lookup_prices(vocabulary.ingredient_name(ingredient_id), base_unit))
+                    list_indices.append(list_index)
+                    rows.append(row)
+                    is_local.append(not vocabulary.is_shared(ingredient_id))
+                    quantities.append(quantity)
+
+        # Every shared row used above is in the current matrix; job rows go after it
+        prices = self._current_price_matrix()
+        rows = np.array(rows, dtype=np.int64)
+        rows[np.array(is_local, dtype=bool)] += len(prices)
+        prices = np.vstack([prices, np.array(local_prices, dtype=np.float64).reshape(-1, len(self.stores))])
+
+        matrix = np.zeros((len(recipe_lists), len(prices)))
+        np.add.at(matrix, (np.array(list_indices, dtype=np.int64), rows), np.array(quantities, dtype=np.float64))
+        return matrix, prices
+
+    def price_batch(self, recipe_lists: List[List[Dict]]) -> List[Dict[str, Any]]:
+        """Price many grocery lists with a single matrix multiply"""
+        quantities, prices = self.quantity_matrix(recipe_lists)
+        store_totals = quantities @ prices
+
+        return [self._summarize(totals) for totals in store_totals]
+
+    def price_recipes(self, recipes: List[Dict]) -> Dict[str, Any]:
+        """Price a single grocery list"""
+        return self.price_batch([recipes])[0]
+
+    def _summarize(self, totals: np.ndarray) -> Dict[str, Any]:
+        """Per-store totals, cheapest store and the low/high range string"""
+        if len(totals) == 0:
+            return {'store_totals': {}, 'cheapest_store': None, 'cheapest_total': 0.0,
+                    'estimated_cost_range': "$0 - $0", 'currency': self.currency}
+
+        cheapest = int(np.argmin(totals))
+        return {
+            'store_totals': {store: round(float(total), 2) for store, total in zip(self.stores, totals)},
+            'cheapest_store': self.stores[cheapest],
+            'cheapest_total': round(float(totals[cheapest]), 2),
+            'estimated_cost_range': f"${totals.min():.0f} - ${totals.max():.0f}",
+            'currency': self.currency
+        }
+
+if __name__ == "__main__":
+    import time
+
+    model = PriceModel()
+
+    sample_recipes = [
+        {
+            "name": "Chicken Stir Fry",
+            "ingredients": ["1 lb chicken breast", "2 cups broccoli", "1 cup rice", "2 tbsp soy sauce"]
+        },
+        {
+            "name": "Salmon Bowl",
+            "ingredients": ["1 lb salmon fillet", "1 cup quinoa", "1 cup broccoli", "1 tbsp olive oil"]
+        }
+    ]
+
+    result = model.price_recipes(sample_recipes)
+    print(f"Store totals: {result['store_totals']}")
+    print(f"Cheapest store: {result['cheapest_store']} (${result['cheapest_total']:.2f})")
+    print(f"Estimated cost: {result['estimated_cost_range']}")
+
+    batch = [sample_recipes] * 10000
+    start = time.time()
+    model.price_batch(batch)
+    print(f"Priced {len(batch)} lists in {time.time() - start:.3f}s")
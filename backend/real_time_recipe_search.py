@@ -5,19 +5,34 @@ Searches cooking websites for fresh gluten-free recipes in real-time
 Excludes mushrooms per user preference
 """
 
-import random
 import re
 from typing import List, Dict, Any
+import numpy as np
+from recipe_catalog import get_catalog, catalog_data
+from recipe_record import RecipeOverlay
+from columnar_catalog import ColumnarCatalog
+from hot_reload import reloader
+
+def build_web_recipe_index() -> Dict[str, Any]:
+    """Web recipes from the catalog with their ingredient posting lists and code columns"""
+    catalog = get_catalog()
+    recipes = catalog.source('web')
+    return {
+        'recipes': recipes,
+        # Ingredient -> recipe posting lists for include/exclude filters, read from the catalog's mapping
+        'ingredient_index': catalog.ingredient_index('web'),
+        # Categorical code columns, so protein/cuisine filters and variety quotas are array operations
+        'columns': ColumnarCatalog(recipes)
+    }
+
+# Rebuilt off to the side whenever the catalog is reloaded
+web_recipe_index = reloader.register('web_recipe_index', build_web_recipe_index, depends_on=[catalog_data])
 
 class RealTimeRecipeSearch:
-    def __init__(self):
-        # User preferences
-        self.excluded_ingredients = ['mushrooms', 'mushroom']
-        self.required_components = ['protein', 'vegetables', 'starch']
-        self.dietary_restrictions = ['gluten-free']
-        
-        # Recipe sources from web searches
-        self.web_recipe_sources = [
+    @staticmethod
+    def source_recipes():
+        """Recipes found by web searches (catalog build input)"""
+        return [
             # Chicken recipes from search results
             {
                 'id': 'gluten_free_chicken_rice_casserole',
@@ -368,93 +383,45 @@ class RealTimeRecipeSearch:
                 ]
             }
         ]
+
+    def __init__(self):
+        # User preferences
+        self.excluded_ingredients = ['mushrooms', 'mushroom']
+        self.required_components = ['protein', 'vegetables', 'starch']
+        self.dietary_restrictions = ['gluten-free']
+        
+    @property
+    def web_recipe_sources(self):
+        """Recipe sources from web searches, served from the live recipe catalog"""
+        return web_recipe_index.current['recipes']
     
     def search_fresh_recipes(self, count=20, protein_filter=None, cuisine_filter=None):
         """Search for fresh recipes from web sources"""
         try:
-            # Get all available recipes
-            available_recipes = self.web_recipe_sources.copy()
+            # One index version for the whole search, even if a reload swaps it meanwhile
+            index = web_recipe_index.current
+            columns = index['columns']
             
-            # Filter out recipes with excluded ingredients
-            filtered_recipes = []
-            for recipe in available_recipes:
-                has_excluded = False
-                
-                # Check ingredients list
-                for ingredient in recipe.get('ingredients', []):
-                    for excluded in self.excluded_ingredients:
-                        if excluded.lower() in ingredient.lower():
-                            has_excluded = True
-                            break
-                    if has_excluded:
-                        break
-                
-                # Check vegetables field
-                vegetables = recipe.get('vegetables', '').lower()
-                for excluded in self.excluded_ingredients:
-                    if excluded.lower() in vegetables:
-                        has_excluded = True
-                        break
-                
-                if not has_excluded:
-                    filtered_recipes.append(recipe)
+            # Recipes without excluded ingredients, straight from the posting lists
+            mask = np.zeros(len(columns), dtype=bool)
+            mask[index['ingredient_index'].query(exclude=self.excluded_ingredients, partial=True)] = True
             
             # Apply additional filters if specified
-            if protein_filter:
-                filtered_recipes = [r for r in filtered_recipes if r.get('protein') == protein_filter]
+            mask &= columns.mask(protein=protein_filter or None, cuisine=cuisine_filter or None)
             
-            if cuisine_filter:
-                filtered_recipes = [r for r in filtered_recipes if r.get('cuisine') == cuisine_filter]
+            # Random selection with protein and cuisine variety (max 3 per protein, 4 per cuisine)
+            rows = columns.sample(mask, count, quotas={'protein': 3, 'cuisine': 4})
             
-            # Shuffle for randomness
-            random.shuffle(filtered_recipes)
-            
-            # Ensure variety in proteins and cuisines
-            selected_recipes = self._ensure_variety(filtered_recipes, count)
-            
-            # Add metadata
-            for recipe in selected_recipes:
-                recipe['source'] = 'web_search'
-                recipe['freshness'] = 'high'
-                recipe['search_timestamp'] = 'real_time'
-            
-            return selected_recipes
+            # Add metadata (in a per-request overlay, the catalog records stay untouched)
+            return [
+                RecipeOverlay(recipe, source='web_search', freshness='high', search_timestamp='real_time')
+                for recipe in columns.recipes_for(rows)
+            ]
             
         except Exception as e:
             print(f"Error in fresh recipe search: {e}")
             return []
     
-    def _ensure_variety(self, recipes: List[Dict], count: int) -> List[Dict]:
-        """Ensure protein and cuisine variety in recipe selection"""
-        selected = []
-        protein_counts = {}
-        cuisine_counts = {}
-        
-        # First pass: select recipes with variety constraints
-        for recipe in recipes:
-            if len(selected) >= count:
-                break
-                
-            protein = recipe.get('protein', 'unknown')
-            cuisine = recipe.get('cuisine', 'unknown')
-            
-            protein_count = protein_counts.get(protein, 0)
-            cuisine_count = cuisine_counts.get(cuisine, 0)
-            
-            # Limit each protein to max 3 recipes and each cuisine to max 4
-            if protein_count < 3 and cuisine_count < 4:
-                selected.append(recipe)
-                protein_counts[protein] = protein_count + 1
-                cuisine_counts[cuisine] = cuisine_count + 1
-        
-        # Second pass: fill remaining slots if needed
-        if len(selected) < count:
-            remaining = [r for r in recipes if r not in selected]
-            random.shuffle(remaining)
-            selected.extend(remaining[:count - len(selected)])
-        
-        return selected[:count]
-    
     def get_recipe_stats(self, recipes: List[Dict]) -> Dict:
         """Get statistics about recipe variety"""
         protein_counts = {}
@@ -497,7 +464,7 @@ if __name__ == "__main__":
     print("\nSample recipes:")
     for i, recipe in enumerate(recipes[:5]):
         print(f"{i+1}. {recipe['name']}")
-        print(f"   {recipe['protein']} • {recipe['vegetables']} • {recipe['starch']}")
+        print(f"   {recipe['protein']} • {', '.join(recipe['vegetables'])} • {recipe['starch']}")
         print(f"   {recipe['cuisine']} • {recipe['cooking_method']} • {recipe['url']}")
         print()
     
@@ -509,7 +476,7 @@ if __name__ == "__main__":
                 mushroom_found = True
                 print(f"WARNING: Found mushroom in {recipe['name']}: {ingredient}")
         
-        if 'mushroom' in recipe.get('vegetables', '').lower():
+        if any('mushroom' in vegetable.lower() for vegetable in recipe['vegetables']):
             mushroom_found = True
             print(f"WARNING: Found mushroom in {recipe['name']} vegetables")
     
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Recipe Catalog Service
+One catalog built from every static recipe source in the tree: the curated
+engine recipes, real-time web recipes, expanded and simple generator
+templates, sample_recipes.json and equipment_recipes.json. The user recipe
+database is mutable and stays with RecipeManager, never in the catalog.
+
+The build step canonicalizes every recipe, merges duplicates (same name)
+across sources, assigns content-addressed ids (see recipe_schema.recipe_id)
+and writes a single binary artifact (recipe_catalog.bin): a small JSON header
+with ids, names, aliases and source memberships, int32 code columns, text
+and ingredient index postings, the overlap matrix (ingredient bitset word
+rows and the shared-count triangle), and the compact records addressed by
+an offsets array.
+
+The artifact is memory-mapped read-only, so worker processes share one copy
+of the records, columns, postings and bitsets through the page cache.
+Loading is a header parse, records are decoded only when first read (their
+cold fields are parsed again from the mapping when asked for, never copied),
+and detail responses can be sliced straight out of the mapping. Generators and routes read their
+recipes from the loaded catalog instead of keeping their own copies; legacy
+ids from the sources ('expanded_001', 'simple_002', 'recipe_004', ...)
+resolve through an alias table. Run `python recipe_catalog.py build` to
+rebuild the artifact; it is also rebuilt automatically when a source file is
+newer than it, and the hot reloader swaps in the new catalog.
+"""
+
+import os
+import re
+import json
+import hashlib
+import mmap
+import struct
+import threading
+import numpy as np
+from collections.abc import Sequence
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from recipe_schema import canonical_recipe, recipe_id, content_id
+from recipe_record import Recipe, BufferColdStore
+from recipe_text_index import RecipeTextIndex
+from recipe_facet_index import RecipeFacetIndex
+from recipe_overlap_matrix import RecipeOverlapMatrix
+from ingredient_inverted_index import IngredientInvertedIndex
+from hot_reload import reloader
+from data_versions import data_versions, recipe_dependency, CATALOG
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOG_PATH = os.environ.get('RECIPE_CATALOG_PATH', os.path.join(BACKEND_DIR, 'recipe_catalog.bin'))
+CATALOG_FORMAT = 4
+CATALOG_MAGIC = b'RCATALOG'
+HEADER_PREFIX = struct.Struct('<8sQ')                    # magic, header length
+
+# Columns stored as int32 arrays in the artifact
+CATEGORICAL_COLUMNS = ['protein', 'cuisine', 'cooking_method', 'difficulty', 'source']
+MINUTE_COLUMNS = ['prep_time', 'cook_time']
+
+# Build order: when the same recipe comes from several sources the first one supplies its fields
+SOURCES = ['curated', 'web', 'expanded', 'simple', 'sample', 'equipment']
+
+# Files whose changes make a built artifact stale
+SOURCE_FILES = [
+    'recipe_search_engine.py', 'real_time_recipe_search.py', 'expanded_recipe_generator.py',
+    'simple_recipe_generator.py', 'sample_recipes.json', 'equipment_recipes.json',
+    'recipe_schema.py', 'recipe_text_index.py', 'recipe_catalog.py', 'ingredient_normalizer.py',
+    'ingredient_inverted_index.py', 'recipe_overlap_matrix.py'
+]
+
+# Ids the generators used to hand out, by position in their template lists
+LEGACY_ID_PREFIXES = {'expanded': 'expanded', 'simple': 'simple'}
+
+# Source label the generators used to stamp on their templates
+DEFAULT_SOURCE_LABELS = {'expanded': 'curated', 'simple': 'curated'}
+
+def catalog_key(name: str) -> str:
+    """Dedupe key for a recipe name: 'Salt & Pepper Fish' -> 'salt_and_pepper_fish'"""
+    name = str(name or '').lower().replace('&', ' and ')
+    return re.sub(r'[^a-z0-9]+', '_', name).strip('_')
+
+def _load_json(filename: str):
+    path = os.path.join(BACKEND_DIR, filename)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+def _flatten(templates: Dict[str, List[Dict]]) -> List[Dict]:
+    return [template for group in templates.values() for template in group]
+
+def collect_sources() -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Raw recipes of every source, in build order"""
+    # Imported here: these modules read the catalog themselves once it exists
+    from recipe_search_engine import RecipeSearchEngine
+    from real_time_recipe_search import RealTimeRecipeSearch
+    from expanded_recipe_generator import ExpandedRecipeGenerator
+    from simple_recipe_generator import SimpleRecipeGenerator
+
+    return [
+        ('curated', RecipeSearchEngine.source_recipes()),
+        ('web', RealTimeRecipeSearch.source_recipes()),
+        ('expanded', _flatten(ExpandedRecipeGenerator.source_recipes())),
+        ('simple', _flatten(SimpleRecipeGenerator.source_recipes())),
+        ('sample', _load_json('sample_recipes.json')),
+        ('equipment', _load_json('equipment_recipes.json'))
+    ]
+
+def build_catalog(sources: Optional[List[Tuple[str, List[Dict[str, Any]]]]] = None) -> Dict[str, Any]:
+    """
+    Merge sources into one catalog artifact
+
+    Recipes with the same catalog key are one catalog entry: fields come from
+    the first source that has the recipe, and fields it lacks are filled from
+    later ones. The entry id is the content id of that first copy; the ids
+    of every other copy become aliases. Every source keeps the list of entries it contributed, in its
+    own order.
+    """
+    sources = collect_sources() if sources is None else sources
+
+    recipes = []
+    positions = {}                      # dedupe key -> position
+    source_positions = {}               # source -> [positions]
+    aliases = {}                        # legacy or per-source id -> catalog id
+    used_ids = set()
+
+    for source, raw_recipes in sources:
+        members = source_positions.setdefault(source, [])
+        for number, raw in enumerate(raw_recipes, 1):
+            record = canonical_recipe(raw)
+            key = catalog_key(record.get('name'))
+            if not key:
+                continue
+
+            position = positions.get(key)
+            if position is None:
+                catalog_id = recipe_id(record)
+                if catalog_id in used_ids:
+                    # Two recipes sharing one link stay apart
+                    catalog_id = content_id(record)
+                used_ids.add(catalog_id)
+                if source in DEFAULT_SOURCE_LABELS:
+                    record.setdefault('source', DEFAULT_SOURCE_LABELS[source])
+                position = positions[key] = len(recipes)
+                legacy_id = record.pop('id', None)
+                recipes.append({'id': catalog_id, **record, 'catalog_sources': [source]})
+            else:
+                entry = recipes[position]
+                catalog_id = entry['id']
+                legacy_id = record.pop('id', None)
+                for field, value in record.items():
+                    if value not in (None, '', []) and entry.get(field) in (None, '', []):
+                        entry[field] = value
+                if source not in entry['catalog_sources']:
+                    entry['catalog_sources'].append(source)
+
+            # Old ids of this copy keep resolving: its own id, the generator numbering, the
+            # name slug ids of earlier catalogs, and the content id this copy has on its own
+            legacy_ids = [legacy_id, key, recipe_id(record)]
+            if source in LEGACY_ID_PREFIXES:
+                legacy_ids.append(f"{LEGACY_ID_PREFIXES[source]}_{number:03d}")
+            for alias in legacy_ids:
+                if alias and alias != catalog_id:
+                    aliases.setdefault(alias, catalog_id)
+
+            if position not in members:
+                members.append(position)
+
+    content = json.dumps(recipes, sort_keys=True, separators=(',', ':'))
+    return {
+        'format': CATALOG_FORMAT,
+        'version': hashlib.sha256(content.encode('utf-8')).hexdigest()[:16],
+        'built_at': datetime.now().isoformat(),
+        'recipes': recipes,
+        'sources': source_positions,
+        'aliases': aliases
+    }
+
+def _column_values(recipes: List[Dict[str, Any]]) -> Dict[str, Tuple[List[str], np.ndarray]]:
+    """Categorical columns as (values, int32 codes) and minute columns as int32 (-1 when unknown)"""
+    columns = {}
+    for column in CATEGORICAL_COLUMNS:
+        values, codes = [], {}
+        column_codes = np.empty(len(recipes), dtype=np.int32)
+        for row, recipe in enumerate(recipes):
+            value = recipe.get(column) or ''
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(values)
+                values.append(value)
+            column_codes[row] = code
+        columns[column] = (values, column_codes)
+    for column in MINUTE_COLUMNS:
+        columns[column] = (None, np.array([recipe.get(column, -1) for recipe in recipes], dtype=np.int32))
+    return columns
+
+def encode_catalog(artifact: Dict[str, Any]) -> bytes:
+    """
+    Binary artifact: MAGIC, header length, JSON header, then 8-byte aligned arrays
+
+    The header holds ids, names, aliases, source memberships, the text index
+    terms and the ingredient names of both ingredient structures; the arrays
+    are the record offsets (uint64), one int32 column per categorical and
+    minute field, the text index postings (offsets, docs, frequencies,
+    document lengths), the ingredient index postings (offsets, recipe
+    positions), the overlap matrix (row keys, lengths, uint64 word rows
+    flattened, uint8 triangle) and the concatenated compact JSON records.
+    """
+    recipes = artifact['recipes']
+    blobs = [json.dumps(recipe, separators=(',', ':')).encode('utf-8') for recipe in recipes]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(blob) for blob in blobs], dtype=np.uint64)
+
+    arrays = [('offsets', offsets)]
+    values = {}
+    for column, (column_values, codes) in _column_values(recipes).items():
+        arrays.append((column, codes))
+        if column_values is not None:
+            values[column] = column_values
+
+    terms, term_offsets, docs, frequencies, doc_lengths = RecipeTextIndex(recipes).export_postings()
+    arrays += [('text_offsets', term_offsets), ('text_docs', docs),
+               ('text_frequencies', frequencies), ('text_doc_lengths', doc_lengths)]
+
+    ingredient_names, ingredient_offsets, ingredient_numbers = IngredientInvertedIndex(recipes=recipes).export_postings()
+    arrays += [('ingredient_offsets', ingredient_offsets), ('ingredient_numbers', ingredient_numbers)]
+
+    overlap = RecipeOverlapMatrix(recipes, max_recipes=max(len(recipes), RecipeOverlapMatrix.DEFAULT_MAX_RECIPES))
+    overlap_ingredients, overlap_keys, overlap_lengths, overlap_words, overlap_triangle = overlap.export_arrays()
+    arrays += [('overlap_keys', overlap_keys), ('overlap_lengths', overlap_lengths),
+               ('overlap_words', overlap_words.reshape(-1)), ('overlap_triangle', overlap_triangle)]
+
+    layout = {}
+    chunks = []
+    position = 0
+    for name, data in arrays:
+        layout[name] = [data.dtype.str, position, len(data)]
+        chunk = data.tobytes()
+        chunks.append(chunk + b'\0' * (-len(chunk) % 8))
+        position += len(chunks[-1])
+    layout['records'] = ['|u1', position, int(offsets[-1])]
+    chunks.extend(blobs)
+
+    header = json.dumps({
+        'format': CATALOG_FORMAT,
+        'version': artifact['version'],
+        'built_at': artifact['built_at'],
+        'count': len(recipes),
+        'ids': [recipe['id'] for recipe in recipes],
+        'names': [recipe['name'] for recipe in recipes],
+        'aliases': artifact['aliases'],
+        'sources': artifact['sources'],
+        'values': values,
+        'text_terms': terms,
+        'ingredient_names': ingredient_names,
+        'overlap_ingredients': overlap_ingredients,
+        'overlap_word_count': overlap_words.shape[1],
+        'layout': layout
+    }, separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-(len(header) + HEADER_PREFIX.size) % 8)
+    return HEADER_PREFIX.pack(CATALOG_MAGIC, len(header)) + header + b''.join(chunks)
+
+def _write_atomic(data: bytes, path: str):
+    """Readers never see a half-written artifact"""
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def write_catalog(artifact: Dict[str, Any], path: str = CATALOG_PATH):
+    _write_atomic(encode_catalog(artifact), path)
+
+class CatalogRecords(Sequence):
+    """Read-only list of catalog records by position; records are decoded on first access"""
+
+    __slots__ = ('catalog', 'positions')
+
+    def __init__(self, catalog: 'RecipeCatalog', positions: Sequence):
+        self.catalog = catalog
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.catalog.record(position) for position in self.positions[index]]
+        return self.catalog.record(self.positions[index])
+
+    def __iter__(self) -> Iterator[Recipe]:
+        record = self.catalog.record
+        for position in self.positions:
+            yield record(position)
+
+    def __repr__(self):
+        return f"CatalogRecords({len(self.positions)} recipes)"
+
+class RecipeCatalog:
+    """
+    Loaded binary catalog: ids, names, aliases and code columns are available
+    immediately; each Recipe record is decoded from the buffer the first time
+    it is read and then shared
+    """
+
+    def __init__(self, buffer: bytes):
+        magic, header_length = HEADER_PREFIX.unpack_from(buffer, 0)
+        if magic != CATALOG_MAGIC:
+            raise ValueError("Not a recipe catalog artifact")
+        data_start = HEADER_PREFIX.size + header_length
+        header = json.loads(bytes(buffer[HEADER_PREFIX.size:data_start]))
+        if header.get('format') != CATALOG_FORMAT:
+            raise ValueError(f"Unsupported recipe catalog format {header.get('format')}")
+
+        self._buffer = buffer
+        self.nbytes = len(buffer)
+        self.version = header['version']
+        self.built_at = header.get('built_at')
+        self.ids = header['ids']
+        self.names = header['names']
+        self.aliases = header['aliases']
+        self.values = header['values']                     # categorical column -> code -> value
+        self.positions = {recipe_id: position for position, recipe_id in enumerate(self.ids)}
+        self.name_positions = {catalog_key(name): position for position, name in enumerate(self.names)}
+        self._sources = header['sources']
+
+        arrays = {}
+        for name, (dtype, offset, count) in header['layout'].items():
+            arrays[name] = np.frombuffer(buffer, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+        self._records_start = data_start + header['layout']['records'][1]
+        self._offsets = arrays['offsets']
+        self._arrays = arrays
+        self._text_terms = header['text_terms']
+        self._ingredient_names = header['ingredient_names']
+        self._overlap_ingredients = header['overlap_ingredients']
+        self._overlap_word_count = header['overlap_word_count']
+        # column -> int32 array by position (views into the buffer)
+        self.columns = {column: arrays[column] for column in CATEGORICAL_COLUMNS + MINUTE_COLUMNS}
+
+        # Cold fields are read back from the records in the buffer, not copied into process memory
+        self.cold_store = BufferColdStore(self.record_bytes)
+        self._records = [None] * header['count']
+        self._decode_lock = threading.Lock()
+        self._overlap_matrix = None
+        self._overlap_lock = threading.Lock()
+        self.recipes = CatalogRecords(self, range(header['count']))
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self.recipes)
+
+    def record(self, position: int) -> Recipe:
+        """Shared Recipe at a catalog position, decoded from the buffer on first use"""
+        recipe = self._records[position]
+        if recipe is None:
+            with self._decode_lock:
+                recipe = self._records[position]
+                if recipe is None:
+                    record = json.loads(self.record_bytes(position))
+                    recipe = self._records[position] = Recipe(record, self.cold_store, entry=position)
+        return recipe
+
+    def position(self, recipe_id: str) -> Optional[int]:
+        """Catalog position of a catalog or legacy id"""
+        return self.positions.get(self.resolve_id(recipe_id))
+
+    def column_value(self, column: str, position: int) -> str:
+        return self.values[column][self.columns[column][position]]
+
+    def record_bytes(self, position: int) -> bytes:
+        """Compact JSON of one record, sliced straight out of the artifact buffer"""
+        start = self._records_start + int(self._offsets[position])
+        end = self._records_start + int(self._offsets[position + 1])
+        return bytes(self._buffer[start:end])
+
+    def text_index(self) -> RecipeTextIndex:
+        """BM25 index over the whole catalog, reading its postings from the buffer"""
+        return RecipeTextIndex.from_postings(self.recipes, self._text_terms, self._arrays['text_offsets'],
+                                             self._arrays['text_docs'], self._arrays['text_frequencies'],
+                                             self._arrays['text_doc_lengths'])
+
+    def facet_index(self) -> RecipeFacetIndex:
+        """Facet index over the whole catalog, on the buffer's code columns"""
+        return RecipeFacetIndex.from_columns(self.recipes, self.values, self.columns)
+
+    def ingredient_index(self, source: Optional[str] = None) -> IngredientInvertedIndex:
+        """
+        Ingredient posting lists read from the buffer: over the whole catalog,
+        or over one source with recipes numbered in that source's order
+        """
+        records = self.recipes if source is None else self.source(source)
+        return IngredientInvertedIndex.from_postings(
+            records, self._ingredient_names, self._arrays['ingredient_offsets'], self._arrays['ingredient_numbers'],
+            positions=None if source is None else records.positions)
+
+    def overlap_matrix(self) -> RecipeOverlapMatrix:
+        """Shared-ingredient matrix whose rows are catalog positions, on the buffer's arrays; shared once made"""
+        if self._overlap_matrix is None:
+            with self._overlap_lock:
+                if self._overlap_matrix is None:
+                    arrays = self._arrays
+                    words = arrays['overlap_words'].reshape(len(self._records), self._overlap_word_count)
+                    self._overlap_matrix = RecipeOverlapMatrix.from_arrays(
+                        self._overlap_ingredients, arrays['overlap_keys'], arrays['overlap_lengths'], words,
+                        arrays['overlap_triangle'])
+        return self._overlap_matrix
+
+    @property
+    def source_names(self) -> List[str]:
+        return list(self._sources)
+
+    def source(self, name: str) -> CatalogRecords:
+        """Catalog records contributed by one source, in that source's order"""
+        return CatalogRecords(self, self._sources.get(name, []))
+
+    def source_groups(self, name: str, column: str) -> Dict[str, CatalogRecords]:
+        """A source's records grouped by a categorical column, without decoding any record"""
+        codes = self.columns[column]
+        groups = {}
+        for position in self._sources.get(name, []):
+            groups.setdefault(self.values[column][codes[position]], []).append(position)
+        return {value: CatalogRecords(self, positions) for value, positions in groups.items()}
+
+    def resolve_id(self, recipe_id: str) -> Optional[str]:
+        """Catalog id for a catalog or legacy id"""
+        if recipe_id in self.positions:
+            return recipe_id
+        return self.aliases.get(recipe_id)
+
+    def get(self, recipe_id: str) -> Optional[Recipe]:
+        position = self.position(recipe_id)
+        return self.record(position) if position is not None else None
+
+    def find_by_name(self, name: str) -> Optional[Recipe]:
+        position = self.name_positions.get(catalog_key(name))
+        return self.record(position) if position is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'built_at': self.built_at,
+            'total_recipes': len(self._records),
+            'decoded_recipes': sum(1 for recipe in self._records if recipe is not None),
+            'artifact_bytes': self.nbytes,
+            'memory_mapped': isinstance(self._buffer, mmap.mmap),
+            'sources': {source: len(members) for source, members in self._sources.items()},
+            'legacy_aliases': len(self.aliases)
+        }
+
+def _artifact_is_stale(path: str) -> bool:
+    try:
+        built = os.path.getmtime(path)
+    except OSError:
+        return True
+    for filename in SOURCE_FILES:
+        try:
+            if os.path.getmtime(os.path.join(BACKEND_DIR, filename)) > built:
+                return True
+        except OSError:
+            continue
+    return False
+
+def _map_file(path: str) -> mmap.mmap:
+    """Read-only shared mapping: every worker process maps the same page-cache pages"""
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def load_catalog(path: str = CATALOG_PATH, rebuild: bool = False) -> RecipeCatalog:
+    """
+    Map the artifact read-only, building (and trying to write) it first when
+    missing, stale or unreadable. A build that cannot be written is served
+    from process memory instead.
+    """
+    if not rebuild and not _artifact_is_stale(path):
+        try:
+            return RecipeCatalog(_map_file(path))
+        except (ValueError, struct.error) as e:
+            print(f"Rebuilding recipe catalog {path}: {e}")
+
+    data = encode_catalog(build_catalog())
+    try:
+        _write_atomic(data, path)
+        return RecipeCatalog(_map_file(path))
+    except OSError as e:
+        print(f"Recipe catalog not written to {path}: {e}")
+    return RecipeCatalog(data)
+
+# Process-wide catalog; replaced by the hot reloader when the artifact or a data source changes.
+# The old mapping stays valid for readers still holding it (os.replace keeps its inode alive)
+catalog_data = reloader.register(
+    'recipe_catalog', load_catalog,
+    paths=[os.path.join(BACKEND_DIR, f) for f in SOURCE_FILES if f.endswith('.json')],
+    outputs=[CATALOG_PATH]          # rewritten by load_catalog itself when a source changes
+)
+
+@catalog_data.on_reload
+def bump_catalog_versions(old: Optional['RecipeCatalog'], new: 'RecipeCatalog'):
+    """New catalog version, plus new versions for recipes whose records changed or went away"""
+    changed = []
+    if old is not None:
+        for recipe_id, position in old.positions.items():
+            new_position = new.positions.get(recipe_id)
+            if new_position is None or new.record_bytes(new_position) != old.record_bytes(position):
+                changed.append(recipe_dependency(recipe_id))
+    data_versions.bump(CATALOG, *changed)
+
+@catalog_data.on_reload
+def carry_added_recipes(old: Optional['RecipeCatalog'], new: 'RecipeCatalog'):
+    """Recipes users added stay in the overlap matrix of the new catalog"""
+    if old is not None and old._overlap_matrix is not None:
+        new.overlap_matrix().extend(old._overlap_matrix.added_recipes)
+
+def get_catalog() -> RecipeCatalog:
+    """The live catalog; hold on to the returned object for the rest of a request"""
+    return catalog_data.current
+
+def recipe_dependencies(recipes: List[Dict[str, Any]], content_keys: List[str],
+                        catalog: Optional[RecipeCatalog] = None) -> List[Tuple[str, str]]:
+    """
+    Version dependencies for recipes sent with a request
+
+    Catalog reloads bump recipes under their catalog id, so the id a request
+    carries (often a legacy id or a database copy's id) and, failing that, the
+    recipe's content id are resolved through the catalog. Recipes outside the
+    catalog depend on their content key.
+    """
+    catalog = catalog or get_catalog()
+    dependencies = []
+    for recipe, key in zip(recipes, content_keys):
+        catalog_id = catalog.resolve_id(recipe.get('id')) or catalog.resolve_id(key)
+        dependencies.append(recipe_dependency(catalog_id or key))
+    return dependencies
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        start = time.time()
+        artifact = build_catalog()
+        write_catalog(artifact)
+        print(f"Built {len(artifact['recipes'])} recipes (version {artifact['version']}) "
+              f"into {CATALOG_PATH} in {time.time() - start:.2f}s")
+
+    start = time.time()
+    catalog = load_catalog()
+    print(f"Loaded catalog in {(time.time() - start) * 1000:.1f}ms: {catalog.stats()}")
+    print(f"Proteins of expanded templates: { {p: len(r) for p, r in catalog.source_groups('expanded', 'protein').items()} }")
+    for legacy_id in ['expanded_001', 'simple_002', 'recipe_004']:
+        recipe = catalog.get(legacy_id)
+        print(f"  {legacy_id} -> {recipe['id'] if recipe else None} ({recipe['name'] if recipe else ''})")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Recipe Facet Index
+Faceted filtering over the whole catalog: each facet dimension is a column of
+integer codes, a filter is a boolean mask, and facet counts are bincounts.
+Results are cached per filter tuple and keyed by the catalog version, so a
+repeated query costs a dictionary lookup until recipes are added
+"""
+
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+class RecipeFacetIndex:
+    DIMENSIONS = ['protein', 'cuisine', 'cooking_method']
+
+    def __init__(self, recipes: List[Dict] = None, max_cached_queries=512):
+        self.recipes = []
+        self.version = 0                                    # bumped on every change to the catalog
+        self.values = {d: [] for d in self.DIMENSIONS}      # dimension -> code -> value
+        self.codes = {d: {} for d in self.DIMENSIONS}       # dimension -> value -> code
+        self.columns = {d: np.zeros(0, dtype=np.int32) for d in self.DIMENSIONS}
+
+        self.max_cached_queries = max_cached_queries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        if recipes:
+            self.add_recipes(recipes)
+
+    @classmethod
+    def from_columns(cls, recipes, values: Dict[str, List[str]], columns: Dict[str, np.ndarray],
+                     max_cached_queries=512) -> 'RecipeFacetIndex':
+        """Index over prebuilt code columns (e.g. views into the catalog buffer); nothing is re-encoded"""
+        index = cls(max_cached_queries=max_cached_queries)
+        index.recipes = recipes
+        for dimension in cls.DIMENSIONS:
+            index.values[dimension] = [index.normalize(value) for value in values[dimension]]
+            index.codes[dimension] = {value: code for code, value in enumerate(index.values[dimension])}
+            index.columns[dimension] = columns[dimension]
+        index.version = 1
+        return index
+
+    @staticmethod
+    def normalize(value: Any) -> str:
+        return str(value or '').strip().lower()
+
+    def add_recipes(self, recipes: List[Dict]):
+        """Append recipes and bump the catalog version (cached results are dropped)"""
+        with self._lock:
+            if not isinstance(self.recipes, list):
+                self.recipes = list(self.recipes)
+            for dimension in self.DIMENSIONS:
+                codes = self.codes[dimension]
+                values = self.values[dimension]
+                new_codes = np.empty(len(recipes), dtype=np.int32)
+                for row, recipe in enumerate(recipes):
+                    value = self.normalize(recipe.get(dimension))
+                    code = codes.get(value)
+                    if code is None:
+                        code = codes[value] = len(values)
+                        values.append(value)
+                    new_codes[row] = code
+                self.columns[dimension] = np.concatenate([self.columns[dimension], new_codes])
+
+            self.recipes.extend(recipes)
+            self.version += 1
+            self._cache.clear()
+
+    def search(self, filters: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        """
+        Matching catalog positions (catalog order) plus facet counts
+
+        Facet counts for a dimension apply every filter except that
+        dimension's own, so the UI can show what switching it would return.
+        """
+        normalized = tuple((d, self.normalize(filters.get(d))) for d in self.DIMENSIONS)
+
+        with self._lock:
+            version = self.version
+            cache_key = (version, normalized)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+            # Columns are replaced (never mutated) and codes only grow, so a snapshot of references is enough
+            columns = dict(self.columns)
+            codes = self.codes
+            values = {d: self.values[d][:] for d in self.DIMENSIONS}
+
+        row_count = len(next(iter(columns.values())))
+        masks = {}
+        for dimension, value in normalized:
+            if value:
+                code = codes[dimension].get(value)
+                masks[dimension] = columns[dimension] == code if code is not None else np.zeros(row_count, dtype=bool)
+
+        matches = np.ones(row_count, dtype=bool)
+        for mask in masks.values():
+            matches &= mask
+
+        facets = {}
+        for dimension in self.DIMENSIONS:
+            others = np.ones(row_count, dtype=bool)
+            for other, mask in masks.items():
+                if other != dimension:
+                    others &= mask
+            counts = np.bincount(columns[dimension][others], minlength=len(values[dimension]))
+            facets[dimension] = {values[dimension][code]: int(counts[code])
+                                 for code in np.flatnonzero(counts) if values[dimension][code]}
+
+        result = {
+            'positions': np.flatnonzero(matches),
+            'facets': facets,
+            'catalog_version': version
+        }
+
+        with self._lock:
+            # Only cache if the catalog did not change while computing
+            if self.version == version:
+                self._cache[cache_key] = result
+                if len(self._cache) > self.max_cached_queries:
+                    self._cache.popitem(last=False)
+        return result
+
+    def recipes_for(self, positions) -> List[Dict]:
+        return [self.recipes[i] for i in positions]
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    catalog = [{
+        'name': f"Recipe {i}",
+        'protein': random.choice(['chicken', 'beef', 'salmon', 'shrimp', 'turkey', 'pork']),
+        'cuisine': random.choice(['asian', 'mediterranean', 'american', 'mexican', 'thai', 'indian']),
+        'cooking_method': random.choice(['stove', 'oven', 'grill', 'air fryer', 'slow cooker'])
+    } for i in range(200000)]
+
+    start = time.time()
+    index = RecipeFacetIndex(catalog)
+    print(f"Indexed {len(index.recipes)} recipes in {time.time() - start:.2f}s")
+
+    query = {'protein': 'chicken', 'cuisine': 'thai'}
+    start = time.time()
+    result = index.search(query)
+    cold = (time.time() - start) * 1000
+    start = time.time()
+    index.search(query)
+    warm = (time.time() - start) * 1000
+    print(f"{len(result['positions'])} matches; cold {cold:.1f}ms, cached {warm:.3f}ms")
+    print(f"Cooking method facets: {result['facets']['cooking_method']}")
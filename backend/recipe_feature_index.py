@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Recipe Feature Index
+Encodes recipes once as sparse feature rows (one-hot protein/cuisine/difficulty,
+multi-hot vegetables/ingredients) so a whole catalog is scored against a user
+preference weight vector with one sparse matrix-vector product
+"""
+
+import threading
+import numpy as np
+from typing import List, Dict, Any
+
+class RecipeFeatureIndex:
+    # Preference section -> (feature prefix, weight multiplier)
+    PREFERENCE_FEATURES = {
+        'favorite_proteins': ('protein', 2.0),
+        'favorite_cuisines': ('cuisine', 1.5),
+        'favorite_vegetables': ('vegetable', 0.5),
+        'common_ingredients': ('ingredient', 0.3)
+    }
+
+    # Fixed bonuses that don't depend on the user
+    STATIC_WEIGHTS = {
+        'difficulty:easy': 1.0
+    }
+
+    def __init__(self, recipes: List[Dict[str, Any]] = None):
+        self.feature_ids = {}       # 'protein:chicken' -> column
+        self.feature_names = []
+        self.recipes = []
+
+        # COO triplets; rows are recipes, columns are features
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.cols = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros(0, dtype=np.float64)
+        self._lock = threading.Lock()
+
+        if recipes:
+            self.add_recipes(recipes)
+
+    def add_recipes(self, recipes: List[Dict[str, Any]]):
+        """Encode recipes and append them as new rows"""
+        with self._lock:
+            row_chunks = [self.rows]
+            col_chunks = [self.cols]
+            for recipe in recipes:
+                row = len(self.recipes)
+                self.recipes.append(recipe)
+
+                features = self.recipe_features(recipe)
+                row_chunks.append(np.full(len(features), row, dtype=np.int64))
+                col_chunks.append(np.array([self._feature_id(f) for f in features], dtype=np.int64))
+
+            cols = np.concatenate(col_chunks)
+            # Repeated features add up, matching per-item scoring
+            self.values = np.ones(len(cols), dtype=np.float64)
+            self.cols = cols
+            self.rows = np.concatenate(row_chunks)
+
+    def recipe_features(self, recipe: Dict[str, Any]) -> List[str]:
+        """Feature names present in a recipe"""
+        features = [f"protein:{recipe.get('protein', '')}", f"cuisine:{recipe.get('cuisine', '')}"]
+
+        features.extend(f"vegetable:{veg}" for veg in recipe.get('vegetables', []))
+        features.extend(f"ingredient:{ingredient}" for ingredient in recipe.get('ingredients', []))
+
+        if recipe.get('difficulty'):
+            features.append(f"difficulty:{recipe['difficulty']}")
+        return features
+
+    def weight_vector(self, user_preferences: Dict[str, Any]) -> np.ndarray:
+        """Turn user preferences into one weight per feature column"""
+        weights = np.zeros(len(self.feature_names), dtype=np.float64)
+
+        for section, (prefix, multiplier) in self.PREFERENCE_FEATURES.items():
+            for value, preference in user_preferences.get(section, {}).items():
+                column = self.feature_ids.get(f"{prefix}:{value}")
+                if column is not None:
+                    weights[column] = preference * multiplier
+
+        for feature, bonus in self.STATIC_WEIGHTS.items():
+            column = self.feature_ids.get(feature)
+            if column is not None:
+                weights[column] += bonus
+
+        return weights
+
+    def score_all(self, user_preferences: Dict[str, Any]) -> np.ndarray:
+        """Score every indexed recipe in one pass"""
+        with self._lock:
+            rows, cols, values = self.rows, self.cols, self.values
+            weights = self.weight_vector(user_preferences)
+            recipe_count = len(self.recipes)
+        return np.bincount(rows, weights=values * weights[cols], minlength=recipe_count)
+
+    def score_recipes(self, recipes: List[Dict[str, Any]], user_preferences: Dict[str, Any]) -> np.ndarray:
+        """Score recipes that are not (necessarily) indexed, without adding them"""
+        with self._lock:
+            weights = self.weight_vector(user_preferences)
+            feature_ids = self.feature_ids
+        scores = np.zeros(len(recipes), dtype=np.float64)
+        for row, recipe in enumerate(recipes):
+            for feature in self.recipe_features(recipe):
+                column = feature_ids.get(feature)
+                if column is not None:
+                    scores[row] += weights[column]
+        return scores
+
+    def _feature_id(self, feature: str) -> int:
+        column = self.feature_ids.get(feature)
+        if column is None:
+            column = len(self.feature_names)
+            self.feature_ids[feature] = column
+            self.feature_names.append(feature)
+        return column
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    proteins = ['chicken', 'beef', 'salmon', 'shrimp', 'turkey', 'pork']
+    cuisines = ['asian', 'mediterranean', 'american', 'mexican', 'thai', 'indian']
+    vegetables = ['broccoli', 'carrots', 'bell peppers', 'zucchini', 'spinach', 'onions', 'kale']
+    pantry = ['rice', 'quinoa', 'garlic', 'ginger', 'olive oil', 'soy sauce', 'lemon', 'herbs']
+
+    catalog = []
+    for i in range(100000):
+        veg = random.sample(vegetables, 2)
+        catalog.append({
+            'name': f"Recipe {i}",
+            'protein': random.choice(proteins),
+            'cuisine': random.choice(cuisines),
+            'vegetables': veg,
+            'ingredients': veg + random.sample(pantry, 4),
+            'difficulty': random.choice(['easy', 'medium'])
+        })
+
+    start = time.time()
+    index = RecipeFeatureIndex(catalog)
+    print(f"Encoded {len(catalog)} recipes into {len(index.feature_names)} features in {time.time() - start:.2f}s")
+
+    preferences = {
+        'favorite_proteins': {'chicken': 3, 'salmon': 2},
+        'favorite_cuisines': {'asian': 4},
+        'favorite_vegetables': {'broccoli': 3},
+        'common_ingredients': {'rice': 4, 'garlic': 3}
+    }
+
+    start = time.time()
+    scores = index.score_all(preferences)
+    print(f"Scored {len(scores)} recipes in {(time.time() - start) * 1000:.1f}ms")
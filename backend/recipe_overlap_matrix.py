@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Recipe Overlap Matrix
+Keeps ingredient bitsets for every catalog recipe plus a symmetric matrix of
+shared-ingredient counts, stored as a uint8 upper triangle. Recipes are added
+incrementally (one vectorized row per recipe), so overlap between any two
+known recipes is an array lookup instead of a set intersection.
+
+The matrix covers the whole catalog and grows as users add recipes
+(extend). Recipes that arrive with a request are encoded in an
+OverlapScratch, which never changes the shared matrix or its ingredient
+vocabulary
+"""
+
+import hashlib
+import json
+import threading
+import numpy as np
+from typing import List, Dict, Any, Tuple
+
+class RecipeOverlapMatrix:
+    DEFAULT_MAX_RECIPES = 5000
+
+    def __init__(self, recipes: List[Dict] = None, max_recipes=DEFAULT_MAX_RECIPES):
+        self.max_recipes = max_recipes      # triangle is max_recipes^2 / 2 bytes when full
+
+        self.ingredient_bits = {}           # ingredient -> bit position
+        self.ingredient_names = []
+        self.positions = {}                 # recipe key -> row, for rows added in this process
+        self.row_count = 0
+        self.words = np.zeros((0, 1), dtype=np.uint64)      # bitset per row as uint64 words
+        self.lengths = np.zeros(0, dtype=np.int32)          # ingredient-list length per row (duplicates included)
+        self.added_recipes = []             # recipes extended after the build, carried over to a rebuilt matrix
+
+        # Pair (i, j) with i < j lives at j * (j - 1) / 2 + i, so adding row j only appends
+        self._triangle = np.zeros(0, dtype=np.uint8)
+        # Rows loaded by from_arrays: their keys sorted, and the row of each sorted key
+        self._loaded_keys = np.zeros(0, dtype=np.uint64)
+        self._loaded_rows = np.zeros(0, dtype=np.int64)
+        self._lock = threading.RLock()
+
+        if recipes:
+            self.add_recipes(recipes)
+
+    @classmethod
+    def from_arrays(cls, ingredient_names: List[str], keys: np.ndarray, lengths: np.ndarray, words: np.ndarray,
+                    triangle: np.ndarray, max_recipes=DEFAULT_MAX_RECIPES) -> 'RecipeOverlapMatrix':
+        """
+        Matrix over exported arrays (see export_arrays); they are used as they
+        are, so a read-only mapping is shared until a recipe is added
+        """
+        matrix = cls(max_recipes=max(max_recipes, 2 * len(keys)))
+        matrix.ingredient_names = list(ingredient_names)
+        matrix.ingredient_bits = {name: bit for bit, name in enumerate(ingredient_names)}
+        matrix.row_count = len(keys)
+        matrix.words = words
+        matrix.lengths = lengths
+        matrix._triangle = triangle
+        order = np.argsort(keys, kind='stable')
+        matrix._loaded_keys = keys[order]
+        matrix._loaded_rows = order
+        return matrix
+
+    def export_arrays(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(ingredient names, uint64 row keys, int32 lengths, uint64 word rows, uint8 triangle) for from_arrays"""
+        with self._lock:
+            rows = self.row_count
+            keys = np.zeros(rows, dtype=np.uint64)
+            for key, row in self.positions.items():
+                keys[row] = key
+            keys[self._loaded_rows] = self._loaded_keys
+            return (list(self.ingredient_names), keys, self.lengths[:rows].copy(), self.words[:rows].copy(),
+                    self._triangle[:rows * (rows - 1) // 2].copy())
+
+    @staticmethod
+    def recipe_key(recipe: Dict) -> int:
+        """Identity of a recipe for matrix purposes: 63-bit hash of its name plus ingredient list"""
+        content = json.dumps([recipe.get('name', ''), list(recipe.get('ingredients', []))], separators=(',', ':'))
+        return int.from_bytes(hashlib.blake2b(content.encode('utf-8'), digest_size=8).digest(), 'little') >> 1
+
+    def __len__(self):
+        return self.row_count
+
+    def row_of(self, recipe: Dict) -> int:
+        """Row of a known recipe, -1 otherwise"""
+        key = self.recipe_key(recipe)
+        row = self.positions.get(key)
+        if row is not None:
+            return row
+        index = int(np.searchsorted(self._loaded_keys, np.uint64(key)))
+        if index < len(self._loaded_keys) and int(self._loaded_keys[index]) == key:
+            return int(self._loaded_rows[index])
+        return -1
+
+    def bitset(self, row: int) -> int:
+        """Python-int bitset of a row"""
+        return int.from_bytes(self.words[row].astype('<u8').tobytes(), 'little')
+
+    def add_recipes(self, recipes: List[Dict]) -> List[int]:
+        """Add recipes (known ones are skipped) and return their rows; -1 when the matrix is full"""
+        with self._lock:
+            return [self._add_recipe(recipe) for recipe in recipes]
+
+    def extend(self, recipes: List[Dict]) -> List[int]:
+        """Add recipes that arrive after the matrix was built (e.g. a user's new recipe)"""
+        with self._lock:
+            rows = []
+            for recipe in recipes:
+                known = self.row_count
+                row = self._add_recipe(recipe)
+                if row >= known:
+                    self.added_recipes.append(recipe)
+                rows.append(row)
+            return rows
+
+    def shared(self, i: int, j: int) -> int:
+        """Shared distinct ingredients between two rows"""
+        if i == j:
+            return self.bitset(i).bit_count()
+        low, high = min(i, j), max(i, j)
+        return int(self._triangle[high * (high - 1) // 2 + low])
+
+    def shared_matrix(self, rows, columns=None) -> np.ndarray:
+        """Dense shared-ingredient counts, rows x columns (default rows x rows); a row may repeat"""
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = rows if columns is None else np.asarray(columns, dtype=np.int64)
+        low = np.minimum(rows[:, None], columns[None, :])
+        high = np.maximum(rows[:, None], columns[None, :])
+        same = low == high
+        matrix = np.zeros(same.shape, dtype=np.int64)
+        if len(self._triangle):
+            matrix[~same] = self._triangle[(high * (high - 1) // 2 + low)[~same]]
+
+        # A row against itself (the diagonal, or a repeated row) shares all of its ingredients
+        counts = np.bitwise_count(self.words[rows]).sum(axis=1, dtype=np.int64)
+        matrix[same] = np.broadcast_to(counts[:, None], matrix.shape)[same]
+        return matrix
+
+    def scratch(self) -> 'OverlapScratch':
+        """Encoder for one request's recipes; see OverlapScratch"""
+        return OverlapScratch(self)
+
+    def word_rows(self, rows) -> np.ndarray:
+        """uint64 word rows for known recipes (no re-encoding)"""
+        with self._lock:
+            return self.words[np.asarray(rows, dtype=np.int64)]
+
+    def shared_ingredients(self, bitset: int) -> List[str]:
+        """Ingredient names for the bits set in bitset"""
+        names = []
+        while bitset:
+            low_bit = bitset & -bitset
+            names.append(self.ingredient_names[low_bit.bit_length() - 1])
+            bitset ^= low_bit
+        return names
+
+    def _add_recipe(self, recipe: Dict) -> int:
+        row = self.row_of(recipe)
+        if row >= 0:
+            return row
+        if self.row_count >= self.max_recipes:
+            return -1
+
+        ingredients = recipe.get('ingredients', [])
+        row_words = self.to_words([self._encode(ingredients)])[0]
+
+        # Shared counts against every earlier row in one vectorized pass
+        row = self.row_count
+        counts = np.bitwise_count(self.words[:row] & row_words).sum(axis=1)
+        self._append_row(np.minimum(counts, 255).astype(np.uint8), row_words, len(ingredients))
+
+        self.row_count += 1
+        self.positions[self.recipe_key(recipe)] = row
+        return row
+
+    def _append_row(self, counts: np.ndarray, row_words: np.ndarray, length: int):
+        """Append a triangle row, a word row and a length, growing capacity geometrically"""
+        row = self.row_count
+        start = row * (row - 1) // 2
+        needed = start + row
+        if needed > len(self._triangle):
+            grown = np.zeros(max(needed, 2 * len(self._triangle)), dtype=np.uint8)
+            grown[:len(self._triangle)] = self._triangle
+            self._triangle = grown
+        self._triangle[start:needed] = counts
+
+        if row >= len(self.words):
+            capacity = max(row + 1, 2 * len(self.words))
+            grown = np.zeros((capacity, self.words.shape[1]), dtype=np.uint64)
+            grown[:len(self.words)] = self.words
+            self.words = grown
+            grown_lengths = np.zeros(capacity, dtype=np.int32)
+            grown_lengths[:len(self.lengths)] = self.lengths
+            self.lengths = grown_lengths
+        self.words[row] = row_words
+        self.lengths[row] = length
+
+    def _encode(self, ingredients: List[str]) -> int:
+        bitset = 0
+        for ingredient in ingredients:
+            bit = self.ingredient_bits.get(ingredient)
+            if bit is None:
+                bit = self.ingredient_bits[ingredient] = len(self.ingredient_names)
+                self.ingredient_names.append(ingredient)
+            bitset |= 1 << bit
+
+        # Widen the word matrix when the vocabulary outgrows it
+        word_count = max(1, (len(self.ingredient_names) + 63) // 64)
+        if word_count > self.words.shape[1]:
+            widened = np.zeros((len(self.words), word_count), dtype=np.uint64)
+            widened[:, :self.words.shape[1]] = self.words
+            self.words = widened
+        return bitset
+
+    def to_words(self, bitsets: List[int], word_count: int = None) -> np.ndarray:
+        """Python-int bitsets to uint64 word rows"""
+        word_count = word_count or self.words.shape[1]
+        words = np.zeros((len(bitsets), word_count), dtype=np.uint64)
+        for row, bitset in enumerate(bitsets):
+            for word in range(word_count):
+                words[row, word] = (bitset >> (64 * word)) & 0xFFFFFFFFFFFFFFFF
+        return words
+
+class OverlapScratch:
+    """
+    Encodings for the recipes of one request, on top of a shared matrix
+
+    Recipes the matrix knew when the scratch was opened use their rows. Any
+    other recipe is encoded here: ingredients in the matrix vocabulary keep
+    their bits, and unseen ingredients get bits past that vocabulary which
+    only this scratch knows (rows and bits the matrix adds later are ignored,
+    so they never collide).
+    Bitsets from one scratch can be combined with each other and with the
+    matrix's rows, but not with bitsets from another scratch.
+    """
+
+    def __init__(self, matrix: RecipeOverlapMatrix):
+        self.matrix = matrix
+        with matrix._lock:
+            self.base = len(matrix.ingredient_names)
+            self.known_rows = matrix.row_count
+        self.extra_bits = {}                # ingredient -> request-local bit
+        self.extra_names = []
+
+    @property
+    def word_count(self) -> int:
+        return max(self.matrix.words.shape[1], (self.base + len(self.extra_names) + 63) // 64)
+
+    def encode(self, recipe: Dict) -> Tuple[int, int, int]:
+        """(matrix row or -1, bitset, ingredient-list length) for one recipe"""
+        matrix = self.matrix
+        with matrix._lock:
+            row = matrix.row_of(recipe)
+            if 0 <= row < self.known_rows:
+                return row, matrix.bitset(row), int(matrix.lengths[row])
+            ingredients = recipe.get('ingredients', [])
+            bitset = 0
+            for ingredient in ingredients:
+                bit = matrix.ingredient_bits.get(ingredient)
+                if bit is None or bit >= self.base:
+                    bit = self.extra_bits.get(ingredient)
+                    if bit is None:
+                        bit = self.extra_bits[ingredient] = self.base + len(self.extra_names)
+                        self.extra_names.append(ingredient)
+                bitset |= 1 << bit
+            return -1, bitset, len(ingredients)
+
+    def pool(self, recipes: List[Dict]) -> Dict[str, Any]:
+        """
+        Encoding of a candidate pool for the overlap optimizers
+
+        Returns matrix rows (-1 for recipes the matrix does not know),
+        Python-int bitsets, lengths and uint64 word rows. Pairwise counts are
+        not part of it; see shared_matrix.
+        """
+        encoded = [self.encode(recipe) for recipe in recipes]
+        return {
+            'rows': np.array([row for row, _, _ in encoded], dtype=np.int64),
+            'bitsets': [bitset for _, bitset, _ in encoded],
+            'lengths': [length for _, _, length in encoded],
+            'words': self.to_words([bitset for _, bitset, _ in encoded])
+        }
+
+    def shared_matrix(self, pool: Dict[str, Any], rows=None, columns=None) -> np.ndarray:
+        """
+        Shared-ingredient counts between pool entries, rows x columns (default all x all)
+
+        Read from the triangle when every entry involved is a matrix row,
+        otherwise counted from the word rows with one vectorized popcount.
+        """
+        everything = np.arange(len(pool['rows']))
+        rows = everything if rows is None else np.asarray(rows, dtype=np.int64)
+        columns = everything if columns is None else np.asarray(columns, dtype=np.int64)
+        matrix_rows, matrix_columns = pool['rows'][rows], pool['rows'][columns]
+        if (matrix_rows >= 0).all() and (matrix_columns >= 0).all():
+            with self.matrix._lock:
+                return self.matrix.shared_matrix(matrix_rows, matrix_columns)
+
+        words = pool['words']
+        return np.bitwise_count(words[rows][:, None, :] & words[columns][None, :, :]).sum(axis=2, dtype=np.int64)
+
+    def union_bits(self, recipes: List[Dict]) -> int:
+        """Python-int bitset holding every ingredient of the given recipes"""
+        union = 0
+        for recipe in recipes:
+            union |= self.encode(recipe)[1]
+        return union
+
+    def union_words(self, recipes: List[Dict]) -> np.ndarray:
+        """One uint64 word row holding every ingredient of the given recipes"""
+        return self.to_words([self.union_bits(recipes)])[0]
+
+    def to_words(self, bitsets: List[int]) -> np.ndarray:
+        return self.matrix.to_words(bitsets, self.word_count)
+
+    def shared_ingredients(self, bitset: int) -> List[str]:
+        """Ingredient names for the bits set in bitset"""
+        names = []
+        while bitset:
+            low_bit = bitset & -bitset
+            bit = low_bit.bit_length() - 1
+            names.append(self.matrix.ingredient_names[bit] if bit < self.base else self.extra_names[bit - self.base])
+            bitset ^= low_bit
+        return names
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    pantry = [f"ingredient {i}" for i in range(150)]
+    recipes = [{'name': f"Recipe {i}", 'ingredients': random.sample(pantry, random.randint(6, 14))}
+               for i in range(3000)]
+
+    start = time.time()
+    matrix = RecipeOverlapMatrix(recipes)
+    print(f"Indexed {len(matrix)} recipes in {time.time() - start:.2f}s "
+          f"({matrix._triangle.nbytes / 1e6:.1f} MB triangle capacity)")
+
+    a, b = recipes[10], recipes[2000]
+    expected = len(set(a['ingredients']) & set(b['ingredients']))
+    print(f"shared(10, 2000) = {matrix.shared(10, 2000)} (expected {expected})")
+
+    start = time.time()
+    scratch = matrix.scratch()
+    shared = scratch.shared_matrix(scratch.pool(recipes[:60] + recipes[:1]))
+    print(f"60-recipe pool lookup in {(time.time() - start) * 1000:.1f}ms "
+          f"(repeated recipe shares {shared[0, 60]} of {len(set(recipes[0]['ingredients']))})")
+
+    posted = [{'name': 'Posted', 'ingredients': ['saffron', 'ingredient 1']}]
+    vocabulary = len(matrix.ingredient_names)
+    scratch = matrix.scratch()
+    print(f"posted recipe: {scratch.shared_ingredients(scratch.union_bits(posted))}, "
+          f"matrix unchanged: {len(matrix) == 3000 and len(matrix.ingredient_names) == vocabulary}")
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Compact Recipe Records
+Read-only recipe record with __slots__ for the fields suggestion lists and
+filters read on every request (interned strings, vegetables as a tuple) and
+a compressed cold store for everything else (ingredients, instructions,
+URLs, notes), which is decoded only when a caller asks for one of those
+fields. Records behave like read-only dicts, so existing .get()/[] readers
+keep working, and they are shared instead of copied.
+
+Request-specific fields (suggestion numbers, sources, generation ids) go in
+a RecipeOverlay on top of a shared record, never into the record itself
+"""
+
+import sys
+import json
+import zlib
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from typing import List, Dict, Any, Iterator, Iterable, Tuple, Optional, Callable
+
+# Fields kept in slots; every other field of a canonical record goes to the cold store
+HOT_FIELDS = ('id', 'name', 'protein', 'cuisine', 'cooking_method', 'difficulty',
+              'starch', 'prep_time', 'cook_time', 'vegetables', 'source')
+INTERNED_FIELDS = ('protein', 'cuisine', 'cooking_method', 'difficulty', 'starch', 'source')
+
+class RecipeColdStore:
+    """Append-only store of zlib-compressed JSON blobs in one bytearray"""
+
+    def __init__(self, max_cached=64):
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+        self._key_tuples = {}                  # shared tuples of cold field names
+        self.max_cached = max_cached
+        self._cache = OrderedDict()            # entry -> decoded fields, most recent last
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+    def add(self, fields: Dict[str, Any]) -> Tuple[int, Tuple[str, ...]]:
+        """Store fields; returns the entry number and the (shared) tuple of field names"""
+        blob = zlib.compress(json.dumps(fields, separators=(',', ':')).encode('utf-8'))
+        keys = self.keys(fields)
+        with self._lock:
+            self._data.extend(blob)
+            self._offsets.append(len(self._data))
+            return len(self._offsets) - 2, keys
+
+    def keys(self, fields: Iterable[str]) -> Tuple[str, ...]:
+        """Shared tuple of field names"""
+        keys = tuple(sys.intern(key) for key in fields)
+        with self._lock:
+            return self._key_tuples.setdefault(keys, keys)
+
+    def get(self, entry: int) -> Dict[str, Any]:
+        with self._lock:
+            fields = self._cache.get(entry)
+            if fields is not None:
+                self._cache.move_to_end(entry)
+                return fields
+
+        fields = self._load(entry)
+        with self._lock:
+            self._cache[entry] = fields
+            if len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return fields
+
+    def _load(self, entry: int) -> Dict[str, Any]:
+        with self._lock:
+            blob = bytes(self._data[self._offsets[entry]:self._offsets[entry + 1]])
+        return json.loads(zlib.decompress(blob))
+
+class BufferColdStore(RecipeColdStore):
+    """
+    Cold fields of records that already sit in a shared buffer (the mapped catalog)
+
+    Nothing is copied or compressed per process: an entry is the record's
+    position, and its cold fields are parsed again from the record bytes
+    when asked for (recently used ones stay decoded)
+    """
+
+    def __init__(self, record_bytes: Callable[[int], bytes], max_cached=64):
+        super().__init__(max_cached)
+        self.record_bytes = record_bytes
+
+    def _load(self, entry: int) -> Dict[str, Any]:
+        record = json.loads(self.record_bytes(entry))
+        return {field: value for field, value in record.items() if field not in HOT_FIELDS}
+
+class Recipe(Mapping):
+    """Read-only recipe; hot fields in slots, cold fields decoded on access"""
+
+    __slots__ = HOT_FIELDS + ('_cold_keys', '_cold_entry', '_store')
+
+    def __init__(self, record: Dict[str, Any], store: RecipeColdStore, entry: Optional[int] = None):
+        cold = {}
+        for field, value in record.items():
+            if field not in HOT_FIELDS:
+                cold[field] = value
+            elif field == 'vegetables':
+                self.vegetables = tuple(sys.intern(str(v)) for v in value)
+            elif field in INTERNED_FIELDS and isinstance(value, str):
+                setattr(self, field, sys.intern(value))
+            else:
+                setattr(self, field, value)
+
+        self._store = store
+        if entry is None:
+            self._cold_entry, self._cold_keys = store.add(cold)
+        else:
+            # The store can already read this record's cold fields (see BufferColdStore)
+            self._cold_entry, self._cold_keys = entry, store.keys(cold)
+
+    def __getitem__(self, field: str) -> Any:
+        if field in HOT_FIELDS:
+            try:
+                return getattr(self, field)
+            except AttributeError:
+                raise KeyError(field) from None
+        if field in self._cold_keys:
+            return self._store.get(self._cold_entry)[field]
+        raise KeyError(field)
+
+    def __contains__(self, field) -> bool:
+        if field in HOT_FIELDS:
+            return hasattr(self, field)
+        return field in self._cold_keys
+
+    def __iter__(self) -> Iterator[str]:
+        for field in HOT_FIELDS:
+            if hasattr(self, field):
+                yield field
+        yield from self._cold_keys
+
+    def __len__(self) -> int:
+        return sum(1 for field in HOT_FIELDS if hasattr(self, field)) + len(self._cold_keys)
+
+    # Records are shared catalog entries: identity, not field-by-field comparison
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"Recipe({getattr(self, 'id', None)!r}, {getattr(self, 'name', None)!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict with every field (for JSON responses and callers that mutate)"""
+        record = {field: getattr(self, field) for field in HOT_FIELDS if hasattr(self, field)}
+        if 'vegetables' in record:
+            record['vegetables'] = list(record['vegetables'])
+        if self._cold_keys:
+            record.update(self._store.get(self._cold_entry))
+        return record
+
+class RecipeOverlay(MutableMapping):
+    """
+    Per-request view of a shared recipe
+
+    Reads fall through to the base record; writes (recipe['suggestion_number'] = 3)
+    land in the overlay, so the catalog entry is never modified and nothing
+    request-specific leaks into other requests or into persisted data.
+    """
+
+    __slots__ = ('base', 'fields')
+
+    def __init__(self, base: Mapping, **fields):
+        # Overlays never nest; a view of a view shares the original base
+        if isinstance(base, RecipeOverlay):
+            fields = {**base.fields, **fields}
+            base = base.base
+        self.base = base
+        self.fields = fields
+
+    def __getitem__(self, field: str) -> Any:
+        if field in self.fields:
+            return self.fields[field]
+        return self.base[field]
+
+    def __setitem__(self, field: str, value: Any):
+        self.fields[field] = value
+
+    def __delitem__(self, field: str):
+        if field not in self.fields:
+            raise KeyError(f"{field} belongs to the shared record")
+        del self.fields[field]
+
+    def __contains__(self, field) -> bool:
+        return field in self.fields or field in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.base
+        for field in self.fields:
+            if field not in self.base:
+                yield field
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for field in self.fields if field not in self.base)
+
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"RecipeOverlay({self.base!r}, {self.fields!r})"
+
+    def copy(self) -> 'RecipeOverlay':
+        return RecipeOverlay(self.base, **self.fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = as_dict(self.base)
+        record.update(self.fields)
+        return record
+
+def as_dict(recipe: Mapping) -> Dict[str, Any]:
+    """Plain dict for a dict, Recipe or RecipeOverlay (for persistence and JSON)"""
+    if isinstance(recipe, (Recipe, RecipeOverlay)):
+        return recipe.to_dict()
+    return dict(recipe)
+
+def frozen_recipes(recipes: Iterable[Dict[str, Any]], store: Optional[RecipeColdStore] = None) -> List[Recipe]:
+    """Shared read-only records for a list of canonical recipes"""
+    store = store or RecipeColdStore()
+    return [Recipe(recipe, store) for recipe in recipes]
+
+if __name__ == "__main__":
+    import tracemalloc
+    from expanded_recipe_generator import ExpandedRecipeGenerator
+    from recipe_schema import canonical_recipes
+
+    generator = ExpandedRecipeGenerator()
+    records = [record for records in generator.recipe_templates.values() for record in records]
+    plain = [record.to_dict() for record in records]
+
+    # Same catalog repeated so per-recipe cost dominates
+    copies = 20
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    dicts = canonical_recipes(json.loads(json.dumps(plain * copies)))
+    dict_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, 'filename'))
+
+    baseline = tracemalloc.take_snapshot()
+    store = RecipeColdStore()
+    compact = [Recipe(record, store) for record in dicts]
+    record_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, 'filename'))
+    tracemalloc.stop()
+
+    print(f"{len(dicts)} recipes: dicts {dict_bytes / len(dicts):.0f} B/recipe, "
+          f"records {record_bytes / len(compact):.0f} B/recipe "
+          f"(cold store {store.nbytes / len(compact):.0f} B/recipe)")
+    print(f"{compact[0]!r}: {compact[0]['protein']}, {len(compact[0]['ingredients'])} ingredients")
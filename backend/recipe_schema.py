@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Recipe Schema
+One canonical shape for recipe records, applied once when a source is loaded:
+
+- vegetables, ingredients and instructions are lists of strings
+- the starch lives in 'starch' (never 'starch_grain')
+- the link lives in 'url' (never 'recipe_link'); absent when a source has none
+- prep_time and cook_time are integer minutes; absent when a source has no usable time
+- protein, cuisine, cooking_method and difficulty are lowercase strings
+
+Consumers of canonical records read fields directly instead of branching on
+types and aliases per request.
+
+Recipe ids are content-addressed: a hash of the recipe's source URL, or of its
+identity fields when it has none. The same recipe gets the same id in every
+process and on every restart, so ids can key caches and precomputed matrices
+"""
+
+import re
+import json
+import hashlib
+from typing import List, Dict, Any, Iterable
+
+# Source field name -> canonical field name
+FIELD_ALIASES = {
+    'starch_grain': 'starch',
+    'recipe_link': 'url'
+}
+
+CATEGORICAL_FIELDS = ['protein', 'cuisine', 'cooking_method', 'difficulty']
+LIST_FIELDS = ['vegetables', 'ingredients', 'instructions']
+
+# Fields that identify a recipe without a URL (times, ratings and bookkeeping fields do not)
+IDENTITY_FIELDS = ['name', 'protein', 'cuisine', 'cooking_method', 'starch', 'vegetables', 'ingredients']
+RECIPE_ID_PREFIX = 'rcp_'
+
+def parse_minutes(value: Any) -> int:
+    """Minutes from 25, '15 min', '35 minutes' or '1 hr 10 min'; -1 when unknown"""
+    if isinstance(value, bool) or value is None:
+        return -1
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    # "20 minutes (6 hours cook)" is 20 minutes of prep
+    text = re.sub(r'\([^)]*\)', '', str(value).lower())
+    total = 0
+    found = False
+    for amount, unit in re.findall(r'(\d+(?:\.\d+)?)\s*(hours?|hrs?|h\b|minutes?|mins?|m\b)?', text):
+        found = True
+        total += float(amount) * (60 if unit and unit.startswith('h') else 1)
+    return int(round(total)) if found else -1
+
+def split_list(value: Any) -> List[str]:
+    """List of non-empty strings from a list or a 'bok choy, carrots and onions' string"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = re.split(r',|\band\b', value)
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def canonical_recipe(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical copy of a source recipe; unknown fields are carried over unchanged"""
+    record = {}
+    for field, value in recipe.items():
+        canonical = FIELD_ALIASES.get(field, field)
+        # A canonical field given by the source wins over its alias, whichever comes first
+        if canonical != field and canonical in recipe:
+            continue
+        record[canonical] = value
+
+    record['name'] = str(record.get('name', '')).strip()
+    for field in CATEGORICAL_FIELDS:
+        if field in record:
+            record[field] = str(record[field] or '').strip().lower()
+
+    # Ingredient lines keep their commas; only vegetables come as "a, b and c" strings
+    record['vegetables'] = split_list(record.get('vegetables'))
+    for field in ('ingredients', 'instructions'):
+        value = record.get(field) or []
+        record[field] = [value] if isinstance(value, str) else [str(item) for item in value]
+
+    record['starch'] = str(record.get('starch') or '').strip()
+    if not record.get('url'):
+        record.pop('url', None)
+
+    # Unknown times are left out rather than guessed
+    for field in ('prep_time', 'cook_time'):
+        if field in record:
+            minutes = parse_minutes(record[field])
+            if minutes >= 0:
+                record[field] = minutes
+            else:
+                del record[field]
+    return record
+
+def canonical_recipes(recipes: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [canonical_recipe(recipe) for recipe in recipes]
+
+def normalize_url(url: str) -> str:
+    """'HTTPS://www.Site.com/recipe/?utm=x' and 'https://site.com/recipe' are the same recipe"""
+    url = str(url).strip().lower().split('#')[0].split('?')[0]
+    url = re.sub(r'^https?://(www\.)?', '', url)
+    return url.rstrip('/')
+
+def content_id(recipe: Dict[str, Any]) -> str:
+    """Id from the identity fields of a canonical recipe (case, spacing and list order do not matter)"""
+    identity = {}
+    for field in IDENTITY_FIELDS:
+        value = recipe.get(field)
+        if isinstance(value, (list, tuple)):
+            identity[field] = sorted(' '.join(str(item).lower().split()) for item in value)
+        else:
+            identity[field] = ' '.join(str(value or '').lower().split())
+    content = json.dumps(identity, sort_keys=True, separators=(',', ':'))
+    return RECIPE_ID_PREFIX + hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+def recipe_id(recipe: Dict[str, Any]) -> str:
+    """Content-addressed id of a canonical recipe: its URL when it has one, otherwise its identity fields"""
+    if recipe.get('url'):
+        return RECIPE_ID_PREFIX + hashlib.sha256(normalize_url(recipe['url']).encode('utf-8')).hexdigest()[:16]
+    return content_id(recipe)
+
+def is_recipe_id(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(RECIPE_ID_PREFIX) and len(value) == len(RECIPE_ID_PREFIX) + 16
+
+if __name__ == "__main__":
+    samples = [
+        {'name': 'Sample A', 'protein': 'Chicken', 'vegetables': 'bok choy, carrots and onions',
+         'starch_grain': 'rice', 'recipe_link': 'https://example.com/a', 'prep_time': '35 minutes'},
+        {'name': 'Sample B', 'protein': 'beef', 'vegetables': ['broccoli'], 'starch': 'quinoa',
+         'prep_time': '20 minutes (6 hours cook)', 'cook_time': '1 hr 10 min'},
+        {'name': 'Sample C', 'protein': 'salmon', 'prep_time': 25, 'url': ''},
+        {'name': 'Sample D', 'starch_grain': 'rice', 'starch': 'quinoa', 'prep_time': 'a while'}
+    ]
+    for sample in samples:
+        record = canonical_recipe(sample)
+        print(recipe_id(record), record)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Recipe Text Index
+In-memory inverted index over recipe names, ingredients and instructions with
+BM25 ranking. Recipes are tokenized and stemmed once when added; a query only
+touches the posting lists of its own terms. Postings can be exported as flat
+arrays and served from a read-only (memory-mapped) buffer with from_postings
+"""
+
+import re
+import threading
+import numpy as np
+from collections import defaultdict, Counter
+from typing import List, Dict, Any
+
+class RecipeTextIndex:
+    # Term frequency multiplier per field; a name match counts more than an instruction match
+    FIELD_WEIGHTS = {
+        'name': 3,
+        'protein': 2,
+        'cuisine': 2,
+        'cooking_method': 1,
+        'vegetables': 1,
+        'starch': 1,
+        'ingredients': 1,
+        'instructions': 1
+    }
+
+    STOPWORDS = {
+        'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'of', 'on', 'or',
+        'the', 'to', 'until', 'with', 'cup', 'cups', 'tbsp', 'tsp', 'oz', 'lb', 'lbs'
+    }
+
+    # (suffix, replacement), longest first; a stem keeps at least three letters
+    SUFFIX_RULES = [
+        ('ational', 'ate'), ('iveness', 'ive'), ('fulness', 'ful'), ('ization', 'ize'),
+        ('ities', 'ity'), ('ness', ''), ('ment', ''), ('ing', ''), ('ies', 'y'),
+        ('ied', 'y'), ('oes', 'o'), ('ches', 'ch'), ('shes', 'sh'), ('xes', 'x'),
+        ('ed', ''), ('ly', ''), ('ss', 'ss'), ('us', 'us'), ('s', '')
+    ]
+
+    def __init__(self, recipes: List[Dict] = None, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.recipes = []
+        self.postings = defaultdict(list)       # term -> [(doc, term frequency)], docs ascending
+        self._posting_arrays = {}               # term -> (docs, tfs) arrays, rebuilt when the term grows
+        self._doc_lengths = np.zeros(0, dtype=np.float64)
+        self._total_length = 0.0
+        self._stem_cache = {}
+        self._lock = threading.Lock()
+
+        # Read-only postings from an exported buffer: term -> row of (offsets, docs, frequencies)
+        self._term_rows = {}
+        self._term_offsets = self._docs = self._frequencies = None
+
+        if recipes:
+            self.add_recipes(recipes)
+
+    @classmethod
+    def from_postings(cls, recipes, terms: List[str], offsets: np.ndarray, docs: np.ndarray,
+                      frequencies: np.ndarray, doc_lengths: np.ndarray, k1=1.2, b=0.75) -> 'RecipeTextIndex':
+        """Index over exported postings; the arrays are used as they are (no copy)"""
+        index = cls(k1=k1, b=b)
+        index.recipes = recipes
+        index._term_rows = {term: row for row, term in enumerate(terms)}
+        index._term_offsets = offsets
+        index._docs = docs
+        index._frequencies = frequencies
+        index._doc_lengths = doc_lengths
+        index._total_length = float(doc_lengths.sum())
+        return index
+
+    def export_postings(self):
+        """(terms, offsets, docs, frequencies, doc_lengths) as flat arrays for from_postings"""
+        with self._lock:
+            self._thaw()
+            terms = sorted(self.postings)
+            lengths = [len(self.postings[term]) for term in terms]
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(lengths)
+            pairs = np.array([pair for term in terms for pair in self.postings[term]], dtype=np.int64).reshape(-1, 2)
+            return (terms, offsets, pairs[:, 0].astype(np.int32), pairs[:, 1].astype(np.float64),
+                    self._doc_lengths.astype(np.float64))
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def tokenize(self, text: str) -> List[str]:
+        """Lowercase word tokens, stopwords dropped, stemmed"""
+        return [self.stem(token) for token in re.findall(r'[a-z0-9]+', text.lower())
+                if token not in self.STOPWORDS and not token.isdigit()]
+
+    def stem(self, token: str) -> str:
+        stemmed = self._stem_cache.get(token)
+        if stemmed is None:
+            stemmed = token
+            for suffix, replacement in self.SUFFIX_RULES:
+                if token.endswith(suffix) and len(token) - len(suffix) + len(replacement) >= 3:
+                    stemmed = token[:-len(suffix)] + replacement
+                    break
+            # Collapse doubled final consonants left behind ("chopped" -> "chopp" -> "chop")
+            if len(stemmed) > 3 and stemmed[-1] == stemmed[-2] and stemmed[-1] not in 'aeiouls':
+                stemmed = stemmed[:-1]
+            # Drop a final silent e so "sauce"/"sauces" and "marinate"/"marinated" meet
+            if len(stemmed) > 3 and stemmed.endswith('e') and not stemmed.endswith('ee'):
+                stemmed = stemmed[:-1]
+            self._stem_cache[token] = stemmed
+        return stemmed
+
+    def recipe_terms(self, recipe: Dict) -> Counter:
+        """Weighted term frequencies across the indexed fields"""
+        terms = Counter()
+        for field, weight in self.FIELD_WEIGHTS.items():
+            value = recipe.get(field)
+            if not value:
+                continue
+            text = ' '.join(str(v) for v in value) if isinstance(value, list) else str(value)
+            for term in self.tokenize(text):
+                terms[term] += weight
+        return terms
+
+    def add_recipes(self, recipes: List[Dict]) -> List[int]:
+        """Index recipes incrementally; existing postings are only appended to"""
+        encoded = [self.recipe_terms(recipe) for recipe in recipes]
+
+        with self._lock:
+            self._thaw()
+            if not isinstance(self.recipes, list):
+                self.recipes = list(self.recipes)
+            first = len(self.recipes)
+            lengths = np.zeros(len(recipes), dtype=np.float64)
+            for offset, (recipe, terms) in enumerate(zip(recipes, encoded)):
+                doc = first + offset
+                self.recipes.append(recipe)
+                for term, frequency in terms.items():
+                    self.postings[term].append((doc, frequency))
+                    self._posting_arrays.pop(term, None)
+                lengths[offset] = sum(terms.values())
+
+            self._doc_lengths = np.concatenate([self._doc_lengths, lengths])
+            self._total_length += float(lengths.sum())
+            return list(range(first, len(self.recipes)))
+
+    def search(self, query: str, offset: int = 0, limit: int = 10) -> Dict[str, Any]:
+        """BM25-ranked page of recipes matching any query term"""
+        terms = list(dict.fromkeys(self.tokenize(query)))
+
+        with self._lock:
+            doc_count = len(self.recipes)
+            term_postings = [self._arrays(term) for term in terms if term in self.postings or term in self._term_rows]
+            doc_lengths = self._doc_lengths
+            average_length = self._total_length / doc_count if doc_count else 0.0
+
+        if not term_postings:
+            return {'total': 0, 'results': []}
+
+        # Dense accumulator: each term only touches its own postings
+        accumulator = np.zeros(doc_count, dtype=np.float64)
+        for docs, frequencies in term_postings:
+            idf = np.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            length_norm = self.k1 * (1 - self.b + self.b * doc_lengths[docs] / average_length)
+            accumulator[docs] += idf * frequencies * (self.k1 + 1) / (frequencies + length_norm)
+
+        # idf is always positive, so every matching recipe has a positive score
+        candidates = np.flatnonzero(accumulator)
+        scores = accumulator[candidates]
+
+        # Only the requested page is fully ordered
+        end = min(offset + limit, len(candidates))
+        if offset >= end:
+            return {'total': len(candidates), 'results': []}
+        if end < len(candidates):
+            # Keep every tie at the cut-off so pages stay consistent with each other
+            cutoff = -np.partition(-scores, end - 1)[end - 1]
+            head = np.flatnonzero(scores >= cutoff)
+        else:
+            head = np.arange(len(candidates))
+        head = head[np.lexsort((candidates[head], -scores[head]))]
+
+        return {
+            'total': len(candidates),
+            'results': [{'recipe': self.recipes[candidates[i]], 'score': round(float(scores[i]), 4)}
+                        for i in head[offset:end]]
+        }
+
+    def _arrays(self, term: str):
+        row = self._term_rows.get(term)
+        if row is not None:
+            start, end = self._term_offsets[row], self._term_offsets[row + 1]
+            return self._docs[start:end], self._frequencies[start:end]
+
+        arrays = self._posting_arrays.get(term)
+        if arrays is None:
+            posting = np.array(self.postings[term], dtype=np.int64).reshape(-1, 2)
+            arrays = (posting[:, 0], posting[:, 1].astype(np.float64))
+            self._posting_arrays[term] = arrays
+        return arrays
+
+    def _thaw(self):
+        """Copy read-only postings into lists before the index is changed"""
+        for term, row in self._term_rows.items():
+            start, end = self._term_offsets[row], self._term_offsets[row + 1]
+            self.postings[term] = list(zip(self._docs[start:end].tolist(),
+                                           self._frequencies[start:end].astype(np.int64).tolist()))
+        self._term_rows = {}
+        self._term_offsets = self._docs = self._frequencies = None
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    proteins = ['chicken', 'beef', 'salmon', 'shrimp', 'turkey', 'pork', 'cod', 'tofu']
+    cuisines = ['asian', 'mediterranean', 'american', 'mexican', 'thai', 'indian', 'korean', 'italian']
+    vegetables = ['broccoli', 'carrots', 'bell peppers', 'zucchini', 'spinach', 'onions', 'kale', 'bok choy']
+    dishes = ['stir fry', 'bowl', 'tacos', 'curry', 'skillet', 'sheet pan dinner', 'soup', 'salad']
+    steps = ['Chop the vegetables', 'Marinate the protein', 'Roast until golden', 'Simmer the sauce',
+             'Grill over high heat', 'Toss with dressing', 'Serve over rice', 'Garnish with herbs']
+
+    catalog = []
+    for i in range(100000):
+        protein, veg = random.choice(proteins), random.sample(vegetables, 2)
+        catalog.append({
+            'name': f"{random.choice(cuisines).title()} {protein.title()} {random.choice(dishes).title()}",
+            'protein': protein,
+            'cuisine': random.choice(cuisines),
+            'vegetables': veg,
+            'ingredients': [f"1 lb {protein}"] + [f"2 cups {v}" for v in veg] + ['2 tbsp olive oil'],
+            'instructions': random.sample(steps, 4)
+        })
+
+    start = time.time()
+    index = RecipeTextIndex(catalog)
+    print(f"Indexed {len(index)} recipes ({len(index.postings)} terms) in {time.time() - start:.2f}s")
+
+    for query in ['bok choy', 'spicy thai chicken curry', 'grilled salmon with spinach']:
+        index.search(query)     # warm posting arrays
+        start = time.time()
+        result = index.search(query, limit=5)
+        elapsed = (time.time() - start) * 1000
+        top = result['results'][0]['recipe']['name'] if result['results'] else None
+        print(f"'{query}': {result['total']} matches in {elapsed:.1f}ms, top: {top}")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Reference Data
+Ingredient database (grocery categories) and cooking preferences shared by
+the recipe manager and the grocery list generator. Both are hot-reloadable:
+editing either file swaps in the new version without a restart, and bumps
+its data version so cached results built from the old file are dropped
+"""
+
+import os
+import json
+from typing import Dict, Any
+from hot_reload import reloader
+from data_versions import data_versions, preferences_dependency, TAXONOMY
+
+INGREDIENT_DB_PATH = os.environ.get('INGREDIENT_DB_PATH', '/home/ubuntu/ingredient_database.json')
+COOKING_PREFERENCES_PATH = os.environ.get('COOKING_PREFERENCES_PATH', '/home/ubuntu/cooking_preferences.json')
+
+def load_json_file(path: str, default: Dict[str, Any]) -> Dict[str, Any]:
+    """File contents, or the default when the file does not exist"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+ingredient_data = reloader.register(
+    'ingredient_database',
+    lambda: load_json_file(INGREDIENT_DB_PATH, {"categories": {}}),
+    paths=[INGREDIENT_DB_PATH]
+)
+
+cooking_preferences = reloader.register(
+    'cooking_preferences',
+    lambda: load_json_file(COOKING_PREFERENCES_PATH, {"available_equipment": []}),
+    paths=[COOKING_PREFERENCES_PATH]
+)
+
+ingredient_data.on_reload(lambda old, new: data_versions.bump(TAXONOMY))
+cooking_preferences.on_reload(lambda old, new: data_versions.bump(preferences_dependency()))
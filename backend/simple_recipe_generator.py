@@ -8,10 +8,19 @@ import json
 import random
 from datetime import datetime
 from typing import List, Dict, Any
+from recipe_catalog import get_catalog, catalog_data
+from hot_reload import reloader
+
+# Regrouped whenever the catalog is reloaded
+simple_templates = reloader.register(
+    'simple_templates', lambda: get_catalog().source_groups('simple', 'protein'), depends_on=[catalog_data]
+)
 
 class SimpleRecipeGenerator:
-    def __init__(self):
-        self.recipe_templates = {
+    @staticmethod
+    def source_recipes():
+        """Recipe templates by protein (catalog build input)"""
+        return {
             'chicken': [
                 {
                     'name': 'Honey Garlic Chicken with Broccoli and Rice',
@@ -364,19 +373,15 @@ class SimpleRecipeGenerator:
             ]
         }
     
+    @property
+    def recipe_templates(self):
+        """Templates by protein, grouped on the live catalog's protein column; records decode on first read"""
+        return simple_templates.current
+    
     def generate_recipes(self, count=15):
         """Generate a diverse set of recipes"""
-        recipes = []
-        recipe_id = 1
-        
-        # Get recipes from each protein category
-        for protein, protein_recipes in self.recipe_templates.items():
-            for recipe_template in protein_recipes:
-                recipe = recipe_template.copy()
-                recipe['id'] = f"simple_{recipe_id:03d}"
-                recipe['source'] = 'curated'
-                recipes.append(recipe)
-                recipe_id += 1
+        # Get recipes from each protein category (shared records, no copies)
+        recipes = [recipe for protein_recipes in self.recipe_templates.values() for recipe in protein_recipes]
         
         # Shuffle and return requested count
         import random
@@ -8,11 +8,12 @@ import json
 import re
 from collections import defaultdict, Counter
 from fractions import Fraction
+from price_model import PriceModel
+from reference_data import ingredient_data, cooking_preferences
 
 class GroceryListGenerator:
     def __init__(self):
-        self.load_ingredient_database()
-        self.load_cooking_preferences()
+        self.price_model = PriceModel()
         
         # Common ingredient conversions and equivalents
         self.ingredient_equivalents = {
@@ -38,21 +39,15 @@ class GroceryListGenerator:
             r'(\d+(?:\.\d+)?)\s*(bunches?|bunch)'
         ]
     
-    def load_ingredient_database(self):
-        """Load ingredient categorization database"""
-        try:
-            with open('/home/ubuntu/ingredient_database.json', 'r') as f:
-                self.ingredient_db = json.load(f)
-        except FileNotFoundError:
-            self.ingredient_db = {"categories": {}}
+    @property
+    def ingredient_db(self):
+        """Live ingredient categorization database (hot-reloaded when the file changes)"""
+        return ingredient_data.current
     
-    def load_cooking_preferences(self):
-        """Load cooking method preferences"""
-        try:
-            with open('/home/ubuntu/cooking_preferences.json', 'r') as f:
-                self.cooking_prefs = json.load(f)
-        except FileNotFoundError:
-            self.cooking_prefs = {"available_equipment": []}
+    @property
+    def cooking_prefs(self):
+        """Live cooking method preferences (hot-reloaded when the file changes)"""
+        return cooking_preferences.current
     
     def generate_grocery_list(self, selected_recipes, optimize_quantities=True):
         """Generate comprehensive grocery list from selected recipes"""
@@ -76,12 +71,18 @@ class GroceryListGenerator:
         # Generate shopping tips
         shopping_tips = self.generate_shopping_tips(selected_recipes, consolidated_ingredients)
         
+        # Price the list at every store in the local price table
+        pricing = self.estimate_cost_range(selected_recipes)
+        
         return {
             "grocery_list": categorized_list,
             "equipment_reminders": equipment_reminders,
             "shopping_tips": shopping_tips,
             "total_recipes": len(selected_recipes),
-            "estimated_cost_range": self.estimate_cost_range(consolidated_ingredients)
+            "estimated_cost_range": pricing['estimated_cost_range'],
+            "store_totals": pricing['store_totals'],
+            "cheapest_store": pricing['cheapest_store'],
+            "cheapest_total": pricing['cheapest_total']
         }
     
     def extract_ingredients_with_quantities(self, recipes):
@@ -361,38 +362,9 @@ class GroceryListGenerator:
         
         return tips
     
-    def estimate_cost_range(self, ingredients):
-        """Estimate cost range for grocery list"""
-        # Basic cost estimation based on ingredient categories
-        category_costs = {
-            'produce': 3,
-            'meat_seafood': 8,
-            'dairy': 4,
-            'pantry': 2,
-            'frozen': 3,
-            'condiments': 3,
-            'spices': 2,
-            'other': 3
-        }
-        
-        total_low = 0
-        total_high = 0
-        
-        for ingredient, data in ingredients.items():
-            category = self.get_ingredient_category(ingredient)
-            base_cost = category_costs.get(category, 3)
-            
-            # Adjust for quantity
-            quantity = data['total_quantity']
-            if quantity > 2:
-                multiplier = 1.5
-            else:
-                multiplier = 1.0
-            
-            total_low += base_cost * 0.8 * multiplier
-            total_high += base_cost * 1.5 * multiplier
-        
-        return f"${total_low:.0f} - ${total_high:.0f}"
+    def estimate_cost_range(self, recipes):
+        """Estimate cost per store from base-unit quantities and the local price table"""
+        return self.price_model.price_recipes(recipes)
 
 # Test the grocery list generator
 if __name__ == "__main__":
@@ -423,6 +395,7 @@ if __name__ == "__main__":
             print(f"  - {item['quantity']} {item['name']}")
     
     print(f"\\nEstimated cost: {grocery_list['estimated_cost_range']}")
+    print(f"Cheapest store: {grocery_list['cheapest_store']} (${grocery_list['cheapest_total']:.2f})")
     print(f"Equipment reminders: {grocery_list['equipment_reminders']}")
     print(f"Shopping tips: {grocery_list['shopping_tips']}")
 
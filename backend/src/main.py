@@ -4,13 +4,26 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from flask import Flask, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from recipe_record import Recipe, RecipeOverlay
+from hot_reload import reloader
 from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.enhanced_recipe import enhanced_recipe_bp
 from src.routes.recipe_fix import recipe_fix_bp
 
+class RecipeJSONProvider(DefaultJSONProvider):
+    """Serialize shared Recipe records and request overlays like the dicts they stand in for"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (Recipe, RecipeOverlay)):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+app.json = RecipeJSONProvider(app)
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
 # Enable CORS for all routes
@@ -20,6 +33,9 @@ app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(recipe_fix_bp, url_prefix='/api/recipe')
 app.register_blueprint(enhanced_recipe_bp, url_prefix='/api/recipe')
 
+# Swap in changed catalog, ingredient and preference data without a restart (mtime polling, SIGHUP)
+reloader.start()
+
 # uncomment if you need to use database
 # Create database directory if it doesn't exist
 db_dir = os.path.join(os.path.dirname(__file__), 'database')
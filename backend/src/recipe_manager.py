@@ -6,40 +6,78 @@ Core system for managing weekly recipe suggestions, user selections, and prefere
 
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
+from write_behind_queue import write_queue
+from reference_data import ingredient_data
+from data_versions import data_versions, preferences_dependency
+from recipe_catalog import get_catalog
+from recipe_schema import canonical_recipe, canonical_recipes, recipe_id, content_id, is_recipe_id
 
 class RecipeManager:
     def __init__(self):
         self.recipe_db_path = '/home/ubuntu/recipe_database.json'
-        self.ingredient_db_path = '/home/ubuntu/ingredient_database.json'
+        # Held by everything that changes recipe_db and while it is serialized for saving
+        self.db_lock = threading.RLock()
         self.load_databases()
     
+    @property
+    def ingredient_db(self):
+        """Live ingredient database (hot-reloaded when the file changes)"""
+        return ingredient_data.current
+    
     def load_databases(self):
-        """Load recipe and ingredient databases"""
+        """Load the recipe database"""
         try:
             with open(self.recipe_db_path, 'r') as f:
                 self.recipe_db = json.load(f)
+            self.recipe_db['recipes'] = canonical_recipes(self.recipe_db.get('recipes', []))
         except FileNotFoundError:
             self.recipe_db = {"recipes": [], "user_preferences": {}, "recipe_history": {}}
-        
-        try:
-            with open(self.ingredient_db_path, 'r') as f:
-                self.ingredient_db = json.load(f)
-        except FileNotFoundError:
-            self.ingredient_db = {"categories": {}}
+        self.assign_content_ids()
+    
+    def assign_content_ids(self):
+        """Give sequentially numbered recipes their content id; the old ids stay resolvable as aliases"""
+        aliases = self.recipe_db.setdefault('id_aliases', {})
+        for recipe in self.recipe_db['recipes']:
+            if not is_recipe_id(recipe.get('id')):
+                new_id = recipe_id(recipe)
+                if recipe.get('id'):
+                    aliases[recipe['id']] = new_id
+                recipe['id'] = new_id
     
     def save_database(self):
-        """Save recipe database to file"""
-        with open(self.recipe_db_path, 'w') as f:
-            json.dump(self.recipe_db, f, indent=2)
+        """
+        Queue a save of the recipe database
+
+        The writer thread serializes it under db_lock, so the file is always a
+        consistent snapshot, back-to-back saves coalesce into one dump of the
+        latest state, and the request thread never pays for serializing.
+        """
+        write_queue.enqueue(self.recipe_db_path, self._serialize_database)
+
+    def _serialize_database(self) -> str:
+        with self.db_lock:
+            return json.dumps(self.recipe_db, indent=2)
     
     def add_recipe(self, recipe):
         """Add a new recipe to the database"""
-        recipe['id'] = f"recipe_{len(self.recipe_db['recipes']) + 1:03d}"
-        recipe['added_date'] = datetime.now().isoformat()
-        self.recipe_db['recipes'].append(recipe)
-        self.save_database()
+        recipe = canonical_recipe(recipe)
+        recipe['id'] = recipe_id(recipe)
+        with self.db_lock:
+            # The same recipe added twice is stored once; a different recipe sharing its link is kept apart
+            existing = self.get_recipe_by_id(recipe['id'])
+            if existing and content_id(existing) != content_id(recipe):
+                recipe['id'] = content_id(recipe)
+                existing = self.get_recipe_by_id(recipe['id'])
+            if existing:
+                return recipe['id']
+            recipe['added_date'] = datetime.now().isoformat()
+            self.recipe_db['recipes'].append(recipe)
+            self.save_database()
+        # Overlap with the catalog becomes a lookup for the new recipe too
+        get_catalog().overlap_matrix().extend([recipe])
         return recipe['id']
     
     def get_user_favorites(self):
@@ -48,17 +86,17 @@ class RecipeManager:
     
     def track_selection(self, recipe_id, week_date):
         """Track a recipe selection for a specific week"""
-        if 'recipe_history' not in self.recipe_db:
-            self.recipe_db['recipe_history'] = {'selected_recipes': []}
-        
         selection = {
             'recipe_id': recipe_id,
             'week_date': week_date,
             'selected_date': datetime.now().isoformat()
         }
         
-        self.recipe_db['recipe_history']['selected_recipes'].append(selection)
-        self.save_database()
+        with self.db_lock:
+            if 'recipe_history' not in self.recipe_db:
+                self.recipe_db['recipe_history'] = {'selected_recipes': []}
+            self.recipe_db['recipe_history']['selected_recipes'].append(selection)
+            self.save_database()
     
     def get_recent_selections(self, weeks=4):
         """Get recipes selected in recent weeks"""
@@ -100,7 +138,8 @@ class RecipeManager:
         }
     
     def get_recipe_by_id(self, recipe_id):
-        """Get recipe by ID"""
+        """Get recipe by ID (content id or a legacy id such as 'recipe_004')"""
+        recipe_id = self.recipe_db.get('id_aliases', {}).get(recipe_id, recipe_id)
         for recipe in self.recipe_db['recipes']:
             if recipe['id'] == recipe_id:
                 return recipe
@@ -166,27 +205,30 @@ class RecipeManager:
         if not recipe:
             return
         
-        if 'user_preferences' not in self.recipe_db:
-            self.recipe_db['user_preferences'] = {}
-        
-        # Update preferences based on rating
-        preferences = self.recipe_db['user_preferences']
-        
-        # Update protein preferences
-        protein = recipe.get('protein')
-        if protein:
-            if 'favorite_proteins' not in preferences:
-                preferences['favorite_proteins'] = {}
-            preferences['favorite_proteins'][protein] = preferences['favorite_proteins'].get(protein, 0) + rating
-        
-        # Update cuisine preferences
-        cuisine = recipe.get('cuisine')
-        if cuisine:
-            if 'favorite_cuisines' not in preferences:
-                preferences['favorite_cuisines'] = {}
-            preferences['favorite_cuisines'][cuisine] = preferences['favorite_cuisines'].get(cuisine, 0) + rating
-        
-        self.save_database()
+        with self.db_lock:
+            if 'user_preferences' not in self.recipe_db:
+                self.recipe_db['user_preferences'] = {}
+            
+            # Update preferences based on rating
+            preferences = self.recipe_db['user_preferences']
+            
+            # Update protein preferences
+            protein = recipe.get('protein')
+            if protein:
+                if 'favorite_proteins' not in preferences:
+                    preferences['favorite_proteins'] = {}
+                preferences['favorite_proteins'][protein] = preferences['favorite_proteins'].get(protein, 0) + rating
+            
+            # Update cuisine preferences
+            cuisine = recipe.get('cuisine')
+            if cuisine:
+                if 'favorite_cuisines' not in preferences:
+                    preferences['favorite_cuisines'] = {}
+                preferences['favorite_cuisines'][cuisine] = preferences['favorite_cuisines'].get(cuisine, 0) + rating
+            
+            # Score vectors cached for the old preferences are dropped
+            data_versions.bump(preferences_dependency())
+            self.save_database()
 
 # Test the system
 if __name__ == "__main__":
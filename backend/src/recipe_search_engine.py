@@ -7,25 +7,23 @@ Finds new gluten-free recipes and creates personalized recommendations
 import json
 import random
 from datetime import datetime
+import numpy as np
 from collections import defaultdict, Counter
+from itertools import islice
+from recipe_catalog import get_catalog
+from data_versions import VersionedCache, preferences_dependency, CATALOG
+from recipe_feature_index import RecipeFeatureIndex
+from overlap_optimizer import IngredientOverlapOptimizer
+from exhaustive_overlap_scorer import ExhaustiveOverlapScorer
 
 class RecipeSearchEngine:
-    def __init__(self):
-        self.recipe_sources = [
-            "https://www.mamaknowsglutenfree.com/",
-            "https://theloopywhisk.com/",
-            "https://meaningfuleats.com/",
-            "https://www.healthygffamily.com/",
-            "https://www.skinnytaste.com/",
-            "https://www.flavourandsavour.com/",
-            "https://www.jessicagavin.com/",
-            "https://kaynutrition.com/",
-            "https://www.faithfullyglutenfree.com/",
-            "https://grainfreetable.com/"
-        ]
-        
-        # Curated gluten-free recipes based on search results
-        self.curated_recipes = [
+    # Pools with at most this many candidate plans are scored exhaustively, in-process
+    EXHAUSTIVE_PLAN_LIMIT = 20000
+    
+    @staticmethod
+    def source_recipes():
+        """Curated gluten-free recipes based on search results (catalog build input)"""
+        return [
             {
                 "name": "Coconut Chicken Rice Bowl",
                 "url": "https://www.skinnytaste.com/coconut-chicken-rice-bowl/",
@@ -207,32 +205,127 @@ class RecipeSearchEngine:
                 "difficulty": "easy"
             }
         ]
+
+    def __init__(self):
+        self.recipe_sources = [
+            "https://www.mamaknowsglutenfree.com/",
+            "https://theloopywhisk.com/",
+            "https://meaningfuleats.com/",
+            "https://www.healthygffamily.com/",
+            "https://www.skinnytaste.com/",
+            "https://www.flavourandsavour.com/",
+            "https://www.jessicagavin.com/",
+            "https://kaynutrition.com/",
+            "https://www.faithfullyglutenfree.com/",
+            "https://grainfreetable.com/"
+        ]
+        
+        # Curated gluten-free recipes based on search results, served from the recipe catalog
+        catalog = get_catalog()
+        self.curated_recipes = catalog.source('curated')
+
+        # Curated recipes encoded once so scoring is a single vector operation
+        self.feature_index = RecipeFeatureIndex(self.curated_recipes)
+        # Per-user score vectors, kept until that user's preferences or the catalog change
+        self.preference_score_cache = VersionedCache('preference_scores', max_entries=64)
+        self.overlap_optimizer = IngredientOverlapOptimizer()
+        self.exhaustive_scorer = ExhaustiveOverlapScorer()
+        
+        # Pairwise shared-ingredient counts over the whole catalog, shared by every engine on that catalog;
+        # its rows are catalog positions, and request recipes stay out of it
+        self.overlap_matrix = catalog.overlap_matrix()
+        self.catalog_rows = np.asarray(self.curated_recipes.positions, dtype=np.int64)
+        self.catalog_positions = defaultdict(list)
+        for position, recipe in enumerate(self.curated_recipes):
+            self.catalog_positions[recipe.get('name')].append(position)
+        
+        # Recipe numbers in the ingredient index are curated positions; postings come from the catalog's mapping
+        self.ingredient_index = catalog.ingredient_index('curated')
     
-    def get_recipe_recommendations(self, user_preferences, recent_selections=None, selected_this_week=None):
+    def get_recipe_recommendations(self, user_preferences, recent_selections=None, selected_this_week=None, limit=None,
+                                   user_id=None):
         """Generate recipe recommendations based on user preferences"""
+        recommendations = self.iter_recipe_recommendations(user_preferences, recent_selections, selected_this_week,
+                                                           user_id=user_id)
+        
+        # Only the top `limit` candidates are ever ordered when the caller needs a few
+        if limit is not None:
+            return list(islice(recommendations, limit))
+        return list(recommendations)
+    
+    def iter_recipe_recommendations(self, user_preferences, recent_selections=None, selected_this_week=None,
+                                    max_per_protein=2, batch_size=16, user_id=None):
+        """
+        Yield recommendations in score order (ties keep catalog order)
+        
+        Candidates are pulled out of the score vector a batch at a time with
+        np.argpartition and the protein quota is checked as each one is
+        yielded, so stopping after k results never sorts the whole catalog.
+        """
         if recent_selections is None:
             recent_selections = []
         if selected_this_week is None:
             selected_this_week = []
         
+        # Score every curated recipe in one pass
+        scores = self.preference_scores(user_preferences, user_id)
+        
         # Filter out recently selected recipes
-        available_recipes = [r for r in self.curated_recipes 
-                           if r.get('name') not in recent_selections]
+        recent = set(recent_selections)
+        available = np.array([r.get('name') not in recent for r in self.curated_recipes], dtype=bool)
+        remaining = np.flatnonzero(available)
+        
+        # Count proteins already selected this week for the variety quota
+        protein_counts = defaultdict(int)
+        for selected_recipe in selected_this_week:
+            protein_counts[selected_recipe.get('protein', 'unknown')] += 1
+        
+        while len(remaining):
+            batch = self._next_score_batch(scores, remaining, batch_size)
+            
+            keep = np.ones(len(remaining), dtype=bool)
+            keep[np.searchsorted(remaining, batch)] = False
+            remaining = remaining[keep]
+            
+            for i in batch:
+                recipe = self.curated_recipes[i]
+                if selected_this_week and protein_counts[recipe.get('protein', 'unknown')] >= max_per_protein:
+                    continue
+                yield recipe
+    
+    def preference_scores(self, user_preferences, user_id=None):
+        """
+        Score vector over the catalog for one user's preferences
         
-        # Score recipes based on user preferences
-        scored_recipes = []
-        for recipe in available_recipes:
-            score = self.calculate_recipe_score(recipe, user_preferences)
-            scored_recipes.append((recipe, score))
+        With a user_id the vector is cached until that user's preferences or
+        the catalog get a new version; it is shared, so callers must not
+        modify it. Without one (ad-hoc preferences) it is computed each time.
+        """
+        if user_id is None:
+            return self.feature_index.score_all(user_preferences)
         
-        # Sort by score (highest first)
-        scored_recipes.sort(key=lambda x: x[1], reverse=True)
+        def compute():
+            scores = self.feature_index.score_all(user_preferences)
+            scores.flags.writeable = False
+            return scores
         
-        # Apply protein variety filter for weekly selections
-        if selected_this_week:
-            scored_recipes = self.filter_protein_variety(scored_recipes, selected_this_week)
+        return self.preference_score_cache.get_or_compute(
+            user_id, [preferences_dependency(user_id), CATALOG], compute)
+    
+    def _next_score_batch(self, scores, remaining, batch_size):
+        """Highest-scoring `batch_size` indices of `remaining` (sorted ascending), in score order"""
+        remaining_scores = scores[remaining]
+        if len(remaining) > batch_size:
+            # Score of the batch_size-th best; everything above it is in, ties fill up in index order
+            threshold = -np.partition(-remaining_scores, batch_size - 1)[batch_size - 1]
+            above = np.flatnonzero(remaining_scores > threshold)
+            ties = np.flatnonzero(remaining_scores == threshold)[:batch_size - len(above)]
+            picked = np.sort(np.concatenate([above, ties]))
+        else:
+            picked = np.arange(len(remaining))
         
-        return [recipe for recipe, score in scored_recipes]
+        order = picked[np.argsort(-remaining_scores[picked], kind='stable')]
+        return remaining[order]
     
     def calculate_recipe_score(self, recipe, user_preferences):
         """Calculate recommendation score for a recipe"""
@@ -288,24 +381,31 @@ class RecipeSearchEngine:
         
         return filtered_recipes
     
-    def optimize_for_ingredient_overlap(self, recipes, target_count=4):
-        """Optimize recipe selection for ingredient overlap"""
+    def optimize_for_ingredient_overlap(self, recipes, target_count=4, required_count=0, time_budget=None, strategy='auto'):
+        """
+        Optimize recipe selection for ingredient overlap
+        
+        strategy 'exhaustive' scores every plan (provably best), 'search' runs
+        the anytime optimizer within its time budget, and 'auto' scores
+        exhaustively whenever the pool is small enough. The first
+        required_count recipes are always kept; the result keeps input order.
+        """
         if len(recipes) <= target_count:
             return recipes
         
-        best_combination = None
-        best_overlap_score = -1
-        
-        # Try different combinations to find best ingredient overlap
-        from itertools import combinations
+        if strategy == 'auto':
+            plan_count = self.exhaustive_scorer.plan_count(len(recipes), target_count, required_count)
+            strategy = 'exhaustive' if plan_count <= self.EXHAUSTIVE_PLAN_LIMIT else 'search'
         
-        for combo in combinations(recipes[:min(15, len(recipes))], target_count):
-            overlap_score = self.calculate_ingredient_overlap_score(combo)
-            if overlap_score > best_overlap_score:
-                best_overlap_score = overlap_score
-                best_combination = combo
+        pool = self.overlap_matrix.scratch().pool(recipes)
+        if strategy == 'exhaustive':
+            result = self.exhaustive_scorer.optimize(recipes, target_count, required_count, encoded=pool)
+        elif strategy == 'search':
+            result = self.overlap_optimizer.optimize(recipes, target_count, required_count, time_budget, encoded=pool)
+        else:
+            raise ValueError(f"Unknown overlap strategy: {strategy}")
         
-        return list(best_combination) if best_combination else recipes[:target_count]
+        return [recipes[i] for i in result['indices']]
     
     def calculate_ingredient_overlap_score(self, recipes):
         """Calculate ingredient overlap score for a set of recipes"""
@@ -317,6 +417,154 @@ class RecipeSearchEngine:
         overlap_score = sum(count - 1 for count in ingredient_counts.values() if count > 1)
         
         return overlap_score
+    
+    def calculate_ingredient_overlap(self, recipes):
+        """Shared ingredients, pairwise overlap and overlap percentage for a set of recipes"""
+        scratch = self.overlap_matrix.scratch()
+        pool = scratch.pool(recipes)
+        
+        union = 0
+        shared = 0
+        for bitset in pool['bitsets']:
+            shared |= union & bitset
+            union |= bitset
+        
+        total_unique = union.bit_count()
+        return {
+            'overlap_score': sum(pool['lengths']) - total_unique,
+            'shared_ingredients': scratch.shared_ingredients(shared),
+            'total_unique_ingredients': total_unique,
+            'overlap_percentage': round(shared.bit_count() / total_unique * 100, 1) if total_unique else 0,
+            'pairwise_shared': scratch.shared_matrix(pool).tolist()
+        }
+    
+    def rank_by_shared_ingredients(self, anchors, candidates):
+        """Order candidates by how many ingredients they share with the anchor recipes"""
+        if not candidates:
+            return []
+        
+        scratch = self.overlap_matrix.scratch()
+        pool = scratch.pool(list(anchors) + list(candidates))
+        anchor_count = len(anchors)
+        shared_with_anchors = scratch.shared_matrix(pool, rows=np.arange(anchor_count, len(pool['rows'])),
+                                                    columns=np.arange(anchor_count)).sum(axis=1)
+        order = np.argsort(-shared_with_anchors, kind='stable')
+        return [candidates[i] for i in order]
+    
+    def rank_next_picks(self, picked, user_preferences=None, candidates=None, limit=10,
+                        preference_weight=1.0, new_item_weight=1.0, user_id=None):
+        """
+        Rank what to pick next given the recipes picked so far
+        
+        Each candidate is scored by its preference score minus the number of
+        grocery items it would add on top of the picks' union, computed for
+        the whole pool at once with a vectorized AND-NOT + popcount.
+        """
+        user_preferences = user_preferences or {}
+        # Posted picks and candidates are encoded for this call only, never added to the matrix
+        scratch = self.overlap_matrix.scratch()
+        
+        if candidates is None:
+            # Catalog recipes: encodings and scores are already indexed
+            candidates = self.curated_recipes
+            words = self.overlap_matrix.word_rows(self.catalog_rows)
+            preference_scores = self.preference_scores(user_preferences, user_id)
+        else:
+            words = scratch.pool(candidates)['words']
+            preference_scores = self.feature_index.score_recipes(candidates, user_preferences)
+        
+        # Words past the candidates' width only hold ingredients no candidate uses
+        union = scratch.union_words(picked)[:words.shape[1]]
+        new_items = np.bitwise_count(words & ~union).sum(axis=1, dtype=np.int64)
+        scores = preference_weight * preference_scores - new_item_weight * new_items
+        
+        # Never suggest something already picked
+        picked_names = {recipe.get('name') for recipe in picked}
+        if candidates is self.curated_recipes:
+            available = np.ones(len(candidates), dtype=bool)
+            for name in picked_names:
+                available[self.catalog_positions.get(name, [])] = False
+            available = np.flatnonzero(available)
+        else:
+            available = np.flatnonzero([recipe.get('name') not in picked_names for recipe in candidates])
+        
+        if limit is not None and len(available) > limit:
+            top = available[np.argpartition(-scores[available], limit - 1)[:limit]]
+        else:
+            top = available
+        top = top[np.argsort(-scores[top], kind='stable')]
+        
+        return [{
+            'recipe': candidates[i],
+            'score': round(float(scores[i]), 3),
+            'new_ingredients': int(new_items[i]),
+            'preference_score': round(float(preference_scores[i]), 3)
+        } for i in top]
+    
+    def find_swap_candidates(self, picks, drop_index, user_preferences=None, limit=5, max_per_protein=2,
+                             user_id=None):
+        """
+        Rank catalog replacements for picks[drop_index] by how little the grocery list changes
+        
+        The change is the symmetric difference between the dropped recipe and
+        the candidate outside what the other picks already need, i.e. exactly
+        the lines added to plus removed from the list. Candidates come from
+        the ingredient index (anything sharing an ingredient with the picks)
+        and must keep every protein within its weekly quota.
+        """
+        if limit <= 0:
+            return []
+        user_preferences = user_preferences or {}
+        dropped = picks[drop_index]
+        kept = [recipe for i, recipe in enumerate(picks) if i != drop_index]
+        
+        # Catalog positions that share at least one ingredient with the plan
+        plan_ingredients = {line for recipe in picks for line in recipe.get('ingredients', [])}
+        postings = [self.ingredient_index.lookup(line) for line in plan_ingredients]
+        candidates = self.ingredient_index.union(*postings)
+        if len(candidates) < limit:
+            candidates = np.arange(len(self.curated_recipes), dtype=np.int64)
+        
+        # Protein quota and no repeats of current picks
+        protein_counts = Counter(recipe.get('protein', 'unknown') for recipe in kept)
+        pick_names = {recipe.get('name') for recipe in picks}
+        allowed = [position for position in candidates
+                   if self.curated_recipes[position].get('name') not in pick_names
+                   and protein_counts[self.curated_recipes[position].get('protein', 'unknown')] < max_per_protein]
+        if not allowed:
+            return []
+        allowed = np.array(allowed, dtype=np.int64)
+        
+        scratch = self.overlap_matrix.scratch()
+        kept_bits = scratch.union_bits(kept)
+        dropped_bits = scratch.union_bits([dropped])
+        words = self.overlap_matrix.word_rows(self.catalog_rows[allowed])
+        kept_words, dropped_words = scratch.to_words([kept_bits, dropped_bits])[:, :words.shape[1]]
+        
+        changes = np.bitwise_count((words ^ dropped_words) & ~kept_words).sum(axis=1, dtype=np.int64)
+        preference_scores = self.preference_scores(user_preferences, user_id)[allowed]
+        
+        # Smallest change first, preference breaks ties
+        if len(allowed) > limit:
+            top = np.argpartition(changes, limit - 1)[:limit]
+            threshold = changes[top].max()
+            top = np.flatnonzero(changes <= threshold)
+        else:
+            top = np.arange(len(allowed))
+        top = top[np.lexsort((-preference_scores[top], changes[top]))][:limit]
+        
+        swaps = []
+        for i in top:
+            position = int(allowed[i])
+            candidate_bits = self.overlap_matrix.bitset(self.catalog_rows[position])
+            swaps.append({
+                'recipe': self.curated_recipes[position],
+                'grocery_change': int(changes[i]),
+                'added_ingredients': scratch.shared_ingredients(candidate_bits & ~kept_bits & ~dropped_bits),
+                'removed_ingredients': scratch.shared_ingredients(dropped_bits & ~kept_bits & ~candidate_bits),
+                'preference_score': round(float(preference_scores[i]), 3)
+            })
+        return swaps
 
 # Test the search engine
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from flask_cors import cross_origin
 import sys
 import os
+from datetime import datetime
 
 # Add the backend directory to the path for imports
 backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
@@ -13,6 +14,16 @@ from simple_grocery_generator import SimpleGroceryGenerator
 from recipe_manager import RecipeManager
 from recipe_search_engine import RecipeSearchEngine
 from enhanced_web_recipe_search import EnhancedWebRecipeSearcher
+from ingredient_normalizer import IngredientNormalizer
+from household_order_aggregator import HouseholdOrderAggregator
+from price_model import PriceModel
+from write_behind_queue import write_queue
+from idempotency_store import idempotent
+from recipe_schema import canonical_recipes
+from recipe_record import RecipeOverlay
+from recipe_catalog import get_catalog, catalog_data
+from hot_reload import reloader
+from data_versions import data_versions, DEFAULT_USER
 
 enhanced_recipe_bp = Blueprint('enhanced_recipe', __name__)
 
@@ -21,8 +32,28 @@ endless_recipe_generator = EndlessRecipeGenerator()
 grocery_system = IntegratedGrocerySystem()
 simple_grocery_generator = SimpleGroceryGenerator()
 recipe_manager = RecipeManager()
-search_engine = RecipeSearchEngine()
 web_searcher = EnhancedWebRecipeSearcher()
+ingredient_normalizer = IngredientNormalizer()
+order_aggregator = HouseholdOrderAggregator(ingredient_normalizer)
+price_model = PriceModel(ingredient_normalizer)
+
+def build_search_state():
+    """
+    Catalog-derived search structures, built together so a request never mixes versions
+
+    The text and facet indexes cover the whole catalog (every source, merged and
+    deduplicated); their postings and code columns are read from the catalog's
+    shared read-only mapping.
+    """
+    catalog = get_catalog()
+    return {
+        'engine': RecipeSearchEngine(),
+        'text_index': catalog.text_index(),
+        'facet_index': catalog.facet_index()
+    }
+
+# Rebuilt off to the side and swapped in whenever the catalog is reloaded
+search_state = reloader.register('recipe_search', build_search_state, depends_on=[catalog_data])
 
 @enhanced_recipe_bp.route('/weekly-suggestions', methods=['GET'])
 @cross_origin()
@@ -85,52 +116,174 @@ def update_suggestions_after_selection():
             'suggestions': []
         }), 500
 
-@enhanced_recipe_bp.route('/search-recipes', methods=['POST'])
+@enhanced_recipe_bp.route('/next-picks', methods=['POST'])
 @cross_origin()
-def search_web_recipes():
-    """Search for recipes by criteria - endless variety"""
+def rank_next_picks():
+    """Rank candidates by fewest new grocery items on top of the picks so far, plus preference"""
     try:
         data = request.get_json()
-        protein = data.get('protein')
-        cuisine = data.get('cuisine')
-        cooking_method = data.get('cooking_method')
-        count = data.get('count', 10)
+        # Recipes posted by the client are canonicalized like every catalog source
+        selected_recipes = canonical_recipes(data.get('selected_recipes', []))
+        selected_recipe_names = data.get('selected_recipe_names', [])
+        candidates = data.get('candidates')
+        if candidates is not None:
+            candidates = canonical_recipes(candidates)
+        limit = int(data.get('limit', 10))
+        search_engine = search_state.current['engine']
+        
+        # Picks sent by name are resolved from the catalog
+        for name in selected_recipe_names:
+            for position in search_engine.catalog_positions.get(name, [])[:1]:
+                selected_recipes.append(search_engine.curated_recipes[position])
+        
+        user_preferences = recipe_manager.recipe_db.get('user_preferences', {})
+        ranked = search_engine.rank_next_picks(
+            selected_recipes,
+            user_preferences,
+            candidates=candidates,
+            limit=limit,
+            user_id=DEFAULT_USER
+        )
         
-        # Generate endless recipes and filter by criteria
-        result = endless_recipe_generator.generate_endless_recipes(count=30, force_fresh=True)
+        return jsonify({
+            'success': True,
+            'picked_count': len(selected_recipes),
+            'suggestions': ranked
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'suggestions': []
+        }), 500
+
+@enhanced_recipe_bp.route('/swap-candidates', methods=['POST'])
+@cross_origin()
+def find_swap_candidates():
+    """Replacements for one of the four picks that change the grocery list the least"""
+    try:
+        data = request.get_json()
+        selected_recipes = canonical_recipes(data.get('selected_recipes', []))
+        selected_recipe_names = data.get('selected_recipe_names', [])
+        drop_index = data.get('drop_index')
+        drop_recipe_name = data.get('drop_recipe_name')
+        limit = int(data.get('limit', 5))
+        search_engine = search_state.current['engine']
+        
+        for name in selected_recipe_names:
+            for position in search_engine.catalog_positions.get(name, [])[:1]:
+                selected_recipes.append(search_engine.curated_recipes[position])
+        
+        if len(selected_recipes) != 4:
+            return jsonify({
+                'success': False,
+                'error': 'Exactly 4 recipes must be selected'
+            }), 400
         
-        if not result['success']:
+        if drop_index is None and drop_recipe_name:
+            names = [recipe.get('name') for recipe in selected_recipes]
+            drop_index = names.index(drop_recipe_name) if drop_recipe_name in names else None
+        if drop_index is None or not 0 <= int(drop_index) < 4:
             return jsonify({
                 'success': False,
-                'error': 'Failed to generate recipes',
+                'error': 'drop_index or drop_recipe_name must identify one of the selected recipes'
+            }), 400
+        
+        user_preferences = recipe_manager.recipe_db.get('user_preferences', {})
+        swaps = search_engine.find_swap_candidates(
+            selected_recipes,
+            int(drop_index),
+            user_preferences,
+            limit=limit,
+            user_id=DEFAULT_USER
+        )
+        
+        return jsonify({
+            'success': True,
+            'dropped_recipe': selected_recipes[int(drop_index)].get('name'),
+            'swap_candidates': swaps
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'swap_candidates': []
+        }), 500
+
+@enhanced_recipe_bp.route('/search', methods=['GET'])
+@cross_origin()
+def search_recipes_text():
+    """Free-text recipe search (names, ingredients, instructions) ranked by BM25"""
+    try:
+        query = request.args.get('q', '').strip()
+        try:
+            page = max(1, int(request.args.get('page', 1)))
+            per_page = min(100, max(1, int(request.args.get('per_page', 10))))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'page and per_page must be integers',
                 'recipes': []
-            }), 500
+            }), 400
+        
+        if not query:
+            return jsonify({
+                'success': False,
+                'error': 'Query parameter q is required',
+                'recipes': []
+            }), 400
         
-        all_recipes = result['suggestions']
-        filtered_recipes = []
+        result = search_state.current['text_index'].search(query, offset=(page - 1) * per_page, limit=per_page)
         
-        for recipe in all_recipes:
-            matches = True
-            if protein and recipe.get('protein') != protein:
-                matches = False
-            if cuisine and recipe.get('cuisine') != cuisine:
-                matches = False
-            if cooking_method and recipe.get('cooking_method') != cooking_method:
-                matches = False
-            
-            if matches:
-                filtered_recipes.append(recipe)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'recipes': [match['recipe'] for match in result['results']],
+            'scores': [match['score'] for match in result['results']],
+            'total_found': result['total'],
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (result['total'] + per_page - 1) // per_page
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'recipes': []
+        }), 500
+
+@enhanced_recipe_bp.route('/search-recipes', methods=['POST'])
+@cross_origin()
+def search_web_recipes():
+    """Search the whole catalog by protein, cuisine and cooking method, with facet counts"""
+    try:
+        data = request.get_json()
+        protein = data.get('protein')
+        cuisine = data.get('cuisine')
+        cooking_method = data.get('cooking_method')
+        count = data.get('count', 10)
+        
+        # Whole catalog, catalog order; cached per filter tuple until the catalog changes
+        facet_index = search_state.current['facet_index']
+        result = facet_index.search({
+            'protein': protein,
+            'cuisine': cuisine,
+            'cooking_method': cooking_method
+        })
+        positions = result['positions']
         
         return jsonify({
             'success': True,
-            'recipes': filtered_recipes[:count],
+            'recipes': facet_index.recipes_for(positions[:count]),
             'search_criteria': {
                 'protein': protein,
                 'cuisine': cuisine,
                 'cooking_method': cooking_method
             },
-            'total_found': len(filtered_recipes),
-            'source': 'endless_web_search'
+            'total_found': len(positions),
+            'facets': result['facets'],
+            'catalog_version': result['catalog_version'],
+            'source': 'catalog_facet_index'
         })
     except Exception as e:
         return jsonify({
@@ -185,7 +338,7 @@ def calculate_ingredient_overlap():
             }), 400
         
         # Calculate overlap using the search engine
-        overlap_info = search_engine.calculate_ingredient_overlap(recipes)
+        overlap_info = search_state.current['engine'].calculate_ingredient_overlap(recipes)
         
         return jsonify({
             'success': True,
@@ -202,6 +355,7 @@ def calculate_ingredient_overlap():
 
 @enhanced_recipe_bp.route('/grocery-list', methods=['POST'])
 @cross_origin()
+@idempotent
 def generate_grocery_list():
     """Generate enhanced grocery list for selected recipes with reliable fallback"""
     try:
@@ -285,6 +439,7 @@ def generate_grocery_list():
             'selected_recipes': result['selected_recipes'],
             'generation_date': result.get('generation_date'),
             'generation_method': result.get('generation_method', 'unknown'),
+            'estimated_cost': price_model.price_recipes(result['selected_recipes']),
             'week_date': week_date
         })
     except Exception as e:
@@ -294,13 +449,126 @@ def generate_grocery_list():
             'error': f'Failed to generate grocery list: {str(e)}'
         }), 500
 
+@enhanced_recipe_bp.route('/grocery-list/export', methods=['POST'])
+@cross_origin()
+def export_grocery_list():
+    """Export a grocery list as markdown, text, HTML or CSV"""
+    try:
+        data = request.get_json()
+        output_format = data.get('format', 'markdown')
+        week_date = data.get('week_date') or datetime.now().strftime('%Y-%m-%d')
+        
+        if output_format not in grocery_system.renderer.formats:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported format. Use one of: {', '.join(grocery_system.renderer.formats)}"
+            }), 400
+        
+        selected_recipes = list(data.get('selected_recipes', []))
+        for recipe_id in data.get('recipe_ids', []):
+            recipe = recipe_manager.get_recipe_by_id(recipe_id)
+            if recipe:
+                selected_recipes.append(recipe)
+        
+        if not selected_recipes:
+            return jsonify({
+                'success': False,
+                'error': 'At least 1 recipe is required'
+            }), 400
+        
+        grocery_data = grocery_system.grocery_generator.generate_grocery_list(selected_recipes)
+        grocery_view = grocery_system.build_grocery_view(grocery_data, selected_recipes, week_date)
+        mimetype = grocery_system.renderer.content_types[output_format]
+        
+        # Large lists are streamed chunk by chunk instead of rendered into one string
+        if data.get('stream'):
+            chunks = grocery_system.renderer.stream(grocery_view, output_format)
+            return Response(stream_with_context(chunks), mimetype=mimetype)
+        
+        return Response(grocery_system.renderer.render(grocery_view, output_format), mimetype=mimetype)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@enhanced_recipe_bp.route('/coop-order', methods=['POST'])
+@cross_origin()
+def generate_coop_order():
+    """Aggregate many households' selections into one wholesale co-op order"""
+    try:
+        data = request.get_json()
+        households = data.get('households', [])
+        
+        if not households:
+            return jsonify({
+                'success': False,
+                'error': 'At least 1 household is required'
+            }), 400
+        
+        result = order_aggregator.aggregate_orders(
+            households,
+            recipe_lookup=recipe_manager.get_recipe_by_id
+        )
+        
+        return jsonify(result)
+    except Exception as e:
+        print(f"Co-op order aggregation error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Failed to aggregate co-op order: {str(e)}'
+        }), 500
+
+@enhanced_recipe_bp.route('/price-lists', methods=['POST'])
+@cross_origin()
+def price_grocery_lists():
+    """Price a batch of grocery lists at every store in one pass"""
+    try:
+        data = request.get_json()
+        lists = data.get('lists', [])
+        
+        recipe_lists = []
+        for grocery_list in lists:
+            recipes = list(grocery_list.get('selected_recipes', []))
+            for recipe_id in grocery_list.get('recipe_ids', []):
+                recipe = recipe_manager.get_recipe_by_id(recipe_id)
+                if recipe:
+                    recipes.append(recipe)
+            recipe_lists.append(recipes)
+        
+        pricing = price_model.price_batch(recipe_lists)
+        
+        return jsonify({
+            'success': True,
+            'stores': price_model.stores,
+            'pricing': pricing,
+            'total_lists': len(pricing)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @enhanced_recipe_bp.route('/recipe/<recipe_id>', methods=['GET'])
 @cross_origin()
 def get_recipe_details(recipe_id):
     """Get detailed information about a specific recipe"""
     try:
+        # The user's recipe database comes first: its recipes (and their old recipe_NNN ids)
+        # are live data, the catalog only holds the static sources
         recipe = recipe_manager.get_recipe_by_id(recipe_id)
         
+        # Catalog ids and legacy ids (expanded_001, simple_002, ...) resolve through the catalog;
+        # its stored JSON is sent as is, without decoding the record
+        catalog = get_catalog()
+        position = catalog.position(recipe_id) if recipe is None else None
+        if position is not None:
+            if catalog.column_value('source', position) != 'web_search':
+                body = b'{"success":true,"recipe":' + catalog.record_bytes(position) + b'}'
+                return Response(body, mimetype='application/json')
+            recipe = catalog.get(recipe_id)
+        
         if not recipe:
             return jsonify({
                 'success': False,
@@ -309,8 +577,7 @@ def get_recipe_details(recipe_id):
         
         # Add additional context if it's a web recipe
         if recipe.get('source') == 'web_search':
-            recipe['is_web_recipe'] = True
-            recipe['website'] = recipe.get('website', 'cooking website')
+            recipe = RecipeOverlay(recipe, is_web_recipe=True, website=recipe.get('website', 'cooking website'))
         
         return jsonify({
             'success': True,
@@ -353,6 +620,7 @@ def get_user_preferences():
 
 @enhanced_recipe_bp.route('/rate-recipe', methods=['POST'])
 @cross_origin()
+@idempotent
 def rate_recipe():
     """Rate a recipe to update user preferences"""
     try:
@@ -414,6 +682,21 @@ def get_cooking_equipment():
             'error': str(e)
         }), 500
 
+@enhanced_recipe_bp.route('/write-queue/metrics', methods=['GET'])
+@cross_origin()
+def get_write_queue_metrics():
+    """Get background writer queue depth and flush latency"""
+    try:
+        return jsonify({
+            'success': True,
+            'metrics': write_queue.get_metrics()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @enhanced_recipe_bp.route('/recipe-sources', methods=['GET'])
 @cross_origin()
 def get_recipe_sources():
@@ -438,6 +721,8 @@ def get_recipe_sources():
             'source_statistics': source_stats,
             'website_statistics': website_stats,
             'total_recipes': len(all_recipes),
+            'catalog': get_catalog().stats(),
+            'data_versions': data_versions.status(),
             'supported_sources': [
                 'user_favorite',
                 'web_search',
@@ -10,6 +10,7 @@ from src.weekly_suggestion_generator import WeeklySuggestionGenerator
 from src.integrated_grocery_system import IntegratedGrocerySystem
 from src.recipe_manager import RecipeManager
 from src.recipe_search_engine import RecipeSearchEngine
+from idempotency_store import idempotent
 
 recipe_bp = Blueprint('recipe', __name__)
 
@@ -83,6 +84,7 @@ def calculate_ingredient_overlap():
 
 @recipe_bp.route('/grocery-list', methods=['POST'])
 @cross_origin()
+@idempotent
 def generate_grocery_list():
     """Generate final grocery list for selected recipes"""
     try:
@@ -105,6 +107,8 @@ def generate_grocery_list():
             'equipment_reminders': result['raw_data']['equipment_reminders'],
             'shopping_tips': result['raw_data']['shopping_tips'],
             'estimated_cost': result['raw_data']['estimated_cost_range'],
+            'store_totals': result['raw_data']['store_totals'],
+            'cheapest_store': result['raw_data']['cheapest_store'],
             'selected_recipes': result['selected_recipes']
         })
     except Exception as e:
@@ -158,6 +162,7 @@ def get_user_preferences():
 
 @recipe_bp.route('/rate-recipe', methods=['POST'])
 @cross_origin()
+@idempotent
 def rate_recipe():
     """Rate a recipe to update user preferences"""
     try:
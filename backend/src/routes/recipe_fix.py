@@ -1,239 +1,26 @@
 from flask import Blueprint, jsonify, request
 from flask_cors import cross_origin
-import random
 from datetime import datetime
 import json
+from price_model import PriceModel
+from idempotency_store import idempotent
+from recipe_catalog import get_catalog, catalog_data, recipe_dependencies
+from columnar_catalog import ColumnarCatalog
+from hot_reload import reloader
+from recipe_schema import canonical_recipe, content_id
+from data_versions import VersionedCache
 
 recipe_fix_bp = Blueprint('recipe_fix', __name__)
+price_model = PriceModel()
 
-# Sample recipe database for immediate functionality
-SAMPLE_RECIPES = [
-    {
-        "id": "recipe_001",
-        "name": "Mediterranean Grilled Chicken with Roasted Vegetables",
-        "protein": "chicken",
-        "vegetables": ["zucchini", "bell peppers", "red onion"],
-        "starch_grain": "quinoa",
-        "prep_time": "35 minutes",
-        "difficulty": "easy",
-        "cuisine": "mediterranean",
-        "cooking_method": "grill",
-        "recipe_link": "https://example.com/mediterranean-grilled-chicken",
-        "ingredients": ["chicken breast", "zucchini", "bell peppers", "red onion", "quinoa", "olive oil", "lemon", "herbs"],
-        "is_favorite": True,
-        "source": "user_favorite"
-    },
-    {
-        "id": "recipe_002",
-        "name": "One-Pan Lemon Herb Chicken with Sweet Potatoes",
-        "protein": "chicken",
-        "vegetables": ["brussels sprouts", "carrots"],
-        "starch_grain": "sweet potatoes",
-        "prep_time": "45 minutes",
-        "difficulty": "easy",
-        "cuisine": "american",
-        "cooking_method": "oven",
-        "recipe_link": "https://example.com/lemon-herb-chicken-sweet-potatoes",
-        "ingredients": ["chicken thighs", "sweet potatoes", "brussels sprouts", "carrots", "lemon", "herbs", "olive oil"],
-        "is_favorite": True,
-        "source": "user_favorite"
-    },
-    {
-        "id": "recipe_003",
-        "name": "Asian Beef Stir-Fry with Broccoli",
-        "protein": "beef",
-        "vegetables": ["broccoli", "snow peas", "carrots"],
-        "starch_grain": "jasmine rice",
-        "prep_time": "25 minutes",
-        "difficulty": "medium",
-        "cuisine": "asian",
-        "cooking_method": "stove",
-        "recipe_link": "https://example.com/asian-beef-stir-fry",
-        "ingredients": ["beef sirloin", "broccoli", "snow peas", "carrots", "jasmine rice", "soy sauce", "ginger", "garlic"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_004",
-        "name": "Pan-Seared Salmon with Lemon Dill Quinoa",
-        "protein": "salmon",
-        "vegetables": ["green beans", "zucchini"],
-        "starch_grain": "quinoa",
-        "prep_time": "25 minutes",
-        "difficulty": "medium",
-        "cuisine": "mediterranean",
-        "cooking_method": "stove",
-        "recipe_link": "https://example.com/pan-seared-salmon-quinoa",
-        "ingredients": ["salmon fillets", "green beans", "zucchini", "quinoa", "lemon", "dill", "olive oil"],
-        "is_favorite": True,
-        "source": "user_favorite"
-    },
-    {
-        "id": "recipe_005",
-        "name": "Air Fryer Pork Tenderloin with Roasted Root Vegetables",
-        "protein": "pork",
-        "vegetables": ["parsnips", "carrots", "brussels sprouts"],
-        "starch_grain": "mashed cauliflower",
-        "prep_time": "40 minutes",
-        "difficulty": "medium",
-        "cuisine": "american",
-        "cooking_method": "air_fryer",
-        "recipe_link": "https://example.com/air-fryer-pork-tenderloin",
-        "ingredients": ["pork tenderloin", "parsnips", "carrots", "brussels sprouts", "cauliflower", "herbs", "olive oil"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_006",
-        "name": "Cajun Shrimp and Vegetable Skewers",
-        "protein": "shrimp",
-        "vegetables": ["bell peppers", "zucchini", "red onion"],
-        "starch_grain": "coconut rice",
-        "prep_time": "25 minutes",
-        "difficulty": "easy",
-        "cuisine": "american",
-        "cooking_method": "grill",
-        "recipe_link": "https://example.com/cajun-shrimp-skewers",
-        "ingredients": ["shrimp", "bell peppers", "zucchini", "red onion", "coconut rice", "cajun seasoning", "olive oil"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_007",
-        "name": "Greek Lamb Chops with Lemon Potatoes",
-        "protein": "lamb",
-        "vegetables": ["green beans", "tomatoes"],
-        "starch_grain": "roasted potatoes",
-        "prep_time": "50 minutes",
-        "difficulty": "medium",
-        "cuisine": "mediterranean",
-        "cooking_method": "oven",
-        "recipe_link": "https://example.com/greek-lamb-chops",
-        "ingredients": ["lamb chops", "green beans", "tomatoes", "potatoes", "lemon", "oregano", "olive oil"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_008",
-        "name": "Slow Cooker Beef and Vegetable Stew",
-        "protein": "beef",
-        "vegetables": ["potatoes", "carrots", "celery"],
-        "starch_grain": "gluten-free bread rolls",
-        "prep_time": "20 minutes (6 hours cook)",
-        "difficulty": "easy",
-        "cuisine": "american",
-        "cooking_method": "instant_pot",
-        "recipe_link": "https://example.com/slow-cooker-beef-stew",
-        "ingredients": ["beef chuck", "potatoes", "carrots", "celery", "beef broth", "tomato paste", "herbs"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_009",
-        "name": "Mediterranean Turkey Meatballs with Zucchini Noodles",
-        "protein": "turkey",
-        "vegetables": ["zucchini", "cherry tomatoes"],
-        "starch_grain": "polenta",
-        "prep_time": "35 minutes",
-        "difficulty": "medium",
-        "cuisine": "mediterranean",
-        "cooking_method": "oven",
-        "recipe_link": "https://example.com/turkey-meatballs-zucchini",
-        "ingredients": ["ground turkey", "zucchini", "cherry tomatoes", "polenta", "herbs", "olive oil", "garlic"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_010",
-        "name": "Garlic Butter Shrimp with Cauliflower Rice",
-        "protein": "shrimp",
-        "vegetables": ["broccoli", "snap peas"],
-        "starch_grain": "cauliflower rice",
-        "prep_time": "20 minutes",
-        "difficulty": "easy",
-        "cuisine": "american",
-        "cooking_method": "stove",
-        "recipe_link": "https://example.com/garlic-butter-shrimp",
-        "ingredients": ["shrimp", "broccoli", "snap peas", "cauliflower", "garlic", "butter", "lemon"],
-        "is_favorite": True,
-        "source": "user_favorite"
-    },
-    {
-        "id": "recipe_011",
-        "name": "Blackened Cod with Roasted Sweet Potato Wedges",
-        "protein": "fish",
-        "vegetables": ["asparagus", "cherry tomatoes"],
-        "starch_grain": "sweet potato wedges",
-        "prep_time": "35 minutes",
-        "difficulty": "medium",
-        "cuisine": "american",
-        "cooking_method": "oven",
-        "recipe_link": "https://example.com/blackened-cod-sweet-potato",
-        "ingredients": ["cod fillets", "asparagus", "cherry tomatoes", "sweet potatoes", "cajun seasoning", "olive oil"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_012",
-        "name": "Honey Glazed Salmon with Asparagus",
-        "protein": "salmon",
-        "vegetables": ["asparagus", "cherry tomatoes"],
-        "starch_grain": "wild rice",
-        "prep_time": "30 minutes",
-        "difficulty": "medium",
-        "cuisine": "american",
-        "cooking_method": "oven",
-        "recipe_link": "https://example.com/honey-glazed-salmon",
-        "ingredients": ["salmon fillets", "asparagus", "cherry tomatoes", "wild rice", "honey", "soy sauce", "garlic"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_013",
-        "name": "Five-Spice Duck Breast with Asian Vegetables",
-        "protein": "duck",
-        "vegetables": ["bok choy", "snow peas", "carrots"],
-        "starch_grain": "brown rice",
-        "prep_time": "45 minutes",
-        "difficulty": "hard",
-        "cuisine": "asian",
-        "cooking_method": "stove",
-        "recipe_link": "https://example.com/five-spice-duck-breast",
-        "ingredients": ["duck breast", "bok choy", "snow peas", "carrots", "brown rice", "five-spice", "soy sauce", "ginger"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_014",
-        "name": "Cuban Mojo Pork with Black Beans and Rice",
-        "protein": "pork",
-        "vegetables": ["bell peppers", "onions"],
-        "starch_grain": "brown rice",
-        "prep_time": "50 minutes",
-        "difficulty": "medium",
-        "cuisine": "american",
-        "cooking_method": "oven",
-        "recipe_link": "https://example.com/cuban-mojo-pork",
-        "ingredients": ["pork shoulder", "bell peppers", "onions", "brown rice", "black beans", "citrus", "garlic", "cumin"],
-        "is_favorite": False,
-        "source": "web_search"
-    },
-    {
-        "id": "recipe_015",
-        "name": "Herb-Crusted Turkey Breast with Roasted Vegetables",
-        "protein": "turkey",
-        "vegetables": ["sweet potatoes", "green beans"],
-        "starch_grain": "quinoa pilaf",
-        "prep_time": "60 minutes",
-        "difficulty": "hard",
-        "cuisine": "american",
-        "cooking_method": "oven",
-        "recipe_link": "https://example.com/herb-crusted-turkey-breast",
-        "ingredients": ["turkey breast", "sweet potatoes", "green beans", "quinoa", "herbs", "olive oil", "lemon"],
-        "is_favorite": False,
-        "source": "web_search"
-    }
-]
+# Code columns over the sample recipes (sample_recipes.json, served from the recipe catalog)
+# for favorite/protein selection; rebuilt whenever the catalog is reloaded
+sample_data = reloader.register(
+    'sample_columns', lambda: ColumnarCatalog(get_catalog().source('sample')), depends_on=[catalog_data]
+)
+
+# Department lists per set of recipes; an entry goes only when one of its recipes changes
+department_lists = VersionedCache('department_lists', max_entries=128)
 
 @recipe_fix_bp.route('/weekly-suggestions', methods=['GET'])
 @cross_origin()
@@ -244,38 +31,18 @@ def get_weekly_suggestions_fixed():
         count = int(request.args.get('count', 15))
         include_web = request.args.get('include_web', 'true').lower() == 'true'
         fresh = request.args.get('fresh', 'false').lower() == 'true'
+        sample_columns = sample_data.current
         
-        # Shuffle recipes for variety
-        available_recipes = SAMPLE_RECIPES.copy()
-        random.shuffle(available_recipes)
-        
-        # Ensure protein variety (max 2 of same protein)
-        selected_recipes = []
-        protein_count = {}
-        
-        # First add favorites
-        favorites = [r for r in available_recipes if r.get('is_favorite', False)]
-        for recipe in favorites[:3]:  # Max 3 favorites
-            selected_recipes.append(recipe)
-            protein = recipe['protein']
-            protein_count[protein] = protein_count.get(protein, 0) + 1
+        # First add favorites (max 3, random)
+        favorite_rows = sample_columns.sample(sample_columns.mask(favorites=True), min(count, 3), fill=False)
         
-        # Then add variety
-        remaining = [r for r in available_recipes if not r.get('is_favorite', False)]
-        for recipe in remaining:
-            if len(selected_recipes) >= count:
-                break
-            protein = recipe['protein']
-            if protein_count.get(protein, 0) < 2:
-                selected_recipes.append(recipe)
-                protein_count[protein] = protein_count.get(protein, 0) + 1
-        
-        # Fill remaining slots if needed
-        for recipe in remaining:
-            if len(selected_recipes) >= count:
-                break
-            if recipe not in selected_recipes:
-                selected_recipes.append(recipe)
+        # Then add variety (max 2 of same protein, favorites included), filling remaining slots if needed
+        variety_rows = sample_columns.sample(
+            sample_columns.mask(favorites=False), count - len(favorite_rows),
+            quotas={'protein': 2},
+            start_counts={'protein': sample_columns.distribution('protein', favorite_rows)}
+        )
+        selected_recipes = sample_columns.recipes_for(favorite_rows) + sample_columns.recipes_for(variety_rows)
         
         # Limit to requested count
         selected_recipes = selected_recipes[:count]
@@ -307,8 +74,73 @@ def get_weekly_suggestions_fixed():
             'suggestions': []
         }), 500
 
+def organize_by_department(selected_recipes):
+    """Unique ingredients of the recipes grouped by store department; returns (departments, item count)"""
+    # Organize ingredients by department
+    departments = {
+        "Proteins": [],
+        "Vegetables": [],
+        "Grains & Starches": [],
+        "Pantry": [],
+        "Dairy": []
+    }
+    
+    all_ingredients = []
+    for recipe in selected_recipes:
+        ingredients = recipe.get('ingredients', [])
+        all_ingredients.extend(ingredients)
+    
+    # Remove duplicates while preserving order
+    unique_ingredients = list(dict.fromkeys(all_ingredients))
+    
+    # Categorize ingredients
+    protein_keywords = ['chicken', 'beef', 'salmon', 'shrimp', 'turkey', 'pork', 'lamb', 'duck', 'cod', 'fish']
+    vegetable_keywords = ['zucchini', 'bell peppers', 'onion', 'broccoli', 'carrots', 'asparagus', 'tomatoes', 'green beans', 'brussels sprouts', 'spinach', 'bok choy', 'snow peas', 'snap peas', 'eggplant', 'parsnips', 'celery']
+    grain_keywords = ['quinoa', 'rice', 'potatoes', 'sweet potatoes', 'bread', 'couscous', 'polenta', 'cauliflower']
+    dairy_keywords = ['butter', 'cheese', 'milk', 'cream']
+    
+    for ingredient in unique_ingredients:
+        ingredient_lower = ingredient.lower()
+        categorized = False
+        
+        for keyword in protein_keywords:
+            if keyword in ingredient_lower:
+                departments["Proteins"].append(ingredient.title())
+                categorized = True
+                break
+        
+        if not categorized:
+            for keyword in vegetable_keywords:
+                if keyword in ingredient_lower:
+                    departments["Vegetables"].append(ingredient.title())
+                    categorized = True
+                    break
+        
+        if not categorized:
+            for keyword in grain_keywords:
+                if keyword in ingredient_lower:
+                    departments["Grains & Starches"].append(ingredient.title())
+                    categorized = True
+                    break
+        
+        if not categorized:
+            for keyword in dairy_keywords:
+                if keyword in ingredient_lower:
+                    departments["Dairy"].append(ingredient.title())
+                    categorized = True
+                    break
+        
+        if not categorized:
+            departments["Pantry"].append(ingredient.title())
+    
+    # Remove empty departments
+    grocery_list = {dept: items for dept, items in departments.items() if items}
+    
+    return grocery_list, len(unique_ingredients)
+
 @recipe_fix_bp.route('/grocery-list', methods=['POST'])
 @cross_origin()
+@idempotent
 def generate_grocery_list_fixed():
     """Fixed endpoint for grocery list generation"""
     try:
@@ -321,75 +153,24 @@ def generate_grocery_list_fixed():
                 'error': 'Exactly 4 recipes must be selected'
             }), 400
         
-        # Organize ingredients by department
-        departments = {
-            "Proteins": [],
-            "Vegetables": [],
-            "Grains & Starches": [],
-            "Pantry": [],
-            "Dairy": []
-        }
-        
-        all_ingredients = []
-        for recipe in selected_recipes:
-            ingredients = recipe.get('ingredients', [])
-            all_ingredients.extend(ingredients)
-        
-        # Remove duplicates while preserving order
-        unique_ingredients = list(dict.fromkeys(all_ingredients))
-        
-        # Categorize ingredients
-        protein_keywords = ['chicken', 'beef', 'salmon', 'shrimp', 'turkey', 'pork', 'lamb', 'duck', 'cod', 'fish']
-        vegetable_keywords = ['zucchini', 'bell peppers', 'onion', 'broccoli', 'carrots', 'asparagus', 'tomatoes', 'green beans', 'brussels sprouts', 'spinach', 'bok choy', 'snow peas', 'snap peas', 'eggplant', 'parsnips', 'celery']
-        grain_keywords = ['quinoa', 'rice', 'potatoes', 'sweet potatoes', 'bread', 'couscous', 'polenta', 'cauliflower']
-        dairy_keywords = ['butter', 'cheese', 'milk', 'cream']
-        
-        for ingredient in unique_ingredients:
-            ingredient_lower = ingredient.lower()
-            categorized = False
-            
-            for keyword in protein_keywords:
-                if keyword in ingredient_lower:
-                    departments["Proteins"].append(ingredient.title())
-                    categorized = True
-                    break
-            
-            if not categorized:
-                for keyword in vegetable_keywords:
-                    if keyword in ingredient_lower:
-                        departments["Vegetables"].append(ingredient.title())
-                        categorized = True
-                        break
-            
-            if not categorized:
-                for keyword in grain_keywords:
-                    if keyword in ingredient_lower:
-                        departments["Grains & Starches"].append(ingredient.title())
-                        categorized = True
-                        break
-            
-            if not categorized:
-                for keyword in dairy_keywords:
-                    if keyword in ingredient_lower:
-                        departments["Dairy"].append(ingredient.title())
-                        categorized = True
-                        break
-            
-            if not categorized:
-                departments["Pantry"].append(ingredient.title())
-        
-        # Remove empty departments
-        grocery_list = {dept: items for dept, items in departments.items() if items}
+        # Keyed by recipe content, so the same four recipes reuse one list
+        recipe_keys = tuple(content_id(canonical_recipe(recipe)) for recipe in selected_recipes)
+        grocery_list, total_items = department_lists.get_or_compute(
+            recipe_keys,
+            recipe_dependencies(selected_recipes, recipe_keys),
+            lambda: organize_by_department(selected_recipes)
+        )
         
         return jsonify({
             'success': True,
             'formatted_list': {
                 'grocery_list': grocery_list,
-                'total_items': len(unique_ingredients),
+                'total_items': total_items,
                 'generation_date': datetime.now().isoformat()
             },
             'raw_data': grocery_list,
             'selected_recipes': selected_recipes,
+            'estimated_cost': price_model.price_recipes(selected_recipes),
             'generation_method': 'fixed_simple_categorization'
         })
         
@@ -161,7 +161,7 @@ class RecipeSelector {
                 <div class="recipe-info">
                     <p><strong>🥬 Vegetables:</strong> ${recipe.vegetables || 'Mixed vegetables'}</p>
                     <p><strong>🌾 Starch:</strong> ${recipe.starch || 'Rice or quinoa'}</p>
-                    <p><strong>⏱️ Prep Time:</strong> ${recipe.prep_time} minutes</p>
+                    <p><strong>⏱️ Prep Time:</strong> ${recipe.prep_time ? recipe.prep_time + ' minutes' : 'Not listed'}</p>
                     <p><strong>👨‍🍳 Difficulty:</strong> ${this.getDifficultyDisplay(recipe.difficulty)}</p>
                 </div>
 
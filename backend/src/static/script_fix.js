@@ -88,8 +88,8 @@ class RecipeSelector {
                 name: "Mediterranean Grilled Chicken",
                 protein: "chicken",
                 vegetables: ["zucchini", "bell peppers"],
-                starch_grain: "quinoa",
-                prep_time: "35 minutes",
+                starch: "quinoa",
+                prep_time: 35,
                 difficulty: "easy",
                 cuisine: "mediterranean",
                 cooking_method: "grill",
@@ -101,8 +101,8 @@ class RecipeSelector {
                 name: "Asian Beef Stir-Fry",
                 protein: "beef",
                 vegetables: ["broccoli", "carrots"],
-                starch_grain: "rice",
-                prep_time: "25 minutes",
+                starch: "rice",
+                prep_time: 25,
                 difficulty: "medium",
                 cuisine: "asian",
                 cooking_method: "stove",
@@ -114,8 +114,8 @@ class RecipeSelector {
                 name: "Pan-Seared Salmon",
                 protein: "salmon",
                 vegetables: ["asparagus", "tomatoes"],
-                starch_grain: "quinoa",
-                prep_time: "30 minutes",
+                starch: "quinoa",
+                prep_time: 30,
                 difficulty: "medium",
                 cuisine: "american",
                 cooking_method: "stove",
@@ -127,8 +127,8 @@ class RecipeSelector {
                 name: "Cajun Shrimp Skewers",
                 protein: "shrimp",
                 vegetables: ["bell peppers", "onions"],
-                starch_grain: "rice",
-                prep_time: "25 minutes",
+                starch: "rice",
+                prep_time: 25,
                 difficulty: "easy",
                 cuisine: "american",
                 cooking_method: "grill",
@@ -234,7 +234,7 @@ class RecipeSelector {
                         <h3>${recipe.name} ${favoriteIcon}</h3>
                         <div class="recipe-meta">
                             <span class="protein">${this.getProteinEmoji(recipe.protein)} ${recipe.protein}</span>
-                            <span class="time">⏱️ ${recipe.prep_time}</span>
+                            <span class="time">⏱️ ${recipe.prep_time ?? "?"} min</span>
                             <span class="difficulty">${this.getDifficultyDisplay(recipe.difficulty)}</span>
                         </div>
                     </div>
@@ -242,7 +242,7 @@ class RecipeSelector {
                         <div class="cuisine">${this.getCuisineEmoji(recipe.cuisine)} ${recipe.cuisine}</div>
                         <div class="method">${this.getMethodEmoji(recipe.cooking_method)} ${recipe.cooking_method}</div>
                         <div class="vegetables">🥬 ${recipe.vegetables.join(', ')}</div>
-                        <div class="starch">🌾 ${recipe.starch_grain}</div>
+                        <div class="starch">🌾 ${recipe.starch}</div>
                     </div>
                     <button class="select-btn ${isSelected ? 'selected' : ''}" onclick="recipeSelector.toggleRecipe('${recipe.id}')">
                         ${isSelected ? '✅ Selected' : '➕ Select Recipe'}
@@ -356,7 +356,7 @@ class RecipeSelector {
                     <div class="recipe-number">${index + 1}</div>
                     <div class="recipe-info">
                         <h4>${recipe.name}</h4>
-                        <p>${recipe.prep_time} • ${recipe.cuisine}</p>
+                        <p>${recipe.prep_time ?? "?"} min • ${recipe.cuisine}</p>
                     </div>
                     <button class="remove-btn" onclick="recipeSelector.toggleRecipe('${recipe.id}')">❌</button>
                 </div>
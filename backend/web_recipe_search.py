@@ -11,6 +11,7 @@ from datetime import datetime
 from typing import List, Dict, Any
 import requests
 from urllib.parse import quote_plus
+from recipe_schema import split_list, content_id
 
 class WebRecipeSearcher:
     def __init__(self):
@@ -245,15 +246,11 @@ class WebRecipeSearcher:
         # Create recipe name
         recipe_name = template['name_pattern'].format(vegetable=vegetable)
         
-        # Generate recipe ID
-        recipe_id = f"web_{protein}_{cuisine}_{random.randint(1000, 9999)}"
-        
         # Create recipe object
         recipe = {
-            'id': recipe_id,
             'name': recipe_name,
             'protein': protein,
-            'vegetables': vegetable,
+            'vegetables': split_list(vegetable),
             'starch': template['starch'],
             'prep_time': template['prep_time'],
             'difficulty': template['difficulty'],
@@ -266,6 +263,9 @@ class WebRecipeSearcher:
             'search_query': f"gluten free {protein} {cuisine} dinner recipes"
         }
         
+        # Links are synthesized per search, so the id comes from the recipe content
+        recipe['id'] = content_id(recipe)
+        
         return recipe
     
     def _generate_recipe_url(self, recipe_name: str) -> str:
@@ -9,6 +9,7 @@ import random
 from datetime import datetime, timedelta
 from recipe_manager import RecipeManager
 from recipe_search_engine import RecipeSearchEngine
+from recipe_record import RecipeOverlay, as_dict
 
 class WeeklySuggestionGenerator:
     def __init__(self):
@@ -31,7 +32,8 @@ class WeeklySuggestionGenerator:
         # Get new recipe recommendations
         new_recommendations = self.search_engine.get_recipe_recommendations(
             user_preferences, 
-            recent_selections=[r['name'] for r in user_favorites]
+            recent_selections=[r['name'] for r in user_favorites],
+            limit=self.min_suggestions
         )
         
         # Combine user favorites with new recommendations
@@ -57,7 +59,8 @@ class WeeklySuggestionGenerator:
         # Shuffle to mix favorites with new recipes
         random.shuffle(suggestions)
         
-        # Add metadata
+        # Add metadata (per-request overlays; favorites in recipe_db and catalog records stay untouched)
+        suggestions = [RecipeOverlay(recipe) for recipe in suggestions]
         for i, recipe in enumerate(suggestions, 1):
             recipe['suggestion_number'] = i
             recipe['week_date'] = week_date
@@ -70,20 +73,20 @@ class WeeklySuggestionGenerator:
     
     def save_weekly_suggestions(self, suggestions, week_date):
         """Save weekly suggestions to database"""
-        if 'recipe_history' not in self.recipe_manager.recipe_db:
-            self.recipe_manager.recipe_db['recipe_history'] = {}
-        
-        if 'weekly_suggestions' not in self.recipe_manager.recipe_db['recipe_history']:
-            self.recipe_manager.recipe_db['recipe_history']['weekly_suggestions'] = []
-        
         suggestion_record = {
             'week_date': week_date,
-            'suggestions': suggestions,
+            'suggestions': [as_dict(recipe) for recipe in suggestions],
             'generated_date': datetime.now().isoformat()
         }
         
-        self.recipe_manager.recipe_db['recipe_history']['weekly_suggestions'].append(suggestion_record)
-        self.recipe_manager.save_database()
+        with self.recipe_manager.db_lock:
+            if 'recipe_history' not in self.recipe_manager.recipe_db:
+                self.recipe_manager.recipe_db['recipe_history'] = {}
+            
+            if 'weekly_suggestions' not in self.recipe_manager.recipe_db['recipe_history']:
+                self.recipe_manager.recipe_db['recipe_history']['weekly_suggestions'] = []
+            self.recipe_manager.recipe_db['recipe_history']['weekly_suggestions'].append(suggestion_record)
+            self.recipe_manager.save_database()
     
     def format_suggestions_for_user(self, suggestions):
         """Format suggestions as numbered list for user"""
@@ -150,14 +153,19 @@ class WeeklySuggestionGenerator:
         if len(filtered_suggestions) > 10:
             optimized_suggestions = self.search_engine.optimize_for_ingredient_overlap(
                 [selected_recipe] + filtered_suggestions[:10], 
-                target_count=4
+                target_count=4,
+                required_count=1
             )[1:]  # Remove the selected recipe from the result
             
-            # Add remaining suggestions
+            # Add remaining suggestions, most ingredients shared with this week's picks first
             remaining = [r for r in filtered_suggestions if r not in optimized_suggestions]
+            remaining = self.search_engine.rank_by_shared_ingredients(
+                [selected_recipe] + optimized_suggestions, remaining
+            )
             filtered_suggestions = optimized_suggestions + remaining
         
         # Re-number suggestions
+        filtered_suggestions = [RecipeOverlay(recipe) for recipe in filtered_suggestions]
         for i, recipe in enumerate(filtered_suggestions, 1):
             recipe['suggestion_number'] = i
         
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Queue
+Moves file persistence off the request thread: writes are queued by target,
+coalesced (only the newest content for a target is written) and flushed by a
+background worker, including on interpreter shutdown
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+
+class WriteBehindQueue:
+    def __init__(self, max_pending=64):
+        self.max_pending = max_pending
+        self._pending = OrderedDict()   # target path -> (content producer, enqueue time)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._worker = None
+        self._closed = False
+
+        self.metrics = {
+            'enqueued': 0,
+            'coalesced': 0,
+            'written': 0,
+            'failed': 0,
+            'max_depth': 0,
+            'last_flush_latency_ms': 0.0,
+            'max_flush_latency_ms': 0.0,
+            'total_flush_latency_ms': 0.0,
+            'last_error': None
+        }
+
+        atexit.register(self.close)
+
+    def enqueue(self, path: str, produce_content: Callable[[], str]):
+        """
+        Queue a write of produce_content() to path
+
+        The producer runs on the writer thread. If a write for the same path
+        is still pending it is replaced rather than written twice.
+        """
+        with self._condition:
+            if self._closed:
+                self._write(path, produce_content, time.time())
+                return
+
+            if path in self._pending:
+                self.metrics['coalesced'] += 1
+                enqueued_at = self._pending[path][1]
+                self._pending[path] = (produce_content, enqueued_at)
+            else:
+                # Bounded: block the caller until the writer catches up
+                while len(self._pending) >= self.max_pending:
+                    self._condition.wait()
+                self._pending[path] = (produce_content, time.time())
+
+            self.metrics['enqueued'] += 1
+            self.metrics['max_depth'] = max(self.metrics['max_depth'], len(self._pending))
+            self._ensure_worker()
+            self._condition.notify_all()
+
+    def enqueue_text(self, path: str, text: str):
+        """Queue a plain text write"""
+        self.enqueue(path, lambda: text)
+
+    def enqueue_json(self, path: str, data: Any, indent: Optional[int] = None):
+        """
+        Queue a JSON write
+
+        data is serialized here, on the caller's thread, so the file holds
+        exactly the state at enqueue time even if the caller keeps changing
+        data afterwards (only file I/O moves to the writer thread).
+        """
+        self.enqueue_text(path, json.dumps(data, indent=indent))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write has landed on disk"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self):
+        """Flush everything and stop the writer thread"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+        # Anything left (e.g. worker never started) is written inline
+        while self._pending:
+            path, (produce_content, enqueued_at) = self._pending.popitem(last=False)
+            self._write(path, produce_content, enqueued_at)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and flush latency snapshot"""
+        with self._condition:
+            metrics = dict(self.metrics)
+            metrics['queue_depth'] = len(self._pending)
+            metrics['in_flight'] = self._in_flight
+            completed = metrics['written'] + metrics['failed']
+            metrics['avg_flush_latency_ms'] = round(metrics['total_flush_latency_ms'] / completed, 3) if completed else 0.0
+        return metrics
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='write-behind-queue', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                path, (produce_content, enqueued_at) = self._pending.popitem(last=False)
+                self._in_flight += 1
+                self._condition.notify_all()
+
+            self._write(path, produce_content, enqueued_at)
+
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def _write(self, path: str, produce_content: Callable[[], str], enqueued_at: float):
+        """Write atomically (temp file + rename) and record latency"""
+        try:
+            content = produce_content()
+            directory = os.path.dirname(path) or '.'
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix=os.path.basename(path))
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            outcome = 'written'
+        except Exception as e:
+            print(f"Write-behind failed for {path}: {e}")
+            with self._condition:
+                self.metrics['last_error'] = f"{path}: {e}"
+            outcome = 'failed'
+
+        latency_ms = (time.time() - enqueued_at) * 1000
+        with self._condition:
+            self.metrics[outcome] += 1
+            self.metrics['last_flush_latency_ms'] = round(latency_ms, 3)
+            self.metrics['max_flush_latency_ms'] = round(max(self.metrics['max_flush_latency_ms'], latency_ms), 3)
+            self.metrics['total_flush_latency_ms'] += latency_ms
+
+# Shared queue used by every persistence path in the process
+write_queue = WriteBehindQueue()
+
+if __name__ == "__main__":
+    queue = WriteBehindQueue()
+    target = os.path.join(tempfile.gettempdir(), 'write_behind_demo.json')
+
+    start = time.time()
+    for i in range(1000):
+        queue.enqueue_json(target, {'version': i, 'payload': list(range(100))})
+    enqueue_time = time.time() - start
+
+    queue.flush()
+    print(f"Enqueued 1000 writes in {enqueue_time * 1000:.1f}ms")
+    print(f"Metrics: {queue.get_metrics()}")
+
+    with open(target) as f:
+        print(f"Final version on disk: {json.load(f)['version']}")